@@ -0,0 +1,51 @@
+import importlib
+import typing
+
+# Importing drip or its runtime (drip.program, drip.interpreter,
+# drip.bytecode_file, drip.code_object) must not pull in the frontend: the
+# AST, type checker front half, lexer and parser load only when first used.
+# Submodules are also reachable as attributes of the package, imported on
+# first access. tests/test_imports.py enforces the budget in the README.
+SUBMODULES = frozenset(
+    (
+        "adaptive",
+        "ast",
+        "basetypes",
+        "bytecode_file",
+        "cache",
+        "code_object",
+        "compile_ast",
+        "compile_ir",
+        "constants",
+        "emitter",
+        "incremental",
+        "interpreter",
+        "ir",
+        "ir_passes",
+        "jit",
+        "lex",
+        "module",
+        "monomorphize",
+        "ops",
+        "parallel_typecheck",
+        "parse",
+        "parse_asm",
+        "parse_descent",
+        "parse_tables",
+        "profile",
+        "program",
+        "scanner",
+        "stack_depth",
+        "tables",
+        "typecheck",
+        "util",
+        "validated_dataclass",
+        "verifier",
+    )
+)
+
+
+def __getattr__(name: str) -> typing.Any:
+    if name in SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
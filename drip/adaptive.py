@@ -0,0 +1,96 @@
+import typing
+from dataclasses import dataclass, field
+import drip.ops as ops
+from drip.basetypes import Frame, StructureInstance, TaggedValue
+from drip.program import Subroutine
+
+WARMUP = 8
+# after a failed guard the op stays generic for this many executions
+DEOPTIMIZATION_BACKOFF = 64
+
+SPECIALIZED_BINARY_OPS: typing.Dict[
+    typing.Tuple[typing.Type[ops.SubroutineOp], typing.Type],
+    typing.Type[ops.TypedBinaryOp],
+] = {
+    (ops.BinaryAddOp, int): ops.BinaryAddIntOp,
+    (ops.BinaryAddOp, float): ops.BinaryAddFloatOp,
+    (ops.BinarySubtractOp, int): ops.BinarySubtractIntOp,
+    (ops.BinarySubtractOp, float): ops.BinarySubtractFloatOp,
+}
+
+
+def specialize(
+    op: ops.SubroutineOp, frame: Frame
+) -> typing.Optional[ops.SpecializedOp]:
+    if isinstance(op, (ops.BinaryAddOp, ops.BinarySubtractOp)):
+        lhs = frame.stack[frame.stack_pointer - 2]
+        rhs = frame.stack[frame.stack_pointer - 1]
+        if (
+            isinstance(lhs, TaggedValue)
+            and isinstance(rhs, TaggedValue)
+            and lhs.tag is rhs.tag
+            and (type(op), lhs.tag) in SPECIALIZED_BINARY_OPS
+        ):
+            return SPECIALIZED_BINARY_OPS[(type(op), lhs.tag)]()
+    elif isinstance(op, ops.PopAndPushPropertyOp):
+        value = frame.stack[frame.stack_pointer - 1]
+        if isinstance(value, StructureInstance):
+            for name, structure in frame.structures.items():
+                if structure is value.structure:
+                    return ops.PopAndPushPropertyOfKnownStructureOp(
+                        property=op.property, structure=name
+                    )
+    return None
+
+
+def is_specializable(op: ops.ByteCodeOp) -> bool:
+    return isinstance(
+        op, (ops.BinaryAddOp, ops.BinarySubtractOp, ops.PopAndPushPropertyOp)
+    )
+
+
+class AdaptiveCode:
+    def __init__(self, subroutine: Subroutine, warmup: int = WARMUP):
+        self.subroutine = subroutine
+        self.ops: typing.List[ops.ByteCodeOp] = list(subroutine.ops)
+        self.counters: typing.List[int] = [0] * len(subroutine.ops)
+        self.warmup = warmup
+        self.specializations = 0
+        self.deoptimizations = 0
+
+    def execute(self, index: int, frame: Frame, trusted: bool) -> None:
+        op = self.ops[index]
+        if isinstance(op, ops.SpecializedOp):
+            if op.guard(frame):
+                op.execute_trusted(frame)
+                return
+            op = self.ops[index] = op.generic()
+            self.counters[index] = -DEOPTIMIZATION_BACKOFF
+            self.deoptimizations += 1
+        elif is_specializable(op):
+            self.counters[index] += 1
+            if self.counters[index] >= self.warmup:
+                assert isinstance(op, ops.SubroutineOp)
+                specialized = specialize(op, frame)
+                self.counters[index] = 0
+                if specialized is not None:
+                    self.ops[index] = specialized
+                    self.specializations += 1
+                    specialized.execute_trusted(frame)
+                    return
+        assert isinstance(op, ops.SubroutineOp)
+        if trusted:
+            op.execute_trusted(frame)
+        else:
+            op.execute(frame)
+
+
+@dataclass
+class AdaptiveState:
+    warmup: int = WARMUP
+    code: typing.Dict[str, AdaptiveCode] = field(default_factory=dict)
+
+    def code_for(self, name: str, subroutine: Subroutine) -> AdaptiveCode:
+        if name not in self.code or self.code[name].subroutine is not subroutine:
+            self.code[name] = AdaptiveCode(subroutine, warmup=self.warmup)
+        return self.code[name]
@@ -1,4 +1,4 @@
-from dataclasses import dataclass, field, replace
+from dataclasses import dataclass, field, fields
 from drip.validated_dataclass import validated_dataclass
 from functools import cached_property
 from drip.constants import INDENT
@@ -7,6 +7,7 @@ from drip.typecheck import StructureDefinition, ArgumentDefinition
 import typing
 import enum
 import abc
+import contextlib
 
 
 @validated_dataclass
@@ -18,6 +19,142 @@ class NamedStructureDefinition:
         return self.structure.serialize(name=self.name)
 
 
+def instantiation_name(type_name: str, type_arguments: typing.Dict[str, str]) -> str:
+    arguments = ",".join(
+        f"{parameter}={type_arguments[parameter]}"
+        for parameter in sorted(type_arguments)
+    )
+    return f"{type_name}[{arguments}]"
+
+
+InstantiationKey = typing.Tuple[
+    str, typing.Tuple[typing.Tuple[str, drip_typing.ExpressionType], ...]
+]
+
+
+@dataclass
+class InstantiationCache:
+    instances: typing.Dict[InstantiationKey, NamedStructureDefinition] = field(
+        default_factory=dict
+    )
+
+    def instantiate(
+        self,
+        context: "TypeCheckingContext",
+        type_name: str,
+        type_arguments: typing.Dict[str, str],
+    ) -> NamedStructureDefinition:
+        structure = context.structure_lookup[type_name]
+        if len(type_arguments) == 0:
+            return NamedStructureDefinition(name=type_name, structure=structure)
+        parameter_types = {
+            parameter: type_name_to_type(context, argument_type)
+            for parameter, argument_type in type_arguments.items()
+        }
+        key = (type_name, tuple(sorted(parameter_types.items())))
+        if key not in self.instances:
+            self.instances[key] = NamedStructureDefinition(
+                name=instantiation_name(type_name, type_arguments),
+                structure=structure.resolve_type(parameter_types),
+            )
+        return self.instances[key]
+
+    def structure_lookup(self) -> typing.Dict[str, StructureDefinition]:
+        return {
+            instance.name: instance.structure for instance in self.instances.values()
+        }
+
+
+@dataclass
+class SymbolTable:
+    # push/pop scoping: each name maps to a stack of bindings, innermost last,
+    # and each scope remembers which names it bound so popping is cheap
+    bindings: typing.Dict[str, typing.List[drip_typing.ExpressionType]] = field(
+        default_factory=dict
+    )
+    scopes: typing.List[typing.Set[str]] = field(default_factory=lambda: [set()])
+
+    def __getitem__(self, name: str) -> drip_typing.ExpressionType:
+        return self.bindings[name][-1]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.bindings
+
+    def bind(self, name: str, expression_type: drip_typing.ExpressionType) -> None:
+        if name in self.scopes[-1]:
+            self.bindings[name][-1] = expression_type
+        else:
+            self.scopes[-1].add(name)
+            self.bindings.setdefault(name, []).append(expression_type)
+
+    def push_scope(self) -> None:
+        self.scopes.append(set())
+
+    def pop_scope(self) -> None:
+        for name in self.scopes.pop():
+            stack = self.bindings[name]
+            stack.pop()
+            if len(stack) == 0:
+                del self.bindings[name]
+
+    @contextlib.contextmanager
+    def scope(self) -> typing.Iterator["SymbolTable"]:
+        self.push_scope()
+        try:
+            yield self
+        finally:
+            self.pop_scope()
+
+
+AnnotationTable = typing.Dict[
+    int, typing.Tuple["Expression", drip_typing.ExpressionType]
+]
+
+
+@dataclass
+class TypeAnnotations:
+    # side table of checked expression types, keyed by node identity; the
+    # node is kept alongside its type so the id stays valid. Tables are per
+    # function because hash-consed nodes such as a variable reference can be
+    # shared between functions in which they have different types.
+    functions: typing.Dict[str, AnnotationTable] = field(default_factory=dict)
+    current: AnnotationTable = field(default_factory=dict)
+
+    @contextlib.contextmanager
+    def function(self, name: str) -> typing.Iterator[AnnotationTable]:
+        previous = self.current
+        self.current = self.functions.setdefault(name, {})
+        try:
+            yield self.current
+        finally:
+            self.current = previous
+
+    def annotate(
+        self, expression: "Expression", context: "TypeCheckingContext"
+    ) -> drip_typing.ExpressionType:
+        annotation = self.current.get(id(expression))
+        if annotation is not None:
+            return annotation[1]
+        # annotate operands before the expressions using them, with an
+        # explicit stack, so no type_check call has to recurse
+        pending = [(expression, False)]
+        while len(pending) > 0:
+            node, operands_ready = pending.pop()
+            if id(node) in self.current:
+                continue
+            if operands_ready:
+                self.current[id(node)] = (node, node.type_check(context))
+            else:
+                pending.append((node, True))
+                pending.extend((operand, False) for operand in node.type_operands())
+        return self.current[id(expression)][1]
+
+    def type_of(
+        self, function_name: str, expression: "Expression"
+    ) -> drip_typing.ExpressionType:
+        return self.functions[function_name][id(expression)][1]
+
+
 @validated_dataclass
 class TypeCheckingContext:
     structure_lookup: typing.Dict[str, StructureDefinition] = field(
@@ -26,15 +163,20 @@ class TypeCheckingContext:
     function_return_types: typing.Dict[str, drip_typing.ExpressionType] = field(
         default_factory=dict
     )
-    local_scope: typing.Dict[str, drip_typing.ExpressionType] = field(
-        default_factory=dict
-    )
+    # declared parameters, so call arguments can be checked in any order
+    function_arguments: typing.Dict[
+        str, typing.Tuple[drip_typing.ArgumentDefinition, ...]
+    ] = field(default_factory=dict)
+    local_scope: SymbolTable = field(default_factory=SymbolTable)
+    instantiations: InstantiationCache = field(default_factory=InstantiationCache)
+    annotations: TypeAnnotations = field(default_factory=TypeAnnotations)
+
+    def type_of(self, expression: "Expression") -> drip_typing.ExpressionType:
+        return self.annotations.annotate(expression, self)
 
 
 def primitive_name_to_type(primitive_name: str) -> drip_typing.ConcreteType:
-    return drip_typing.ConcreteType(
-        type=drip_typing.PrimitiveType(primitive=drip_typing.PRIMITIVES[primitive_name])
-    )
+    return drip_typing.PRIMITIVE_TYPES[primitive_name]
 
 
 def type_name_to_type(
@@ -52,15 +194,59 @@ def type_name_to_type(
         raise ValueError("Unknown type", type_name)
 
 
+def check_argument_types(
+    context: TypeCheckingContext,
+    arguments: typing.Dict[str, "Expression"],
+    parameters: typing.Dict[str, drip_typing.ArgumentDefinition],
+) -> None:
+    for argument_name, argument in arguments.items():
+        expected = parameters[argument_name].type
+        # fields of generics constructed without type arguments stay open
+        if isinstance(expected, drip_typing.Placeholder):
+            continue
+        argument_type = context.type_of(argument)
+        assert (
+            argument_type == expected
+        ), f"argument {argument_name} expects {expected}, got {argument_type}"
+
+
+SerializedPart = typing.Union[str, "Expression"]
+
+
 class Expression(abc.ABC):
     @abc.abstractmethod
     def type_check(self, context: TypeCheckingContext) -> drip_typing.ExpressionType:
         ...
 
+    def type_operands(self) -> typing.Tuple["Expression", ...]:
+        # sub-expressions whose types type_check looks up through type_of
+        return tuple()
+
     @abc.abstractmethod
-    def serialize(self) -> str:
+    def serialize_parts(self) -> typing.Tuple[SerializedPart, ...]:
         ...
 
+    def serialize(self) -> str:
+        # expands sub-expressions with an explicit stack rather than recursion
+        pending: typing.List[SerializedPart] = [self]
+        parts: typing.List[str] = []
+        while len(pending) > 0:
+            part = pending.pop()
+            if isinstance(part, str):
+                parts.append(part)
+            else:
+                pending.extend(reversed(part.serialize_parts()))
+        return "".join(parts)
+
+
+def serialize_arguments(
+    arguments: typing.Dict[str, Expression]
+) -> typing.Tuple[SerializedPart, ...]:
+    parts: typing.List[SerializedPart] = []
+    for index, (argument_name, expression) in enumerate(arguments.items()):
+        parts += [", " if index > 0 else "", f"{argument_name}=", expression]
+    return tuple(parts)
+
 
 @validated_dataclass
 class LiteralExpression(Expression):
@@ -70,8 +256,8 @@ class LiteralExpression(Expression):
     def type_check(self, context: TypeCheckingContext) -> drip_typing.ExpressionType:
         return primitive_name_to_type(self.type_name)
 
-    def serialize(self) -> str:
-        return str(self.value)
+    def serialize_parts(self) -> typing.Tuple[SerializedPart, ...]:
+        return (str(self.value),)
 
 
 @validated_dataclass
@@ -81,8 +267,8 @@ class VariableReferenceExpression(Expression):
     def type_check(self, context: TypeCheckingContext) -> drip_typing.ExpressionType:
         return context.local_scope[self.name]
 
-    def serialize(self) -> str:
-        return self.name
+    def serialize_parts(self) -> typing.Tuple[SerializedPart, ...]:
+        return (self.name,)
 
 
 @validated_dataclass
@@ -92,39 +278,33 @@ class ConstructionExpression(Expression):
     type_arguments: typing.Dict[str, str] = field(default_factory=dict)
 
     def type_check(self, context: TypeCheckingContext) -> drip_typing.ExpressionType:
-        structure = context.structure_lookup[self.type_name]
-        if len(self.type_arguments) == 0:
-            return drip_typing.ConcreteType(
-                type=drip_typing.StructureType(structure=structure)
-            )
-        else:
-            return drip_typing.ConcreteType(
-                type=drip_typing.StructureType(
-                    structure=structure.resolve_type(
-                        {
-                            argument_name: type_name_to_type(context, argument_type)
-                            for argument_name, argument_type in self.type_arguments.items()
-                        }
-                    )
-                )
-            )
+        instance = context.instantiations.instantiate(
+            context, self.type_name, self.type_arguments
+        )
+        check_argument_types(context, self.arguments, instance.structure.field_lookup)
+        return drip_typing.ConcreteType(
+            type=drip_typing.StructureType(structure=instance.structure)
+        )
 
-    def serialize(self) -> str:
-        argument_parts = [
-            f"{argument_name}={expression.serialize()}"
-            for argument_name, expression in self.arguments.items()
-        ]
+    def serialize_parts(self) -> typing.Tuple[SerializedPart, ...]:
         type_argument_parts = [
             f"{argument_name}={type_name}"
             for argument_name, type_name in self.type_arguments.items()
         ]
         type_parameters_snippet = (
-            f" [', '.join(type_argument_parts)]" if len(type_argument_parts) > 0 else ""
+            f" [{', '.join(type_argument_parts)}]"
+            if len(type_argument_parts) > 0
+            else ""
         )
         return (
-            f"{self.type_name}{type_parameters_snippet} ({', '.join(argument_parts)})"
+            (f"{self.type_name}{type_parameters_snippet} (",)
+            + serialize_arguments(self.arguments)
+            + (")",)
         )
 
+    def type_operands(self) -> typing.Tuple[Expression, ...]:
+        return tuple(self.arguments.values())
+
 
 @validated_dataclass
 class FunctionCallExpression(Expression):
@@ -132,14 +312,23 @@ class FunctionCallExpression(Expression):
     arguments: typing.Dict[str, Expression]
 
     def type_check(self, context: TypeCheckingContext) -> drip_typing.ExpressionType:
+        check_argument_types(
+            context,
+            self.arguments,
+            {
+                argument.name: argument
+                for argument in context.function_arguments[self.function_name]
+            },
+        )
         return context.function_return_types[self.function_name]
 
-    def serialize(self) -> str:
-        argument_parts = [
-            f"{argument_name}={expression.serialize()}"
-            for argument_name, expression in self.arguments.items()
-        ]
-        return f"{self.function_name}({', '.join(argument_parts)})"
+    def type_operands(self) -> typing.Tuple[Expression, ...]:
+        return tuple(self.arguments.values())
+
+    def serialize_parts(self) -> typing.Tuple[SerializedPart, ...]:
+        return (
+            (f"{self.function_name}(",) + serialize_arguments(self.arguments) + (")",)
+        )
 
 
 @validated_dataclass
@@ -148,15 +337,18 @@ class PropertyAccessExpression(Expression):
     property_name: str
 
     def type_check(self, context: TypeCheckingContext) -> drip_typing.ExpressionType:
-        entity_type = self.entity.type_check(context)
+        entity_type = context.type_of(self.entity)
 
         assert isinstance(entity_type, drip_typing.ConcreteType)
         assert isinstance(entity_type.type, drip_typing.StructureType)
         field = entity_type.type.structure.field_lookup[self.property_name]
         return field.type
 
-    def serialize(self) -> str:
-        return f"{self.entity.serialize()}.{self.property_name}"
+    def type_operands(self) -> typing.Tuple[Expression, ...]:
+        return (self.entity,)
+
+    def serialize_parts(self) -> typing.Tuple[SerializedPart, ...]:
+        return (self.entity, f".{self.property_name}")
 
 
 class BinaryOperator(str, enum.Enum):
@@ -171,13 +363,16 @@ class BinaryOperatorExpression(Expression):
     rhs: Expression
 
     def type_check(self, context: TypeCheckingContext) -> drip_typing.ExpressionType:
-        lhs_type = self.lhs.type_check(context)
-        rhs_type = self.rhs.type_check(context)
+        lhs_type = context.type_of(self.lhs)
+        rhs_type = context.type_of(self.rhs)
         assert lhs_type == rhs_type
         return lhs_type
 
-    def serialize(self) -> str:
-        return f"({self.lhs.serialize()} {self.operator.value} {self.rhs.serialize()})"
+    def type_operands(self) -> typing.Tuple[Expression, ...]:
+        return (self.lhs, self.rhs)
+
+    def serialize_parts(self) -> typing.Tuple[SerializedPart, ...]:
+        return ("(", self.lhs, f" {self.operator.value} ", self.rhs, ")")
 
 
 @validated_dataclass
@@ -209,35 +404,30 @@ class FunctionDefinition:
     return_type_name: str
 
     def type_check(self, context: TypeCheckingContext) -> drip_typing.ExpressionType:
-        context = replace(
-            context,
-            local_scope={argument.name: argument.type for argument in self.arguments},
-        )
-        return_set = False
-        return_type = None
-        for statement in self.procedure:
-            if return_set:
-                raise ValueError("Code after return")
-
-            if isinstance(statement, ReturnStatement):
-                return_type = statement.expression.type_check(context)
-                return_set = True
-            elif isinstance(statement, AssignmentStatement):
-                statement_expression_type = statement.expression.type_check(context)
-                assert (
-                    statement.variable_name not in context.local_scope
-                    or statement_expression_type
-                    == context.local_scope[statement.variable_name]
-                )
-                context = replace(
-                    context,
-                    local_scope={
-                        **context.local_scope,
-                        statement.variable_name: statement_expression_type,
-                    },
-                )
-            else:
-                raise NotImplementedError(type(statement))
+        with context.local_scope.scope() as local_scope, context.annotations.function(
+            self.name
+        ):
+            for argument in self.arguments:
+                local_scope.bind(argument.name, argument.type)
+            return_set = False
+            return_type = None
+            for statement in self.procedure:
+                if return_set:
+                    raise ValueError("Code after return")
+
+                if isinstance(statement, ReturnStatement):
+                    return_type = context.type_of(statement.expression)
+                    return_set = True
+                elif isinstance(statement, AssignmentStatement):
+                    statement_expression_type = context.type_of(statement.expression)
+                    assert (
+                        statement.variable_name not in local_scope
+                        or statement_expression_type
+                        == local_scope[statement.variable_name]
+                    )
+                    local_scope.bind(statement.variable_name, statement_expression_type)
+                else:
+                    raise NotImplementedError(type(statement))
         assert return_type == self.return_type
         return return_type
 
@@ -254,17 +444,38 @@ class FunctionDefinition:
             + "\n)"
         )
 
+    @property
+    def signature(self) -> "FunctionSignature":
+        return FunctionSignature(
+            name=self.name,
+            arguments=self.arguments,
+            return_type=self.return_type,
+            return_type_name=self.return_type_name,
+        )
+
+
+@validated_dataclass
+class FunctionSignature:
+    name: str
+    arguments: typing.Tuple[drip_typing.ArgumentDefinition, ...]
+    return_type: drip_typing.ExpressionType
+    return_type_name: str
+
 
 @validated_dataclass
 class Program:
     structure_definitions: typing.Tuple[NamedStructureDefinition, ...] = tuple()
     function_definitions: typing.Tuple[FunctionDefinition, ...] = tuple()
+    # definitions from separately compiled modules, visible but not owned
+    imported_structures: typing.Tuple[NamedStructureDefinition, ...] = tuple()
+    imported_functions: typing.Tuple[FunctionSignature, ...] = tuple()
 
     @cached_property
     def structure_lookup(self) -> typing.Dict[str, drip_typing.StructureDefinition]:
         return {
             structure_definition.name: structure_definition.structure
-            for structure_definition in self.structure_definitions
+            for structure_definition in self.imported_structures
+            + self.structure_definitions
         }
 
     @cached_property
@@ -274,17 +485,46 @@ class Program:
             for function_definition in self.function_definitions
         }
 
+    @cached_property
+    def signature_lookup(self) -> typing.Dict[str, FunctionSignature]:
+        return {
+            **{signature.name: signature for signature in self.imported_functions},
+            **{
+                function_definition.name: function_definition.signature
+                for function_definition in self.function_definitions
+            },
+        }
+
+    @cached_property
+    def instantiations(self) -> InstantiationCache:
+        return InstantiationCache()
+
+    def type_checking_context(self) -> TypeCheckingContext:
+        return TypeCheckingContext(
+            structure_lookup=self.structure_lookup,
+            function_return_types={
+                signature.name: signature.return_type
+                for signature in self.imported_functions
+            },
+            function_arguments={
+                name: signature.arguments
+                for name, signature in self.signature_lookup.items()
+            },
+            instantiations=self.instantiations,
+        )
+
+    def instantiate(
+        self, type_name: str, type_arguments: typing.Dict[str, str]
+    ) -> NamedStructureDefinition:
+        return self.instantiations.instantiate(
+            self.type_checking_context(), type_name, type_arguments
+        )
+
     def type_check(self) -> TypeCheckingContext:
-        context = TypeCheckingContext(structure_lookup=self.structure_lookup)
+        context = self.type_checking_context()
         for function_definition in self.function_definitions:
             function_type = function_definition.type_check(context)
-            context = replace(
-                context,
-                function_return_types={
-                    **context.function_return_types,
-                    function_definition.name: function_type,
-                },
-            )
+            context.function_return_types[function_definition.name] = function_type
         return context
 
     def serialize(self) -> str:
@@ -317,8 +557,13 @@ class FunctionDefinitionPreliminary:
     arguments: typing.Tuple[ArgumentDefinitionPreliminary, ...] = tuple()
     procedure: typing.Tuple[Statement, ...] = tuple()
 
-    def finalize(self, context: TypeCheckingContext) -> FunctionDefinition:
-        return FunctionDefinition(
+    def finalize(
+        self,
+        context: TypeCheckingContext,
+        node_factory: typing.Optional["NodeFactory"] = None,
+    ) -> FunctionDefinition:
+        return NodeFactory.builder(node_factory)(
+            FunctionDefinition,
             name=self.name,
             arguments=finalize_arguments(
                 context=context,
@@ -353,8 +598,17 @@ class ProgramPreliminary:
     structure_definitions: typing.Tuple[StructureDefinitionPreliminary, ...] = tuple()
     function_definitions: typing.Tuple[FunctionDefinitionPreliminary, ...] = tuple()
 
-    def finalize(self) -> Program:
-        structure_lookup: typing.Dict[str, StructureDefinition] = {}
+    def finalize(
+        self,
+        node_factory: typing.Optional["NodeFactory"] = None,
+        imported_structures: typing.Tuple[NamedStructureDefinition, ...] = tuple(),
+        imported_functions: typing.Tuple[FunctionSignature, ...] = tuple(),
+    ) -> Program:
+        build = NodeFactory.builder(node_factory)
+        structure_lookup: typing.Dict[str, StructureDefinition] = {
+            imported.name: imported.structure for imported in imported_structures
+        }
+        own_structures = {definition.name for definition in self.structure_definitions}
         for definition in self.structure_definitions:
             structure_lookup[definition.name] = drip_typing.StructureDefinition(
                 type_parameters=definition.type_parameters,
@@ -365,13 +619,82 @@ class ProgramPreliminary:
                 ),
             )
         final_context = TypeCheckingContext(structure_lookup=structure_lookup)
-        return Program(
+        return build(
+            Program,
             structure_definitions=tuple(
-                NamedStructureDefinition(name=name, structure=structure)
+                build(NamedStructureDefinition, name=name, structure=structure)
                 for name, structure in structure_lookup.items()
+                if name in own_structures
             ),
             function_definitions=tuple(
-                definition.finalize(final_context)
+                definition.finalize(final_context, node_factory)
                 for definition in self.function_definitions
             ),
+            imported_structures=imported_structures,
+            imported_functions=imported_functions,
+        )
+
+
+N = typing.TypeVar("N")
+NodeKey = typing.Tuple[typing.Any, ...]
+Builder = typing.Callable[..., typing.Any]
+
+
+class NodeFactory:
+    # Hash-consing for AST construction: structurally identical nodes built
+    # through one factory are the same object, so repeated subtrees are
+    # allocated once and compare by identity. Keys refer to children by a
+    # per-factory serial number, which acts as a cached structural hash.
+    def __init__(self) -> None:
+        self.nodes: typing.Dict[NodeKey, typing.Any] = {}
+        self.serials: typing.Dict[int, int] = {}
+
+    @staticmethod
+    def builder(node_factory: typing.Optional["NodeFactory"]) -> Builder:
+        if node_factory is None:
+            return lambda cls, **kwargs: cls(**kwargs)
+        return node_factory.make
+
+    def make(self, cls: typing.Type[N], **kwargs: typing.Any) -> N:
+        return self.intern(cls(**kwargs))  # type: ignore
+
+    def serial(self, node: typing.Any) -> int:
+        return self.serials[id(self.intern(node))]
+
+    def key(self, value: typing.Any) -> typing.Any:
+        if isinstance(value, AST_NODES):
+            return self.serial(value)
+        elif isinstance(value, tuple):
+            return (tuple,) + tuple(self.key(item) for item in value)
+        elif isinstance(value, dict):
+            # dicts keep insertion order, which serialization depends on
+            return (dict,) + tuple(
+                (name, self.key(item)) for name, item in value.items()
+            )
+        else:
+            # the type keeps 1 and 1.0 apart
+            return (type(value), value)
+
+    def intern(self, node: N) -> N:
+        if id(node) in self.serials:
+            return node
+        key = (type(node),) + tuple(
+            self.key(getattr(node, node_field.name)) for node_field in fields(node)
         )
+        canonical = self.nodes.setdefault(key, node)
+        if canonical is node:
+            self.serials[id(node)] = len(self.serials)
+        return canonical
+
+
+AST_NODES = (
+    Expression,
+    ReturnStatement,
+    AssignmentStatement,
+    FunctionDefinition,
+    NamedStructureDefinition,
+    Program,
+    ArgumentDefinitionPreliminary,
+    StructureDefinitionPreliminary,
+    FunctionDefinitionPreliminary,
+)
@@ -2,7 +2,7 @@ from __future__ import annotations
 import typing
 from dataclasses import field, dataclass
 from drip.validated_dataclass import validated_dataclass
-import drip.ast as ast
+import drip.typecheck as drip_typing
 
 T = typing.TypeVar("T", int, float, covariant=True)
 
@@ -27,7 +27,7 @@ class TaggedValue(typing.Generic[T]):
 
 @validated_dataclass
 class StructureInstance:
-    structure: ast.StructureDefinition
+    structure: drip_typing.StructureDefinition
     field_values: typing.Dict[str, StackValue]
 
 
@@ -49,7 +49,41 @@ class FrameState:
     return_value: typing.Optional[StackValue] = None
     flags: typing.Dict[Name, int] = field(default_factory=dict)
     program_counter: int = 0
-    structures: typing.Dict[str, ast.StructureDefinition] = field(default_factory=dict)
+    structures: typing.Dict[str, drip_typing.StructureDefinition] = field(
+        default_factory=dict
+    )
+
+
+@dataclass
+class Frame:
+    stack: typing.List[typing.Optional[StackValue]]
+    stack_pointer: int = 0
+    names: typing.Dict[Name, StackValue] = field(default_factory=dict)
+    return_set: bool = False
+    return_value: typing.Optional[StackValue] = None
+    flags: typing.Dict[Name, int] = field(default_factory=dict)
+    program_counter: int = 0
+    structures: typing.Dict[str, drip_typing.StructureDefinition] = field(
+        default_factory=dict
+    )
+
+    @classmethod
+    def allocate(
+        cls: typing.Type["Frame"], max_stack_depth: int, **kwargs: typing.Any
+    ) -> "Frame":
+        return cls(stack=[None] * max_stack_depth, **kwargs)
+
+    def push(self, value: StackValue) -> None:
+        self.stack[self.stack_pointer] = value
+        self.stack_pointer += 1
+
+    def pop(self) -> StackValue:
+        self.stack_pointer -= 1
+        return self.stack[self.stack_pointer]  # type: ignore
+
+    def pop_n(self, n: int) -> typing.List[StackValue]:
+        self.stack_pointer -= n
+        return self.stack[self.stack_pointer : self.stack_pointer + n]  # type: ignore
 
 
 @validated_dataclass
@@ -0,0 +1,468 @@
+import array
+import contextlib
+import mmap
+import struct
+import sys
+import typing
+from dataclasses import fields
+import drip.ops as ops
+import drip.typecheck as drip_typing
+from drip.basetypes import TaggedValue
+from drip.program import LazySubroutines, Program, Subroutine
+from drip.stack_depth import annotate_stack_depths, annotate_subroutine
+
+# Layout, all integers little-endian and every section 4-byte aligned:
+#   header      MAGIC, u32 version, u32 flags, u32 offset of each section
+#   opcodes     u32 count, u32 name index of each op code used in the file
+#   names       u32 count, u32 count + 1 offsets into the blob, utf-8 blob
+#   constants   u32 count, one CONSTANT record per deduplicated literal
+#   structures  u32 count, per structure: u32 name, u32 type parameter count,
+#               u32 names, u32 field count, per field u32 name, u32 type
+#               name, u32 type kind, u32 type reference
+#   subroutines u32 count, one SUBROUTINE record each
+#   code        u16 opcode index per op, all subroutines back to back
+#   operands    u32 name or constant index per op field, back to back
+MAGIC = b"DRIPB\0\0\0"
+FORMAT_VERSION = 1
+FLAG_VERIFIED = 1
+HEADER = struct.Struct("<8sII7I")
+U32 = struct.Struct("<I")
+CONSTANT = struct.Struct("<Bxxxq")
+FLOAT_CONSTANT = struct.Struct("<Bxxxd")
+SUBROUTINE = struct.Struct("<IiIIIII")
+CONSTANT_TAGS: typing.Tuple[typing.Type, ...] = (int, float)
+TYPE_PRIMITIVE, TYPE_STRUCTURE, TYPE_PLACEHOLDER = range(3)
+# op fields holding literals go to the constant pool, all others are names
+LITERAL_FIELDS = {"value"}
+
+
+class BytecodeFormatError(ValueError):
+    pass
+
+
+@contextlib.contextmanager
+def format_errors(part: str) -> typing.Iterator[None]:
+    # indices and offsets read from the file are only checked as they are
+    # used, so malformed files surface as lookup and unpacking failures
+    try:
+        yield
+    except BytecodeFormatError:
+        raise
+    except (struct.error, KeyError, IndexError, TypeError, ValueError) as e:
+        raise BytecodeFormatError(f"Malformed {part}: {e!r}") from e
+
+
+def structure_order(
+    structures: typing.Dict[str, drip_typing.StructureDefinition]
+) -> typing.List[str]:
+    # structures referenced by a field are written before the structure
+    names_by_definition = {
+        id(structure): name for name, structure in structures.items()
+    }
+    order: typing.List[str] = []
+    seen: typing.Set[str] = set()
+    for root in structures:
+        pending = [(root, False)]
+        while len(pending) > 0:
+            name, fields_done = pending.pop()
+            if name in seen:
+                continue
+            if fields_done:
+                seen.add(name)
+                order.append(name)
+                continue
+            pending.append((name, True))
+            for field in structures[name].fields:
+                if isinstance(field.type, drip_typing.ConcreteType) and isinstance(
+                    field.type.type, drip_typing.StructureType
+                ):
+                    dependency = names_by_definition.get(id(field.type.type.structure))
+                    if dependency is None:
+                        raise BytecodeFormatError(
+                            f"Field {field.name} of {name} has an unnamed structure"
+                        )
+                    pending.append((dependency, False))
+    return order
+
+
+class BytecodeWriter:
+    def __init__(self) -> None:
+        self.names: typing.Dict[str, int] = {}
+        self.constants: typing.Dict[typing.Tuple[typing.Type, bytes], int] = {}
+        self.constant_records: typing.List[bytes] = []
+        self.opcodes: typing.Dict[str, int] = {}
+        self.code = array.array("H")
+        self.operands = array.array("I")
+
+    def name(self, name: str) -> int:
+        if name not in self.names:
+            self.names[name] = len(self.names)
+        return self.names[name]
+
+    def constant(self, value: typing.Any) -> int:
+        if not isinstance(value, TaggedValue) or value.tag not in CONSTANT_TAGS:
+            raise BytecodeFormatError(f"Literal {value} cannot be written")
+        kind = CONSTANT_TAGS.index(value.tag)
+        record = (FLOAT_CONSTANT if value.tag is float else CONSTANT).pack(
+            kind, value.value
+        )
+        key = (value.tag, record)
+        if key not in self.constants:
+            self.constants[key] = len(self.constant_records)
+            self.constant_records.append(record)
+        return self.constants[key]
+
+    def op(self, op: ops.ByteCodeOp) -> None:
+        if isinstance(op, (ops.StartSubroutineOp, ops.EndSubroutineOp)):
+            raise BytecodeFormatError(f"Op {op.op_code} is not legal in subroutines")
+        if op.op_code not in self.opcodes:
+            self.opcodes[op.op_code] = len(self.opcodes)
+        self.code.append(self.opcodes[op.op_code])
+        for op_field in fields(op):
+            value = getattr(op, op_field.name)
+            self.operands.append(
+                self.constant(value)
+                if op_field.name in LITERAL_FIELDS
+                else self.name(value)
+            )
+
+    def field_type(
+        self, field_type: drip_typing.ExpressionType
+    ) -> typing.Tuple[int, int]:
+        if isinstance(field_type, drip_typing.Placeholder):
+            return TYPE_PLACEHOLDER, self.name(field_type.name)
+        elif isinstance(field_type.type, drip_typing.PrimitiveType):
+            return TYPE_PRIMITIVE, self.name(field_type.type.serialize())
+        else:
+            return TYPE_STRUCTURE, self.structure_names[id(field_type.type.structure)]
+
+    def structures_section(
+        self, structures: typing.Dict[str, drip_typing.StructureDefinition]
+    ) -> bytes:
+        self.structure_names = {
+            id(structure): self.name(name) for name, structure in structures.items()
+        }
+        words = [len(structures)]
+        for name in structure_order(structures):
+            structure = structures[name]
+            words += [self.name(name), len(structure.type_parameters)]
+            words += [self.name(parameter) for parameter in structure.type_parameters]
+            words.append(len(structure.fields))
+            for field in structure.fields:
+                kind, reference = self.field_type(field.type)
+                words += [
+                    self.name(field.name),
+                    self.name(field.type_name),
+                    kind,
+                    reference,
+                ]
+        return words_to_bytes(words)
+
+    def subroutines_section(self, subroutines: typing.Dict[str, Subroutine]) -> bytes:
+        records = [U32.pack(len(subroutines))]
+        # lazy subroutines compile as they are enumerated
+        for name, subroutine in subroutines.items():
+            arguments_offset = len(self.operands)
+            self.operands.extend(
+                self.name(argument) for argument in subroutine.arguments
+            )
+            code_offset = len(self.code)
+            operands_offset = len(self.operands)
+            for op in subroutine.ops:
+                self.op(op)
+            max_stack_depth = subroutine.max_stack_depth
+            records.append(
+                SUBROUTINE.pack(
+                    self.name(name),
+                    -1 if max_stack_depth is None else max_stack_depth,
+                    len(subroutine.arguments),
+                    arguments_offset,
+                    len(subroutine.ops),
+                    code_offset,
+                    operands_offset,
+                )
+            )
+        return b"".join(records)
+
+    def write(self, program: Program) -> bytes:
+        # readers preallocate frames from the stored depths
+        program = annotate_stack_depths(program)
+        structures = self.structures_section(program.structures)
+        subroutines = self.subroutines_section(program.subroutines)
+        opcodes = words_to_bytes(
+            [len(self.opcodes)] + [self.name(op_code) for op_code in self.opcodes]
+        )
+        encoded_names = [name.encode() for name in self.names]
+        offsets = [0]
+        for encoded in encoded_names:
+            offsets.append(offsets[-1] + len(encoded))
+        names = words_to_bytes([len(encoded_names)] + offsets) + b"".join(encoded_names)
+        constants = U32.pack(len(self.constant_records)) + b"".join(
+            self.constant_records
+        )
+        sections = [
+            opcodes,
+            names,
+            constants,
+            structures,
+            subroutines,
+            little_endian(self.code),
+            little_endian(self.operands),
+        ]
+        section_offsets = []
+        offset = HEADER.size
+        body = []
+        for section in sections:
+            section_offsets.append(offset)
+            padded = section + b"\0" * (-len(section) % 4)
+            body.append(padded)
+            offset += len(padded)
+        flags = FLAG_VERIFIED if program.verified else 0
+        return HEADER.pack(MAGIC, FORMAT_VERSION, flags, *section_offsets) + b"".join(
+            body
+        )
+
+
+def words_to_bytes(words: typing.List[int]) -> bytes:
+    return little_endian(array.array("I", words))
+
+
+def little_endian(values: array.array) -> bytes:
+    if sys.byteorder != "little":
+        values = array.array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def dump_program(program: Program) -> bytes:
+    return BytecodeWriter().write(program)
+
+
+def write_program(program: Program, path: str) -> None:
+    with open(path, "wb") as f:
+        f.write(dump_program(program))
+
+
+def cast_section(
+    buffer: memoryview, offset: int, count: int, typecode: str
+) -> typing.Sequence[int]:
+    size = array.array(typecode).itemsize
+    if offset < 0 or count < 0 or offset + count * size > len(buffer):
+        raise BytecodeFormatError(f"Section at {offset} runs past the end of the file")
+    view = buffer[offset : offset + count * size]
+    if sys.byteorder == "little":
+        return view.cast(typecode)
+    values = array.array(typecode, view.tobytes())
+    values.byteswap()
+    return values
+
+
+class BytecodeFile:
+    # Reads a program straight out of a mapped file. Tables are views over
+    # the mapping, names and constants are decoded when first used, and each
+    # subroutine is decoded on its first call.
+    def __init__(self, buffer: typing.Union[bytes, mmap.mmap]):
+        self.buffer = memoryview(buffer)
+        if len(self.buffer) < HEADER.size:
+            raise BytecodeFormatError("File is too short")
+        magic, version, self.flags, *offsets = HEADER.unpack_from(self.buffer)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise BytecodeFormatError("Not a drip bytecode file of this version")
+        if any(offset > len(self.buffer) for offset in offsets):
+            raise BytecodeFormatError("Section offset past the end of the file")
+        with format_errors("sections"):
+            self.read_sections(*offsets)
+
+    def read_sections(
+        self,
+        opcodes_offset: int,
+        names_offset: int,
+        constants_offset: int,
+        structures_offset: int,
+        subroutines_offset: int,
+        code_offset: int,
+        operands_offset: int,
+    ) -> None:
+        self.constants_offset = constants_offset
+        self.name_count = self.u32(names_offset)
+        self.name_offsets = cast_section(
+            self.buffer, names_offset + 4, self.name_count + 1, "I"
+        )
+        self.names_blob = names_offset + 4 * (self.name_count + 2)
+        self.decoded_names: typing.List[typing.Optional[str]] = [None] * self.name_count
+        self.decoded_constants: typing.Dict[int, TaggedValue] = {}
+
+        opcode_count = self.u32(opcodes_offset)
+        ops_lookup = {op.op_code: op for op in ops.OPS}
+        self.op_types: typing.List[typing.Callable[..., ops.ByteCodeOp]] = []
+        for index in cast_section(self.buffer, opcodes_offset + 4, opcode_count, "I"):
+            op_code = self.name(index)
+            if op_code not in ops_lookup:
+                raise BytecodeFormatError(f"Unknown op {op_code}")
+            self.op_types.append(ops_lookup[op_code])
+        self.op_fields = [
+            tuple(op_field.name for op_field in fields(op_type))
+            for op_type in self.op_types
+        ]
+
+        self.subroutine_count = self.u32(subroutines_offset)
+        self.subroutines_offset = subroutines_offset + 4
+        if code_offset > operands_offset:
+            raise BytecodeFormatError("Code section overlaps the operands")
+        self.code = cast_section(
+            self.buffer, code_offset, (operands_offset - code_offset) // 2, "H"
+        )
+        self.operands = cast_section(
+            self.buffer,
+            operands_offset,
+            (len(self.buffer) - operands_offset) // 4,
+            "I",
+        )
+        self.structures = self.read_structures(structures_offset)
+
+    @classmethod
+    def open(cls, path: str) -> "BytecodeFile":
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def u32(self, offset: int) -> int:
+        return U32.unpack_from(self.buffer, offset)[0]
+
+    def name(self, index: int) -> str:
+        name = self.decoded_names[index]
+        if name is None:
+            start = self.names_blob + self.name_offsets[index]
+            end = self.names_blob + self.name_offsets[index + 1]
+            name = self.decoded_names[index] = str(self.buffer[start:end], "utf-8")
+        return name
+
+    def constant(self, index: int) -> TaggedValue:
+        if index not in self.decoded_constants:
+            offset = self.constants_offset + 4 + index * CONSTANT.size
+            kind = self.buffer[offset]
+            tag = CONSTANT_TAGS[kind]
+            record = FLOAT_CONSTANT if tag is float else CONSTANT
+            self.decoded_constants[index] = TaggedValue(
+                tag=tag, value=record.unpack_from(self.buffer, offset)[1]
+            )
+        return self.decoded_constants[index]
+
+    def read_structures(
+        self, offset: int
+    ) -> typing.Dict[str, drip_typing.StructureDefinition]:
+        structures: typing.Dict[str, drip_typing.StructureDefinition] = {}
+        count = self.u32(offset)
+        offset += 4
+        for _ in range(count):
+            name = self.name(self.u32(offset))
+            parameter_count = self.u32(offset + 4)
+            offset += 8
+            type_parameters = tuple(
+                self.name(self.u32(offset + 4 * i)) for i in range(parameter_count)
+            )
+            offset += 4 * parameter_count
+            field_count = self.u32(offset)
+            offset += 4
+            structure_fields = []
+            for _ in range(field_count):
+                field_name, type_name, kind, reference = (
+                    self.u32(offset + 4 * i) for i in range(4)
+                )
+                offset += 16
+                field_type: drip_typing.ExpressionType
+                if kind == TYPE_PLACEHOLDER:
+                    field_type = drip_typing.Placeholder(name=self.name(reference))
+                elif kind == TYPE_PRIMITIVE:
+                    field_type = drip_typing.PRIMITIVE_TYPES[self.name(reference)]
+                else:
+                    field_type = drip_typing.ConcreteType(
+                        type=drip_typing.StructureType(
+                            structure=structures[self.name(reference)]
+                        )
+                    )
+                structure_fields.append(
+                    drip_typing.ArgumentDefinition(
+                        name=self.name(field_name),
+                        type=field_type,
+                        type_name=self.name(type_name),
+                    )
+                )
+            structures[name] = drip_typing.StructureDefinition(
+                fields=tuple(structure_fields), type_parameters=type_parameters
+            )
+        return structures
+
+    def subroutine_records(
+        self,
+    ) -> typing.Dict[str, typing.Tuple[int, ...]]:
+        records = {}
+        for index in range(self.subroutine_count):
+            record = SUBROUTINE.unpack_from(
+                self.buffer, self.subroutines_offset + index * SUBROUTINE.size
+            )
+            records[self.name(record[0])] = record
+        return records
+
+    def arguments(self, record: typing.Tuple[int, ...]) -> typing.Tuple[str, ...]:
+        _, _, argument_count, arguments_offset, _, _, _ = record
+        return tuple(
+            self.name(self.operands[arguments_offset + i])
+            for i in range(argument_count)
+        )
+
+    def decode_op(self, opcode: int, operand: int) -> ops.ByteCodeOp:
+        op_fields = self.op_fields[opcode]
+        return self.op_types[opcode](
+            **{
+                op_field: self.constant(self.operands[operand + i])
+                if op_field in LITERAL_FIELDS
+                else self.name(self.operands[operand + i])
+                for i, op_field in enumerate(op_fields)
+            }
+        )
+
+    def decode_subroutine(self, record: typing.Tuple[int, ...]) -> Subroutine:
+        _, max_stack_depth, _, _, op_count, code_offset, operand = record
+        if code_offset + op_count > len(self.code):
+            raise BytecodeFormatError("Subroutine runs past the end of the code")
+        # no op pushes more than one value, so deeper frames are corrupt
+        if max_stack_depth > op_count:
+            raise BytecodeFormatError(f"Stack depth {max_stack_depth} is impossible")
+        decoded = []
+        for opcode in self.code[code_offset : code_offset + op_count]:
+            decoded.append(self.decode_op(opcode, operand))
+            operand += len(self.op_fields[opcode])
+        return Subroutine(
+            ops=tuple(decoded),
+            arguments=self.arguments(record),
+            max_stack_depth=None if max_stack_depth < 0 else max_stack_depth,
+        )
+
+    def program(self) -> Program:
+        # FLAG_VERIFIED only records that the writer had verified the program;
+        # a file cannot opt itself into the trusted paths, so programs load
+        # unverified and drip.verifier.load_program re-verifies them
+        with format_errors("subroutine table"):
+            records = self.subroutine_records()
+            arguments = {
+                name: self.arguments(record) for name, record in records.items()
+            }
+
+        # lazily decoded subroutines are annotated as they compile, like every
+        # other LazySubroutines source
+        def compile_subroutine(name: str) -> Subroutine:
+            with format_errors(f"subroutine {name}"):
+                subroutine = self.decode_subroutine(records[name])
+            return annotate_subroutine(program, subroutine)
+
+        program = Program(
+            subroutines=LazySubroutines(
+                arguments=arguments, compile_subroutine=compile_subroutine
+            ),
+            structures=self.structures,
+        )
+        return program
+
+
+def load_program_file(path: str) -> Program:
+    return BytecodeFile.open(path).program()
@@ -0,0 +1,107 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import typing
+from drip.compile_ast import compile_ast
+from drip.parse import parser
+from drip.program import Program
+
+# a hash of the drip sources, computed on first use, so any change to the
+# ops, the AST or the compiler invalidates every entry
+COMPILER_VERSION: typing.Optional[str] = None
+SOURCE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIRECTORY_NAME = "__dripcache__"
+CACHE_SUFFIX = ".dripc"
+MAGIC = b"DRIPC\n"
+
+
+def compiler_version() -> str:
+    global COMPILER_VERSION
+    if COMPILER_VERSION is None:
+        digest = hashlib.sha256()
+        for name in sorted(os.listdir(SOURCE_DIRECTORY)):
+            if name.endswith(".py"):
+                digest.update(name.encode())
+                digest.update(b"\0")
+                with open(os.path.join(SOURCE_DIRECTORY, name), "rb") as f:
+                    digest.update(f.read())
+        COMPILER_VERSION = digest.hexdigest()
+    return COMPILER_VERSION
+
+
+def cache_key(source: str) -> str:
+    digest = hashlib.sha256()
+    digest.update(compiler_version().encode())
+    digest.update(b"\0")
+    digest.update(source.encode())
+    return digest.hexdigest()
+
+
+def compile_source(source: str) -> Program:
+    program = parser.parse(source).finalize()
+    program.type_check()
+    return compile_ast(program)
+
+
+class BytecodeCache:
+    # Compiled programs keyed by a hash of their source and the compiler
+    # version, so a stale entry is never looked up rather than invalidated.
+    # Entries are written to a temporary file and renamed into place, so
+    # concurrent readers see either a complete entry or none.
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    def load(self, source: str) -> typing.Optional[Program]:
+        key = cache_key(source)
+        try:
+            with open(self.path(key), "rb") as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    return None
+                stored_key, program = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # a damaged entry, or one pickled by an incompatible build that
+            # names missing classes, is a miss; the next store replaces it
+            return None
+        if stored_key != key or not isinstance(program, Program):
+            return None
+        return program
+
+    def store(self, source: str, program: Program) -> None:
+        key = cache_key(source)
+        os.makedirs(self.directory, exist_ok=True)
+        descriptor, temporary_path = tempfile.mkstemp(
+            dir=self.directory, prefix=f".{key}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(descriptor, "wb") as f:
+                f.write(MAGIC)
+                pickle.dump((key, program), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, self.path(key))
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+    def compile(self, source: str) -> Program:
+        program = self.load(source)
+        if program is None:
+            program = compile_source(source)
+            self.store(source, program)
+        return program
+
+
+def load_source_file(
+    path: str, cache_directory: typing.Optional[str] = None
+) -> Program:
+    with open(path) as f:
+        source = f.read()
+    if cache_directory is None:
+        cache_directory = os.path.join(
+            os.path.dirname(os.path.abspath(path)), CACHE_DIRECTORY_NAME
+        )
+    return BytecodeCache(cache_directory).compile(source)
@@ -0,0 +1,269 @@
+import array
+import typing
+from dataclasses import dataclass, field, fields
+import drip.ops as ops
+from drip.basetypes import Frame, StackValue, StructureInstance, TaggedValue
+from drip.program import Program, Subroutine
+from drip.stack_depth import annotate_stack_depths
+
+# Opcodes are indices into ops.OPS, so they are the same in every code object
+OPCODES: typing.Dict[str, int] = {op.op_code: index for index, op in enumerate(ops.OPS)}
+OPERAND_SLOTS = 2
+NO_OPERAND = 0xFFFFFFFF
+# op fields holding literals index the constant table, all others the names
+LITERAL_FIELDS = {"value"}
+OP_FIELDS: typing.Tuple[typing.Tuple[str, ...], ...] = tuple(
+    tuple(op_field.name for op_field in fields(op)) for op in ops.OPS
+)
+
+
+class CodeObjectError(ValueError):
+    pass
+
+
+@dataclass
+class CodeObject:
+    # one opcode per instruction and OPERAND_SLOTS operand indices alongside
+    # it; names and constants live once each in the side tables
+    opcodes: array.array
+    operands: array.array
+    names: typing.List[str]
+    constants: typing.List[StackValue]
+    arguments: typing.Tuple[str, ...]
+    max_stack_depth: typing.Optional[int] = None
+
+    @classmethod
+    def from_subroutine(cls, subroutine: Subroutine) -> "CodeObject":
+        names: typing.Dict[str, int] = {}
+        constants: typing.Dict[typing.Tuple[typing.Any, ...], int] = {}
+        constant_values: typing.List[StackValue] = []
+        opcodes = array.array("H")
+        operands = array.array("I")
+
+        def constant(value: StackValue) -> int:
+            key = (
+                (value.tag, value.value)
+                if isinstance(value, TaggedValue)
+                else (id(value),)
+            )
+            if key not in constants:
+                constants[key] = len(constant_values)
+                constant_values.append(value)
+            return constants[key]
+
+        for op in subroutine.ops:
+            if isinstance(op, (ops.StartSubroutineOp, ops.EndSubroutineOp)):
+                raise CodeObjectError(f"Op {op.op_code} is not legal in subroutines")
+            opcodes.append(OPCODES[op.op_code])
+            slots = [NO_OPERAND] * OPERAND_SLOTS
+            for slot, op_field in enumerate(fields(op)):
+                value = getattr(op, op_field.name)
+                if op_field.name in LITERAL_FIELDS:
+                    slots[slot] = constant(value)
+                else:
+                    slots[slot] = names.setdefault(value, len(names))
+            operands.extend(slots)
+        return cls(
+            opcodes=opcodes,
+            operands=operands,
+            names=list(names),
+            constants=constant_values,
+            arguments=subroutine.arguments,
+            max_stack_depth=subroutine.max_stack_depth,
+        )
+
+    def __len__(self) -> int:
+        return len(self.opcodes)
+
+    def op(self, index: int) -> ops.ByteCodeOp:
+        opcode = self.opcodes[index]
+        operand = index * OPERAND_SLOTS
+        return ops.OPS[opcode](
+            **{
+                op_field: self.constants[self.operands[operand + slot]]
+                if op_field in LITERAL_FIELDS
+                else self.names[self.operands[operand + slot]]
+                for slot, op_field in enumerate(OP_FIELDS[opcode])
+            }
+        )
+
+    def to_subroutine(self) -> Subroutine:
+        return Subroutine(
+            ops=tuple(self.op(index) for index in range(len(self))),
+            arguments=self.arguments,
+            max_stack_depth=self.max_stack_depth,
+        )
+
+
+# Handlers take the frame, the code object and the instruction's two operand
+# indices and mirror the execute_trusted of the op they stand in for
+Handler = typing.Callable[[Frame, CodeObject, int, int], None]
+
+
+def return_value(frame: Frame, code: CodeObject, first: int, second: int) -> None:
+    frame.return_value = frame.pop()
+    frame.return_set = True
+
+
+def noop(frame: Frame, code: CodeObject, first: int, second: int) -> None:
+    pass
+
+
+def push_from_name(frame: Frame, code: CodeObject, first: int, second: int) -> None:
+    frame.push(frame.names[code.names[first]])
+
+
+def pop_to_name(frame: Frame, code: CodeObject, first: int, second: int) -> None:
+    frame.names[code.names[first]] = frame.pop()
+
+
+def push_from_literal(frame: Frame, code: CodeObject, first: int, second: int) -> None:
+    frame.push(code.constants[first])
+
+
+def store_from_literal(frame: Frame, code: CodeObject, first: int, second: int) -> None:
+    frame.names[code.names[first]] = code.constants[second]
+
+
+def binary_add(frame: Frame, code: CodeObject, first: int, second: int) -> None:
+    rhs = frame.pop()
+    lhs = frame.pop()
+    frame.push(TaggedValue(tag=lhs.tag, value=lhs.value + rhs.value))  # type: ignore
+
+
+def binary_subtract(frame: Frame, code: CodeObject, first: int, second: int) -> None:
+    lhs = frame.pop()
+    rhs = frame.pop()
+    frame.push(TaggedValue(tag=lhs.tag, value=lhs.value - rhs.value))  # type: ignore
+
+
+def print_name(frame: Frame, code: CodeObject, first: int, second: int) -> None:
+    print(frame.names[code.names[first]])
+
+
+def construct_structure(
+    frame: Frame, code: CodeObject, first: int, second: int
+) -> None:
+    structure = frame.structures[code.names[first]]
+    values = frame.pop_n(len(structure.fields))
+    frame.push(
+        StructureInstance(
+            structure=structure,
+            field_values={
+                field.name: value for field, value in zip(structure.fields, values)
+            },
+        )
+    )
+
+
+def pop_and_push_property(
+    frame: Frame, code: CodeObject, first: int, second: int
+) -> None:
+    top = frame.stack_pointer - 1
+    frame.stack[top] = frame.stack[top].field_values[code.names[first]]  # type: ignore
+
+
+def set_flag(frame: Frame, code: CodeObject, first: int, second: int) -> None:
+    frame.flags[code.names[first]] = frame.program_counter
+
+
+def branch_to_flag(frame: Frame, code: CodeObject, first: int, second: int) -> None:
+    if frame.pop().value:  # type: ignore
+        frame.program_counter = frame.flags[code.names[first]]
+
+
+HANDLERS: typing.Dict[typing.Type[ops.ByteCodeOp], Handler] = {
+    ops.ReturnOp: return_value,
+    ops.NoopOp: noop,
+    ops.PushFromNameOp: push_from_name,
+    ops.PopToNameOp: pop_to_name,
+    ops.PushFromLiteralOp: push_from_literal,
+    ops.StoreFromLiteralOp: store_from_literal,
+    ops.BinaryAddOp: binary_add,
+    ops.BinaryAddIntOp: binary_add,
+    ops.BinaryAddFloatOp: binary_add,
+    ops.BinarySubtractOp: binary_subtract,
+    ops.BinarySubtractIntOp: binary_subtract,
+    ops.BinarySubtractFloatOp: binary_subtract,
+    ops.PrintNameOp: print_name,
+    ops.ConstructStructureOp: construct_structure,
+    ops.PopAndPushPropertyOp: pop_and_push_property,
+    ops.PopAndPushPropertyOfKnownStructureOp: pop_and_push_property,
+    ops.SetFlagOp: set_flag,
+    ops.BranchToFlagOp: branch_to_flag,
+}
+HANDLER_TABLE: typing.Tuple[typing.Optional[Handler], ...] = tuple(
+    HANDLERS.get(op) for op in ops.OPS
+)
+CALL_SUBROUTINE = OPCODES[ops.CallSubroutineOp.op_code]
+
+
+@dataclass
+class CodeObjects:
+    program: Program
+    code: typing.Dict[str, CodeObject] = field(default_factory=dict)
+
+    def __getitem__(self, name: str) -> CodeObject:
+        if name not in self.code:
+            self.code[name] = CodeObject.from_subroutine(self.program.subroutines[name])
+        return self.code[name]
+
+
+def execute_code(
+    code_objects: CodeObjects, code: CodeObject, frame: Frame
+) -> StackValue:
+    # handlers skip runtime checks, so unverified programs run decoded ops
+    trusted = code_objects.program.verified
+    opcodes = code.opcodes
+    operands = code.operands
+    handlers = HANDLER_TABLE
+    count = len(opcodes)
+    while frame.program_counter < count and not frame.return_set:
+        index = frame.program_counter
+        opcode = opcodes[index]
+        operand = index * OPERAND_SLOTS
+        if opcode == CALL_SUBROUTINE:
+            callee = code_objects[code.names[operands[operand]]]
+            assert callee.max_stack_depth is not None
+            values = frame.pop_n(len(callee.arguments))
+            frame.push(
+                execute_code(
+                    code_objects,
+                    callee,
+                    Frame.allocate(
+                        callee.max_stack_depth,
+                        names=dict(zip(callee.arguments, values)),
+                        structures=frame.structures,
+                    ),
+                )
+            )
+        elif trusted:
+            handler = handlers[opcode]
+            if handler is None:
+                raise ValueError(
+                    f"Op {ops.OPS[opcode].op_code} not legal inside subroutines"
+                )
+            handler(frame, code, operands[operand], operands[operand + 1])
+        else:
+            op = code.op(index)
+            if not isinstance(op, ops.SubroutineOp):
+                raise ValueError(f"Op {op.op_code} not legal inside subroutines")
+            op.execute(frame)
+        frame.program_counter += 1
+    return (
+        frame.return_value
+        if frame.return_value is not None
+        else TaggedValue(tag=int, value=0)
+    )
+
+
+def execute_code_program(program: Program) -> StackValue:
+    program = annotate_stack_depths(program)
+    code_objects = CodeObjects(program)
+    main = code_objects["main"]
+    assert main.max_stack_depth is not None
+    return execute_code(
+        code_objects,
+        main,
+        Frame.allocate(main.max_stack_depth, structures=program.structures),
+    )
@@ -2,7 +2,11 @@ import typing
 import drip.ast as ast
 import drip.typecheck as drip_typing
 from drip.basetypes import TaggedValue
-from drip.program import Program, Subroutine
+from drip.program import LazySubroutines, Program, Subroutine
+from drip.verifier import load_program
+from drip.stack_depth import annotate_subroutine
+from drip.emitter import Emitter
+from drip.monomorphize import specialized_structure_lookup
 import drip.ops as ops
 
 
@@ -26,28 +30,21 @@ def order_arguments(
     return (expression for _, expression in ordered_value_entries)
 
 
-def prepare_stack(
+def expand_expression(
     program: ast.Program,
     expression: ast.Expression,
-) -> typing.Tuple[ops.ByteCodeOp, ...]:
+) -> typing.Tuple[typing.Iterable[ast.Expression], typing.Tuple[ops.ByteCodeOp, ...]]:
+    # the operands to push, in order, and the ops that consume them
     if isinstance(expression, ast.ConstructionExpression):
-        structure = program.structure_lookup[expression.type_name]
+        instance = program.instantiate(expression.type_name, expression.type_arguments)
         return (
-            sum(
-                (
-                    prepare_stack(program, argument_expression)
-                    for argument_expression in order_arguments(
-                        structure.fields, expression.arguments
-                    )
-                ),
-                start=tuple(),
-            )
-            + (ops.ConstructStructureOp(structure=expression.type_name),)
+            order_arguments(instance.structure.fields, expression.arguments),
+            (ops.ConstructStructureOp(structure=instance.name),),
         )
     elif isinstance(expression, ast.VariableReferenceExpression):
-        return (ops.PushFromNameOp(name=expression.name),)
+        return tuple(), (ops.PushFromNameOp(name=expression.name),)
     elif isinstance(expression, ast.LiteralExpression):
-        return (
+        return tuple(), (
             ops.PushFromLiteralOp(
                 value=TaggedValue(
                     tag=drip_typing.PRIMITIVES[expression.type_name],
@@ -56,44 +53,50 @@ def prepare_stack(
             ),
         )
     elif isinstance(expression, ast.PropertyAccessExpression):
-        return prepare_stack(program, expression.entity) + (
+        return (expression.entity,), (
             ops.PopAndPushPropertyOp(property=expression.property_name),
         )
     elif isinstance(expression, ast.BinaryOperatorExpression):
-        return (
-            prepare_stack(program, expression.lhs)
-            + prepare_stack(program, expression.rhs)
-            + operator_ops(expression.operator)
-        )
+        return (expression.lhs, expression.rhs), operator_ops(expression.operator)
     elif isinstance(expression, ast.FunctionCallExpression):
-        function = program.function_lookup[expression.function_name]
+        function = program.signature_lookup[expression.function_name]
         return (
-            sum(
-                (
-                    prepare_stack(program, argument_expression)
-                    for argument_expression in order_arguments(
-                        function.arguments, expression.arguments
-                    )
-                ),
-                start=tuple(),
-            )
-            + (ops.CallSubroutineOp(name=expression.function_name),)
+            order_arguments(function.arguments, expression.arguments),
+            (ops.CallSubroutineOp(name=expression.function_name),),
         )
     else:
         raise ValueError(f"Expression {expression} has unhandled type")
-    return tuple()
+
+
+def prepare_stack(
+    program: ast.Program,
+    expression: ast.Expression,
+    emitter: Emitter,
+) -> None:
+    # post-order walk with an explicit stack, so expression depth is not
+    # limited by the Python recursion limit
+    pending: typing.List[typing.Union[ast.Expression, ops.ByteCodeOp]] = [expression]
+    while len(pending) > 0:
+        item = pending.pop()
+        if isinstance(item, ops.ByteCodeOp):
+            emitter.emit(item)
+            continue
+        operands, consuming_ops = expand_expression(program, item)
+        pending.extend(reversed(consuming_ops))
+        pending.extend(reversed(tuple(operands)))
 
 
 def compile_statement_ast(
     program: ast.Program,
     statement: ast.Statement,
-) -> typing.Tuple[ops.ByteCodeOp, ...]:
+    emitter: Emitter,
+) -> None:
     if isinstance(statement, ast.AssignmentStatement):
-        return prepare_stack(program, statement.expression) + (
-            ops.PopToNameOp(name=statement.variable_name),
-        )
+        prepare_stack(program, statement.expression, emitter)
+        emitter.emit(ops.PopToNameOp(name=statement.variable_name))
     elif isinstance(statement, ast.ReturnStatement):
-        return prepare_stack(program, statement.expression) + (ops.ReturnOp(),)
+        prepare_stack(program, statement.expression, emitter)
+        emitter.emit(ops.ReturnOp())
     else:
         raise ValueError(f"Statement {statement} has unhandled type")
 
@@ -102,27 +105,56 @@ def compile_function_ast(
     program: ast.Program,
     function: ast.FunctionDefinition,
 ) -> Subroutine:
-    return Subroutine(
-        ops=sum(
-            (
-                compile_statement_ast(program, statement)
-                for statement in function.procedure
-            ),
-            start=tuple(),
-        ),
-        arguments=tuple(argument.name for argument in function.arguments),
+    emitter = Emitter()
+    for statement in function.procedure:
+        compile_statement_ast(program, statement, emitter)
+    return emitter.freeze(
+        arguments=tuple(argument.name for argument in function.arguments)
     )
 
 
-def compile_ast(program: ast.Program) -> Program:
-    subroutines = {
+def compile_subroutines(program: ast.Program) -> typing.Dict[str, Subroutine]:
+    return {
         function.name: compile_function_ast(program, function)
         for function in program.function_definitions
     }
 
+
+def compile_ast(program: ast.Program, lazy: bool = False) -> Program:
+    if lazy:
+        return compile_ast_lazily(program)
+
+    subroutines = compile_subroutines(program)
+
     assert "main" in subroutines
 
-    return Program(
-        subroutines=subroutines,
-        structures=program.structure_lookup,
+    return load_program(
+        Program(
+            subroutines=subroutines,
+            structures=specialized_structure_lookup(program),
+        )
+    )
+
+
+def compile_ast_lazily(program: ast.Program) -> Program:
+    # functions compile on their first call; specialized structures are added
+    # to the shared structures dict as the functions using them compile
+    def compile_subroutine(name: str) -> Subroutine:
+        subroutine = compile_function_ast(program, program.function_lookup[name])
+        structures.update(program.instantiations.structure_lookup())
+        return annotate_subroutine(compiled, subroutine)
+
+    assert "main" in program.function_lookup
+
+    structures = dict(program.structure_lookup)
+    compiled = Program(
+        subroutines=LazySubroutines(
+            arguments={
+                function.name: tuple(argument.name for argument in function.arguments)
+                for function in program.function_definitions
+            },
+            compile_subroutine=compile_subroutine,
+        ),
+        structures=structures,
     )
+    return compiled
@@ -0,0 +1,118 @@
+import typing
+import drip.ast as ast
+import drip.ops as ops
+from drip.compile_ast import operator_ops
+from drip.ir import (
+    IRFunction,
+    IRProgram,
+    ValueId,
+    ValueInstruction,
+    ArgumentInstruction,
+    ConstantInstruction,
+    ConstructInstruction,
+    PropertyInstruction,
+    BinaryInstruction,
+    CallInstruction,
+    ReturnInstruction,
+    lower_program,
+    value_name,
+)
+from drip.ir_passes import (
+    PassManager,
+    default_pass_manager,
+    profile_guided_pass_manager,
+)
+from drip.profile import Profile
+from drip.program import Program, Subroutine
+from drip.verifier import load_program
+
+
+class FunctionEmitter:
+    def __init__(self, function: IRFunction):
+        self.function = function
+        self.definitions = function.definitions()
+        self.use_counts = function.use_counts()
+        self.stored: typing.Set[ValueId] = set()
+        self.ops: typing.List[ops.ByteCodeOp] = []
+
+    def is_deferred(self, instruction: ValueInstruction) -> bool:
+        # arguments and constants are rematerialized at each use, and values
+        # used exactly once are computed in place on the stack
+        return (
+            isinstance(instruction, (ArgumentInstruction, ConstantInstruction))
+            or self.use_counts.get(instruction.result, 0) == 1
+        )
+
+    def push_value(self, value: ValueId) -> None:
+        if value in self.stored:
+            self.ops.append(ops.PushFromNameOp(name=value_name(value)))
+            return
+        instruction = self.definitions[value]
+        if isinstance(instruction, ArgumentInstruction):
+            self.ops.append(ops.PushFromNameOp(name=instruction.name))
+        elif isinstance(instruction, ConstantInstruction):
+            self.ops.append(ops.PushFromLiteralOp(value=instruction.value))
+        elif isinstance(instruction, ConstructInstruction):
+            for field in instruction.fields:
+                self.push_value(field)
+            self.ops.append(ops.ConstructStructureOp(structure=instruction.structure))
+        elif isinstance(instruction, PropertyInstruction):
+            self.push_value(instruction.entity)
+            self.ops.append(
+                ops.PopAndPushPropertyOp(property=instruction.property_name)
+            )
+        elif isinstance(instruction, BinaryInstruction):
+            self.push_value(instruction.lhs)
+            self.push_value(instruction.rhs)
+            self.ops.extend(operator_ops(instruction.operator))
+        elif isinstance(instruction, CallInstruction):
+            for argument in instruction.arguments:
+                self.push_value(argument)
+            self.ops.append(ops.CallSubroutineOp(name=instruction.function_name))
+        else:
+            raise ValueError(f"Instruction {instruction} has unhandled type")
+
+    def emit(self) -> Subroutine:
+        for instruction in self.function.instructions:
+            if isinstance(instruction, ReturnInstruction):
+                self.push_value(instruction.value)
+                self.ops.append(ops.ReturnOp())
+            elif isinstance(instruction, ValueInstruction):
+                if self.is_deferred(instruction):
+                    continue
+                if self.use_counts.get(instruction.result, 0) == 0:
+                    continue
+                self.push_value(instruction.result)
+                self.ops.append(ops.PopToNameOp(name=value_name(instruction.result)))
+                self.stored.add(instruction.result)
+            else:
+                raise ValueError(f"Instruction {instruction} has unhandled type")
+        return Subroutine(ops=tuple(self.ops), arguments=self.function.arguments)
+
+
+def compile_ir_function(function: IRFunction) -> Subroutine:
+    return FunctionEmitter(function).emit()
+
+
+def compile_ir(program: IRProgram) -> Program:
+    subroutines = {
+        function.name: compile_ir_function(function) for function in program.functions
+    }
+
+    assert "main" in subroutines
+
+    return load_program(Program(subroutines=subroutines, structures=program.structures))
+
+
+def compile_ast_via_ir(
+    program: ast.Program,
+    pass_manager: typing.Optional[PassManager] = None,
+    profile: typing.Optional[Profile] = None,
+) -> Program:
+    if pass_manager is None:
+        pass_manager = (
+            profile_guided_pass_manager(profile)
+            if profile is not None
+            else default_pass_manager()
+        )
+    return compile_ir(pass_manager.run(lower_program(program)))
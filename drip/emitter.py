@@ -0,0 +1,48 @@
+import typing
+import drip.ops as ops
+from drip.program import Subroutine
+
+
+class UnresolvedLabelError(ValueError):
+    pass
+
+
+class Emitter:
+    # Append-only bytecode buffer. Labels are flag names: BRANCH_TO_FLAG jumps
+    # to wherever the matching SET_FLAG ran, so a branch is patched by the
+    # SET_FLAG reaching it first at runtime. That only works backwards, so
+    # branches emitted before their label is marked are reported by freeze.
+    def __init__(self) -> None:
+        self.ops: typing.List[ops.ByteCodeOp] = []
+        self.labels: typing.Dict[str, typing.Optional[int]] = {}
+        self.forward_branches: typing.Dict[str, typing.List[int]] = {}
+
+    def emit(self, op: ops.ByteCodeOp) -> None:
+        self.ops.append(op)
+
+    def extend(self, new_ops: typing.Iterable[ops.ByteCodeOp]) -> None:
+        self.ops.extend(new_ops)
+
+    def new_label(self, prefix: str = "label") -> str:
+        label = f"{prefix}_{len(self.labels)}"
+        self.labels[label] = None
+        return label
+
+    def mark(self, label: str) -> None:
+        if self.labels.get(label) is not None:
+            raise ValueError(f"Label {label} is already marked")
+        self.labels[label] = len(self.ops)
+        self.emit(ops.SetFlagOp(flag=label))
+
+    def branch(self, label: str) -> None:
+        if self.labels.get(label) is None:
+            self.forward_branches.setdefault(label, []).append(len(self.ops))
+        self.emit(ops.BranchToFlagOp(flag=label))
+
+    def freeze(self, arguments: typing.Tuple[str, ...] = tuple()) -> Subroutine:
+        if len(self.forward_branches) > 0:
+            raise UnresolvedLabelError(
+                "Branches to labels that are not marked before them",
+                self.forward_branches,
+            )
+        return Subroutine(ops=tuple(self.ops), arguments=arguments)
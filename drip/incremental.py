@@ -0,0 +1,111 @@
+import hashlib
+import typing
+from dataclasses import dataclass, field
+import drip.ast as ast
+import drip.typecheck as drip_typing
+from drip.monomorphize import iter_function_expressions
+
+
+@dataclass(frozen=True)
+class Dependencies:
+    structures: typing.FrozenSet[str]
+    functions: typing.FrozenSet[str]
+
+
+def function_dependencies(function: ast.FunctionDefinition) -> Dependencies:
+    type_names = {argument.type_name for argument in function.arguments}
+    type_names.add(function.return_type_name)
+    functions = set()
+    for expression in iter_function_expressions(function):
+        if isinstance(expression, ast.ConstructionExpression):
+            type_names.add(expression.type_name)
+            type_names.update(expression.type_arguments.values())
+        elif isinstance(expression, ast.FunctionCallExpression):
+            functions.add(expression.function_name)
+    return Dependencies(
+        structures=frozenset(
+            name for name in type_names if name not in drip_typing.PRIMITIVES
+        ),
+        functions=frozenset(functions),
+    )
+
+
+def fingerprint(function: ast.FunctionDefinition) -> str:
+    return hashlib.sha256(function.serialize().encode()).hexdigest()
+
+
+@dataclass
+class FunctionCheck:
+    fingerprint: str
+    dependencies: Dependencies
+    # structure definitions and callee return types are interned, so an
+    # unchanged dependency is the identical object on the next check
+    structures: typing.Dict[str, typing.Optional[drip_typing.StructureDefinition]]
+    callee_return_types: typing.Dict[str, typing.Optional[drip_typing.ExpressionType]]
+    callee_arguments: typing.Dict[
+        str, typing.Optional[typing.Tuple[drip_typing.ArgumentDefinition, ...]]
+    ]
+    return_type: drip_typing.ExpressionType
+
+
+@dataclass
+class IncrementalTypeChecker:
+    checks: typing.Dict[str, FunctionCheck] = field(default_factory=dict)
+    # functions re-checked by the most recent type_check call
+    checked: typing.List[str] = field(default_factory=list)
+
+    def is_current(
+        self,
+        check: FunctionCheck,
+        function_fingerprint: str,
+        context: ast.TypeCheckingContext,
+    ) -> bool:
+        return (
+            check.fingerprint == function_fingerprint
+            and all(
+                context.structure_lookup.get(name) is structure
+                for name, structure in check.structures.items()
+            )
+            and all(
+                context.function_return_types.get(name) is return_type
+                for name, return_type in check.callee_return_types.items()
+            )
+            and all(
+                context.function_arguments.get(name) == arguments
+                for name, arguments in check.callee_arguments.items()
+            )
+        )
+
+    def type_check(self, program: ast.Program) -> ast.TypeCheckingContext:
+        context = program.type_checking_context()
+        checks: typing.Dict[str, FunctionCheck] = {}
+        self.checked = []
+        for function in program.function_definitions:
+            function_fingerprint = fingerprint(function)
+            check = self.checks.get(function.name)
+            if check is None or not self.is_current(
+                check, function_fingerprint, context
+            ):
+                dependencies = function_dependencies(function)
+                check = FunctionCheck(
+                    fingerprint=function_fingerprint,
+                    dependencies=dependencies,
+                    structures={
+                        name: context.structure_lookup.get(name)
+                        for name in dependencies.structures
+                    },
+                    callee_return_types={
+                        name: context.function_return_types.get(name)
+                        for name in dependencies.functions
+                    },
+                    callee_arguments={
+                        name: context.function_arguments.get(name)
+                        for name in dependencies.functions
+                    },
+                    return_type=function.type_check(context),
+                )
+                self.checked.append(function.name)
+            checks[function.name] = check
+            context.function_return_types[function.name] = check.return_type
+        self.checks = checks
+        return context
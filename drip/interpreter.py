@@ -2,12 +2,14 @@
 # rigorous: typed, immutable by default
 # apis at all layers (bytecode, ast, different syntaxes)
 # supports easy (de)serialization of datastructures
+from __future__ import annotations
 from collections import defaultdict
 from dataclasses import replace, field
 import typing
 import drip.ops as ops
 from drip.util import pop_n
 from drip.basetypes import (
+    Frame,
     Name,
     StackValue,
     Stack,
@@ -15,6 +17,13 @@ from drip.basetypes import (
     ByteCodeLine,
 )
 from drip.program import Program, Subroutine
+from drip.stack_depth import annotate_stack_depths
+
+if typing.TYPE_CHECKING:
+    # only passed in by callers that use them, so not needed to run bytecode
+    from drip.profile import Profile
+    from drip.adaptive import AdaptiveState
+    from drip.jit import JitState
 
 
 def interpret_subroutine(
@@ -62,3 +71,97 @@ def interpret_program(program: Program) -> StackValue:
         program.subroutines["main"],
         init_state=ops.FrameState(structures=program.structures),
     )
+
+
+def new_frame(
+    program: Program,
+    subroutine: Subroutine,
+    names: typing.Optional[typing.Dict[Name, StackValue]] = None,
+) -> Frame:
+    assert subroutine.max_stack_depth is not None
+    return Frame.allocate(
+        subroutine.max_stack_depth,
+        names=names if names is not None else {},
+        structures=program.structures,
+    )
+
+
+def execute_subroutine(
+    program: Program,
+    subroutine: Subroutine,
+    frame: Frame,
+    name: str = "main",
+    profile: typing.Optional[Profile] = None,
+    adaptive: typing.Optional[AdaptiveState] = None,
+    jit: typing.Optional[JitState] = None,
+) -> StackValue:
+    adaptive_code = (
+        adaptive.code_for(name, subroutine) if adaptive is not None else None
+    )
+    code = adaptive_code.ops if adaptive_code is not None else subroutine.ops
+    if profile is not None:
+        profile.record_call(name)
+    while frame.program_counter < len(code) and not frame.return_set:
+        index = frame.program_counter
+        op = code[index]
+        if isinstance(op, ops.SubroutineOp):
+            if adaptive_code is not None:
+                adaptive_code.execute(index, frame, trusted=program.verified)
+            elif program.verified:
+                op.execute_trusted(frame)
+            else:
+                op.execute(frame)
+        elif isinstance(op, ops.CallSubroutineOp):
+            subsubroutine = program.subroutines[op.name]
+            values = frame.pop_n(len(subsubroutine.arguments))
+            subframe = new_frame(
+                program, subsubroutine, names=dict(zip(subsubroutine.arguments, values))
+            )
+            frame.push(
+                execute_subroutine(
+                    program,
+                    subsubroutine,
+                    subframe,
+                    name=op.name,
+                    profile=profile,
+                    adaptive=adaptive,
+                    jit=jit,
+                )
+            )
+        else:
+            raise ValueError(f"Op {op.op_code} not legal inside subroutines")
+        if profile is not None:
+            profile.record_op(name, index)
+            if isinstance(op, ops.BranchToFlagOp):
+                profile.record_branch(name, index, taken=frame.program_counter != index)
+        if (
+            jit is not None
+            and frame.program_counter < index
+            and isinstance(op, ops.BranchToFlagOp)
+        ):
+            jit.on_back_edge(name, code, index, frame)
+        frame.program_counter += 1
+    return (
+        frame.return_value
+        if frame.return_value is not None
+        else TaggedValue(tag=int, value=0)
+    )
+
+
+def execute_program(
+    program: Program,
+    profile: typing.Optional[Profile] = None,
+    adaptive: typing.Optional[AdaptiveState] = None,
+    jit: typing.Optional[JitState] = None,
+) -> StackValue:
+    program = annotate_stack_depths(program)
+    main = program.subroutines["main"]
+    return execute_subroutine(
+        program,
+        main,
+        new_frame(program, main),
+        name="main",
+        profile=profile,
+        adaptive=adaptive,
+        jit=jit,
+    )
@@ -0,0 +1,344 @@
+from __future__ import annotations
+import abc
+import typing
+from dataclasses import replace
+import drip.ast as ast
+import drip.typecheck as drip_typing
+from drip.basetypes import TaggedValue
+from drip.monomorphize import specialized_structure_lookup
+from drip.validated_dataclass import validated_dataclass
+
+# SSA form: every instruction defines exactly one value, and every value is
+# defined exactly once. Variable names from the source are erased during
+# lowering; reassignment simply binds the name to a new value.
+
+ValueId = int
+
+
+def value_name(value: ValueId) -> str:
+    return f"%{value}"
+
+
+class Instruction(abc.ABC):
+    @abc.abstractmethod
+    def operands(self) -> typing.Tuple[ValueId, ...]:
+        ...
+
+    @abc.abstractmethod
+    def replace_operands(self, mapping: typing.Dict[ValueId, ValueId]) -> "Instruction":
+        ...
+
+    @abc.abstractmethod
+    def serialize(self) -> str:
+        ...
+
+
+class ValueInstruction(Instruction, abc.ABC):
+    result: ValueId
+
+
+@validated_dataclass
+class ArgumentInstruction(ValueInstruction):
+    result: ValueId
+    name: str
+
+    def operands(self) -> typing.Tuple[ValueId, ...]:
+        return tuple()
+
+    def replace_operands(
+        self, mapping: typing.Dict[ValueId, ValueId]
+    ) -> "ArgumentInstruction":
+        return self
+
+    def serialize(self) -> str:
+        return f"{value_name(self.result)} = argument {self.name}"
+
+
+@validated_dataclass
+class ConstantInstruction(ValueInstruction):
+    result: ValueId
+    value: TaggedValue
+
+    def operands(self) -> typing.Tuple[ValueId, ...]:
+        return tuple()
+
+    def replace_operands(
+        self, mapping: typing.Dict[ValueId, ValueId]
+    ) -> "ConstantInstruction":
+        return self
+
+    def serialize(self) -> str:
+        return f"{value_name(self.result)} = constant {self.value.tag.__name__} {self.value.value}"
+
+
+@validated_dataclass
+class ConstructInstruction(ValueInstruction):
+    result: ValueId
+    structure: str
+    fields: typing.Tuple[ValueId, ...]
+
+    def operands(self) -> typing.Tuple[ValueId, ...]:
+        return self.fields
+
+    def replace_operands(
+        self, mapping: typing.Dict[ValueId, ValueId]
+    ) -> "ConstructInstruction":
+        return replace(
+            self, fields=tuple(mapping.get(field, field) for field in self.fields)
+        )
+
+    def serialize(self) -> str:
+        fields = ", ".join(value_name(field) for field in self.fields)
+        return f"{value_name(self.result)} = construct {self.structure} ({fields})"
+
+
+@validated_dataclass
+class PropertyInstruction(ValueInstruction):
+    result: ValueId
+    entity: ValueId
+    property_name: str
+
+    def operands(self) -> typing.Tuple[ValueId, ...]:
+        return (self.entity,)
+
+    def replace_operands(
+        self, mapping: typing.Dict[ValueId, ValueId]
+    ) -> "PropertyInstruction":
+        return replace(self, entity=mapping.get(self.entity, self.entity))
+
+    def serialize(self) -> str:
+        return f"{value_name(self.result)} = property {value_name(self.entity)}.{self.property_name}"
+
+
+@validated_dataclass
+class BinaryInstruction(ValueInstruction):
+    result: ValueId
+    operator: ast.BinaryOperator
+    lhs: ValueId
+    rhs: ValueId
+
+    def operands(self) -> typing.Tuple[ValueId, ...]:
+        return (self.lhs, self.rhs)
+
+    def replace_operands(
+        self, mapping: typing.Dict[ValueId, ValueId]
+    ) -> "BinaryInstruction":
+        return replace(
+            self,
+            lhs=mapping.get(self.lhs, self.lhs),
+            rhs=mapping.get(self.rhs, self.rhs),
+        )
+
+    def serialize(self) -> str:
+        return f"{value_name(self.result)} = {value_name(self.lhs)} {self.operator.value} {value_name(self.rhs)}"
+
+
+@validated_dataclass
+class CallInstruction(ValueInstruction):
+    result: ValueId
+    function_name: str
+    arguments: typing.Tuple[ValueId, ...]
+
+    def operands(self) -> typing.Tuple[ValueId, ...]:
+        return self.arguments
+
+    def replace_operands(
+        self, mapping: typing.Dict[ValueId, ValueId]
+    ) -> "CallInstruction":
+        return replace(
+            self,
+            arguments=tuple(
+                mapping.get(argument, argument) for argument in self.arguments
+            ),
+        )
+
+    def serialize(self) -> str:
+        arguments = ", ".join(value_name(argument) for argument in self.arguments)
+        return f"{value_name(self.result)} = call {self.function_name} ({arguments})"
+
+
+@validated_dataclass
+class ReturnInstruction(Instruction):
+    value: ValueId
+
+    def operands(self) -> typing.Tuple[ValueId, ...]:
+        return (self.value,)
+
+    def replace_operands(
+        self, mapping: typing.Dict[ValueId, ValueId]
+    ) -> "ReturnInstruction":
+        return replace(self, value=mapping.get(self.value, self.value))
+
+    def serialize(self) -> str:
+        return f"return {value_name(self.value)}"
+
+
+@validated_dataclass
+class IRFunction:
+    name: str
+    arguments: typing.Tuple[str, ...]
+    instructions: typing.Tuple[Instruction, ...]
+
+    def definitions(self) -> typing.Dict[ValueId, ValueInstruction]:
+        return {
+            instruction.result: instruction
+            for instruction in self.instructions
+            if isinstance(instruction, ValueInstruction)
+        }
+
+    def use_counts(self) -> typing.Dict[ValueId, int]:
+        counts: typing.Dict[ValueId, int] = {}
+        for instruction in self.instructions:
+            for operand in instruction.operands():
+                counts[operand] = counts.get(operand, 0) + 1
+        return counts
+
+    def serialize(self) -> str:
+        return (
+            f"function {self.name} ({', '.join(self.arguments)}) {{"
+            + "".join(f"\n    {i.serialize()}" for i in self.instructions)
+            + "\n}"
+        )
+
+
+@validated_dataclass
+class IRProgram:
+    functions: typing.Tuple[IRFunction, ...]
+    structures: typing.Dict[str, drip_typing.StructureDefinition]
+
+    def function_lookup(self) -> typing.Dict[str, IRFunction]:
+        return {function.name: function for function in self.functions}
+
+    def serialize(self) -> str:
+        return "\n\n".join(function.serialize() for function in self.functions)
+
+
+def ordered_arguments(
+    definition: typing.Tuple[drip_typing.ArgumentDefinition, ...],
+    values: typing.Dict[str, ast.Expression],
+) -> typing.Tuple[ast.Expression, ...]:
+    return tuple(values[argument.name] for argument in definition)
+
+
+class FunctionLowering:
+    def __init__(self, program: ast.Program, function: ast.FunctionDefinition):
+        self.program = program
+        self.function = function
+        self.instructions: typing.List[Instruction] = []
+        self.scope: typing.Dict[str, ValueId] = {}
+        self.next_value = 0
+
+    def emit(self, instruction: ValueInstruction) -> ValueId:
+        self.instructions.append(instruction)
+        return instruction.result
+
+    def new_value(self) -> ValueId:
+        value = self.next_value
+        self.next_value += 1
+        return value
+
+    def lower_expression(self, expression: ast.Expression) -> ValueId:
+        if isinstance(expression, ast.LiteralExpression):
+            return self.emit(
+                ConstantInstruction(
+                    result=self.new_value(),
+                    value=TaggedValue(
+                        tag=drip_typing.PRIMITIVES[expression.type_name],
+                        value=expression.value,
+                    ),
+                )
+            )
+        elif isinstance(expression, ast.VariableReferenceExpression):
+            return self.scope[expression.name]
+        elif isinstance(expression, ast.ConstructionExpression):
+            instance = self.program.instantiate(
+                expression.type_name, expression.type_arguments
+            )
+            fields = tuple(
+                self.lower_expression(argument)
+                for argument in ordered_arguments(
+                    instance.structure.fields, expression.arguments
+                )
+            )
+            return self.emit(
+                ConstructInstruction(
+                    result=self.new_value(),
+                    structure=instance.name,
+                    fields=fields,
+                )
+            )
+        elif isinstance(expression, ast.PropertyAccessExpression):
+            entity = self.lower_expression(expression.entity)
+            return self.emit(
+                PropertyInstruction(
+                    result=self.new_value(),
+                    entity=entity,
+                    property_name=expression.property_name,
+                )
+            )
+        elif isinstance(expression, ast.BinaryOperatorExpression):
+            lhs = self.lower_expression(expression.lhs)
+            rhs = self.lower_expression(expression.rhs)
+            return self.emit(
+                BinaryInstruction(
+                    result=self.new_value(),
+                    operator=expression.operator,
+                    lhs=lhs,
+                    rhs=rhs,
+                )
+            )
+        elif isinstance(expression, ast.FunctionCallExpression):
+            function = self.program.signature_lookup[expression.function_name]
+            arguments = tuple(
+                self.lower_expression(argument)
+                for argument in ordered_arguments(
+                    function.arguments, expression.arguments
+                )
+            )
+            return self.emit(
+                CallInstruction(
+                    result=self.new_value(),
+                    function_name=expression.function_name,
+                    arguments=arguments,
+                )
+            )
+        else:
+            raise ValueError(f"Expression {expression} has unhandled type")
+
+    def lower(self) -> IRFunction:
+        for argument in self.function.arguments:
+            self.scope[argument.name] = self.emit(
+                ArgumentInstruction(result=self.new_value(), name=argument.name)
+            )
+        for statement in self.function.procedure:
+            if isinstance(statement, ast.AssignmentStatement):
+                self.scope[statement.variable_name] = self.lower_expression(
+                    statement.expression
+                )
+            elif isinstance(statement, ast.ReturnStatement):
+                self.instructions.append(
+                    ReturnInstruction(value=self.lower_expression(statement.expression))
+                )
+            else:
+                raise ValueError(f"Statement {statement} has unhandled type")
+        return IRFunction(
+            name=self.function.name,
+            arguments=tuple(argument.name for argument in self.function.arguments),
+            instructions=tuple(self.instructions),
+        )
+
+
+def lower_function(
+    program: ast.Program, function: ast.FunctionDefinition
+) -> IRFunction:
+    return FunctionLowering(program, function).lower()
+
+
+def lower_program(program: ast.Program) -> IRProgram:
+    return IRProgram(
+        functions=tuple(
+            lower_function(program, function)
+            for function in program.function_definitions
+        ),
+        structures=specialized_structure_lookup(program),
+    )
@@ -0,0 +1,232 @@
+import typing
+from dataclasses import fields, replace
+import drip.ast as ast
+from drip.basetypes import TaggedValue
+from drip.ir import (
+    IRFunction,
+    IRProgram,
+    Instruction,
+    ValueId,
+    ValueInstruction,
+    ConstantInstruction,
+    ConstructInstruction,
+    PropertyInstruction,
+    BinaryInstruction,
+    ArgumentInstruction,
+    CallInstruction,
+    ReturnInstruction,
+)
+from drip.profile import Profile
+
+Pass = typing.Callable[[IRProgram], IRProgram]
+FunctionPass = typing.Callable[[IRProgram, IRFunction], IRFunction]
+InlinePolicy = typing.Callable[[str, str], bool]
+
+
+def function_pass(function_pass: FunctionPass) -> Pass:
+    def run(program: IRProgram) -> IRProgram:
+        return replace(
+            program,
+            functions=tuple(
+                function_pass(program, function) for function in program.functions
+            ),
+        )
+
+    run.__name__ = function_pass.__name__
+    return run
+
+
+class PassManager:
+    def __init__(self, passes: typing.Iterable[Pass] = tuple()):
+        self.passes: typing.List[Pass] = list(passes)
+
+    def add(self, ir_pass: Pass) -> "PassManager":
+        self.passes.append(ir_pass)
+        return self
+
+    def run(self, program: IRProgram) -> IRProgram:
+        for ir_pass in self.passes:
+            program = ir_pass(program)
+        return program
+
+
+def fold_binary(
+    operator: ast.BinaryOperator, lhs: TaggedValue, rhs: TaggedValue
+) -> TaggedValue:
+    if operator == ast.BinaryOperator.ADD:
+        return TaggedValue(tag=lhs.tag, value=lhs.value + rhs.value)
+    elif operator == ast.BinaryOperator.SUBTRACT:
+        # mirrors BINARY_SUBTRACT, which subtracts the first pushed operand
+        return TaggedValue(tag=lhs.tag, value=rhs.value - lhs.value)
+    else:
+        raise ValueError(f"Unhandled operator {operator}")
+
+
+def propagate_constants_in_function(
+    program: IRProgram, function: IRFunction
+) -> IRFunction:
+    definitions: typing.Dict[ValueId, ValueInstruction] = {}
+    mapping: typing.Dict[ValueId, ValueId] = {}
+    instructions: typing.List[Instruction] = []
+    for instruction in function.instructions:
+        instruction = instruction.replace_operands(mapping)
+        if isinstance(instruction, BinaryInstruction):
+            lhs = definitions[instruction.lhs]
+            rhs = definitions[instruction.rhs]
+            if (
+                isinstance(lhs, ConstantInstruction)
+                and isinstance(rhs, ConstantInstruction)
+                and lhs.value.tag == rhs.value.tag
+            ):
+                instruction = ConstantInstruction(
+                    result=instruction.result,
+                    value=fold_binary(instruction.operator, lhs.value, rhs.value),
+                )
+        elif isinstance(instruction, PropertyInstruction):
+            entity = definitions[instruction.entity]
+            if isinstance(entity, ConstructInstruction):
+                structure = program.structures[entity.structure]
+                index = [field.name for field in structure.fields].index(
+                    instruction.property_name
+                )
+                mapping[instruction.result] = entity.fields[index]
+                continue
+        if isinstance(instruction, ValueInstruction):
+            definitions[instruction.result] = instruction
+        instructions.append(instruction)
+    return replace(function, instructions=tuple(instructions))
+
+
+def instruction_key(instruction: ValueInstruction) -> typing.Tuple[typing.Any, ...]:
+    return (type(instruction),) + tuple(
+        getattr(instruction, field.name)
+        for field in fields(instruction)
+        if field.name != "result"
+    )
+
+
+def eliminate_common_subexpressions_in_function(
+    program: IRProgram, function: IRFunction
+) -> IRFunction:
+    available: typing.Dict[typing.Tuple[typing.Any, ...], ValueId] = {}
+    mapping: typing.Dict[ValueId, ValueId] = {}
+    instructions: typing.List[Instruction] = []
+    for instruction in function.instructions:
+        instruction = instruction.replace_operands(mapping)
+        if isinstance(instruction, ValueInstruction):
+            key = instruction_key(instruction)
+            if key in available:
+                mapping[instruction.result] = available[key]
+                continue
+            available[key] = instruction.result
+        instructions.append(instruction)
+    return replace(function, instructions=tuple(instructions))
+
+
+def eliminate_dead_code_in_function(
+    program: IRProgram, function: IRFunction
+) -> IRFunction:
+    # drip functions have no side effects, so any unused value can go
+    live: typing.Set[ValueId] = set()
+    instructions: typing.List[Instruction] = []
+    for instruction in reversed(function.instructions):
+        if isinstance(instruction, ValueInstruction) and instruction.result not in live:
+            continue
+        live.update(instruction.operands())
+        instructions.append(instruction)
+    return replace(function, instructions=tuple(reversed(instructions)))
+
+
+def inline_call(
+    call: CallInstruction, callee: IRFunction, next_value: ValueId
+) -> typing.Tuple[typing.List[Instruction], ValueId, ValueId]:
+    renamed: typing.Dict[ValueId, ValueId] = {}
+    instructions: typing.List[Instruction] = []
+    for instruction in callee.instructions:
+        if isinstance(instruction, ArgumentInstruction):
+            index = callee.arguments.index(instruction.name)
+            renamed[instruction.result] = call.arguments[index]
+        elif isinstance(instruction, ReturnInstruction):
+            return instructions, renamed[instruction.value], next_value
+        elif isinstance(instruction, ValueInstruction):
+            instruction = instruction.replace_operands(renamed)
+            assert isinstance(instruction, ValueInstruction)
+            renamed[instruction.result] = next_value
+            instructions.append(replace(instruction, result=next_value))
+            next_value += 1
+    raise ValueError(f"Function {callee.name} never returns")
+
+
+def inline_calls_in_function(
+    function: IRFunction,
+    function_lookup: typing.Dict[str, IRFunction],
+    should_inline: InlinePolicy,
+    max_size: int,
+) -> IRFunction:
+    next_value = 1 + max(function.definitions().keys(), default=-1)
+    mapping: typing.Dict[ValueId, ValueId] = {}
+    instructions: typing.List[Instruction] = []
+    for instruction in function.instructions:
+        instruction = instruction.replace_operands(mapping)
+        if (
+            isinstance(instruction, CallInstruction)
+            and instruction.function_name != function.name
+            and instruction.function_name in function_lookup
+            and should_inline(function.name, instruction.function_name)
+            and len(function_lookup[instruction.function_name].instructions) <= max_size
+        ):
+            inlined, result, next_value = inline_call(
+                instruction, function_lookup[instruction.function_name], next_value
+            )
+            instructions.extend(inlined)
+            mapping[instruction.result] = result
+            continue
+        instructions.append(instruction)
+    return replace(function, instructions=tuple(instructions))
+
+
+def inline_calls(should_inline: InlinePolicy, max_size: int = 64) -> Pass:
+    def run(program: IRProgram) -> IRProgram:
+        # callees are inlined as they were before this pass, one level deep
+        function_lookup = program.function_lookup()
+        return replace(
+            program,
+            functions=tuple(
+                inline_calls_in_function(
+                    function, function_lookup, should_inline, max_size
+                )
+                for function in program.functions
+            ),
+        )
+
+    return run
+
+
+propagate_constants = function_pass(propagate_constants_in_function)
+eliminate_common_subexpressions = function_pass(
+    eliminate_common_subexpressions_in_function
+)
+eliminate_dead_code = function_pass(eliminate_dead_code_in_function)
+
+DEFAULT_PASSES: typing.Tuple[Pass, ...] = (
+    propagate_constants,
+    eliminate_common_subexpressions,
+    eliminate_dead_code,
+)
+
+
+def default_pass_manager() -> PassManager:
+    return PassManager(DEFAULT_PASSES)
+
+
+def profile_guided_pass_manager(
+    profile: Profile, hot_threshold: float = 0.1, max_inline_size: int = 64
+) -> PassManager:
+    hot = profile.hot_subroutines(hot_threshold)
+
+    def should_inline(caller: str, callee: str) -> bool:
+        return callee in hot and profile.call_counts.get(callee, 0) > 0
+
+    return PassManager(
+        (inline_calls(should_inline, max_size=max_inline_size),) + DEFAULT_PASSES
+    )
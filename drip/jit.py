@@ -0,0 +1,217 @@
+import typing
+from dataclasses import dataclass, field
+import drip.ops as ops
+from drip.basetypes import Frame, Name, TaggedValue
+
+HOT_LOOP_THRESHOLD = 16
+TRACEABLE_TAGS = (int, float)
+
+
+class NotTraceableError(Exception):
+    pass
+
+
+TraceFunction = typing.Callable[[Frame], bool]
+
+
+@dataclass
+class CompiledTrace:
+    header: int
+    branch: int
+    source: str
+    function: TraceFunction
+    runs: int = 0
+
+
+class TraceCompiler:
+    # Loop bodies between a SET_FLAG and the BRANCH_TO_FLAG jumping back to
+    # it are straight-line, so one observation of the tags of the names the
+    # loop reads determines the tag of every value in the trace. Stack slots
+    # and names become Python locals holding unboxed numbers.
+    def __init__(
+        self,
+        code: typing.Sequence[ops.ByteCodeOp],
+        header: int,
+        branch: int,
+        frame: Frame,
+    ):
+        self.code = code
+        self.header = header
+        self.branch = branch
+        self.frame = frame
+        self.live_in: typing.Dict[Name, typing.Type] = {}
+        self.tags: typing.Dict[Name, typing.Type] = {}
+        self.variables: typing.Dict[Name, str] = {}
+        self.constants: typing.List[typing.Any] = []
+        self.stack: typing.List[typing.Type] = []
+        self.lines: typing.List[str] = []
+
+    def variable(self, name: Name) -> str:
+        if name not in self.variables:
+            self.variables[name] = f"v{len(self.variables)}"
+        return self.variables[name]
+
+    def constant(self, value: typing.Any) -> str:
+        self.constants.append(value)
+        return f"k{len(self.constants) - 1}"
+
+    def push(self, expression: str, tag: typing.Type) -> None:
+        self.lines.append(f"s{len(self.stack)} = {expression}")
+        self.stack.append(tag)
+
+    def pop(self) -> typing.Tuple[str, typing.Type]:
+        if len(self.stack) == 0:
+            raise NotTraceableError("trace reads below the loop's stack base")
+        tag = self.stack.pop()
+        return f"s{len(self.stack)}", tag
+
+    def name_tag(self, name: Name) -> typing.Type:
+        if name not in self.tags:
+            value = self.frame.names.get(name)
+            if not isinstance(value, TaggedValue) or value.tag not in TRACEABLE_TAGS:
+                raise NotTraceableError(f"name {name} is not a traceable value")
+            self.live_in[name] = value.tag
+            self.tags[name] = value.tag
+        return self.tags[name]
+
+    def binary(self, op: ops.SubroutineOp) -> None:
+        if isinstance(op, (ops.BinaryAddOp, ops.BinaryAddIntOp, ops.BinaryAddFloatOp)):
+            rhs, rhs_tag = self.pop()
+            lhs, lhs_tag = self.pop()
+            if lhs_tag is not rhs_tag:
+                raise NotTraceableError("mismatched tags in addition")
+            tag = lhs_tag
+            expression = f"{lhs} + {rhs}"
+        else:
+            lhs, lhs_tag = self.pop()
+            rhs, rhs_tag = self.pop()
+            tag = lhs_tag
+            expression = f"{lhs} - {rhs}"
+        if isinstance(op, ops.TypedBinaryOp) and not (
+            lhs_tag is op.tag and rhs_tag is op.tag
+        ):
+            raise NotTraceableError(f"{op.op_code} guard would fail")
+        self.push(expression, tag)
+
+    def record(self, op: ops.ByteCodeOp) -> None:
+        if isinstance(op, ops.PushFromNameOp):
+            tag = self.name_tag(op.name)
+            self.push(self.variable(op.name), tag)
+        elif isinstance(op, ops.PopToNameOp):
+            expression, tag = self.pop()
+            self.lines.append(f"{self.variable(op.name)} = {expression}")
+            self.tags[op.name] = tag
+        elif isinstance(op, (ops.PushFromLiteralOp, ops.StoreFromLiteralOp)):
+            value = op.value
+            if not isinstance(value, TaggedValue) or value.tag not in TRACEABLE_TAGS:
+                raise NotTraceableError(f"literal {value} is not traceable")
+            if isinstance(op, ops.PushFromLiteralOp):
+                self.push(self.constant(value.value), value.tag)
+            else:
+                self.lines.append(
+                    f"{self.variable(op.name)} = {self.constant(value.value)}"
+                )
+                self.tags[op.name] = value.tag
+        elif isinstance(op, (ops.BinaryAddOp, ops.BinarySubtractOp, ops.TypedBinaryOp)):
+            self.binary(op)
+        elif isinstance(op, ops.PrintNameOp):
+            tag = self.name_tag(op.name)
+            self.lines.append(
+                f"print(TaggedValue(tag={tag.__name__}, value={self.variable(op.name)}))"
+            )
+        elif isinstance(op, ops.NoopOp):
+            pass
+        else:
+            raise NotTraceableError(f"op {op.op_code} is not traceable")
+
+    def compile(self) -> CompiledTrace:
+        branch = self.code[self.branch]
+        assert isinstance(branch, ops.BranchToFlagOp)
+        for op in self.code[self.header : self.branch]:
+            self.record(op)
+        condition, _ = self.pop()
+        if len(self.stack) != 0:
+            raise NotTraceableError("loop body leaves values on the stack")
+        for name, tag in self.live_in.items():
+            if self.tags[name] is not tag:
+                raise NotTraceableError(f"name {name} changes tag across iterations")
+
+        prologue = ["names = frame.names"]
+        for name, tag in self.live_in.items():
+            variable = self.variable(name)
+            prologue += [
+                f"b_{variable} = names.get({name!r})",
+                f"if b_{variable}.__class__ is not TaggedValue "
+                f"or b_{variable}.tag is not {tag.__name__}:",
+                "    return False",
+                f"{variable} = b_{variable}.value",
+            ]
+        loop = ["while True:"] + [
+            f"    {line}" for line in self.lines + [f"if not {condition}:", "    break"]
+        ]
+        epilogue = [
+            f"names[{name!r}] = TaggedValue(tag={self.tags[name].__name__}, "
+            f"value={self.variable(name)})"
+            for name in self.tags
+        ] + [f"frame.program_counter = {self.branch}", "return True"]
+        source = "def trace(frame):\n" + "".join(
+            f"    {line}\n" for line in prologue + loop + epilogue
+        )
+        namespace: typing.Dict[str, typing.Any] = {
+            f"k{index}": value for index, value in enumerate(self.constants)
+        }
+        namespace["TaggedValue"] = TaggedValue
+        exec(
+            compile(source, f"<drip trace {self.header}-{self.branch}>", "exec"),
+            namespace,
+        )
+        return CompiledTrace(
+            header=self.header,
+            branch=self.branch,
+            source=source,
+            function=namespace["trace"],
+        )
+
+
+def compile_trace(
+    code: typing.Sequence[ops.ByteCodeOp], header: int, branch: int, frame: Frame
+) -> typing.Optional[CompiledTrace]:
+    try:
+        return TraceCompiler(code, header, branch, frame).compile()
+    except NotTraceableError:
+        return None
+
+
+@dataclass
+class JitState:
+    threshold: int = HOT_LOOP_THRESHOLD
+    back_edges: typing.Dict[typing.Tuple[str, int], int] = field(default_factory=dict)
+    # None marks loops that were hot but could not be compiled
+    traces: typing.Dict[typing.Tuple[str, int], typing.Optional[CompiledTrace]] = field(
+        default_factory=dict
+    )
+
+    def on_back_edge(
+        self,
+        name: str,
+        code: typing.Sequence[ops.ByteCodeOp],
+        branch: int,
+        frame: Frame,
+    ) -> bool:
+        key = (name, branch)
+        if key in self.traces:
+            trace = self.traces[key]
+            if trace is None:
+                return False
+            if trace.function(frame):
+                trace.runs += 1
+                return True
+            return False
+        count = self.back_edges.get(key, 0) + 1
+        self.back_edges[key] = count
+        if count < self.threshold:
+            return False
+        # the branch has jumped to its SET_FLAG; the loop body starts after it
+        header = frame.program_counter + 1
+        self.traces[key] = compile_trace(code, header, branch, frame)
+        return self.on_back_edge(name, code, branch, frame)
@@ -1,4 +1,6 @@
+import sys
 import lib.ply.lex as lex
+from drip.tables import build_lexer
 
 tokens = (
     "NUMBER",
@@ -72,4 +74,4 @@ def t_error(t: lex.LexToken) -> lex.LexToken:
     t.lexer.skip(1)
 
 
-lexer = lex.lex()
+lexer = build_lexer(sys.modules[__name__])
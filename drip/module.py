@@ -0,0 +1,136 @@
+import typing
+import drip.ast as ast
+import drip.ops as ops
+from drip.compile_ast import compile_subroutines
+from drip.monomorphize import specialized_structure_lookup
+from drip.parse import parser
+from drip.program import Program, Subroutine
+from drip.typecheck import StructureDefinition
+from drip.validated_dataclass import validated_dataclass
+from drip.verifier import load_program
+
+
+class LinkError(ValueError):
+    pass
+
+
+@validated_dataclass
+class CompiledModule:
+    name: str
+    subroutines: typing.Dict[str, Subroutine]
+    # own structures plus the generic instantiations its code constructs
+    structures: typing.Dict[str, StructureDefinition]
+    exported_structures: typing.Tuple[ast.NamedStructureDefinition, ...]
+    exported_functions: typing.Tuple[ast.FunctionSignature, ...]
+    # the signatures this module's calls were compiled against
+    imported_functions: typing.Tuple[ast.FunctionSignature, ...]
+    # the structure layouts its constructions and field accesses assume
+    imported_structures: typing.Tuple[ast.NamedStructureDefinition, ...]
+    dependencies: typing.Tuple[str, ...]
+
+
+def compile_module(
+    name: str,
+    source: typing.Union[str, ast.ProgramPreliminary],
+    dependencies: typing.Sequence[CompiledModule] = tuple(),
+) -> CompiledModule:
+    preliminary = parser.parse(source) if isinstance(source, str) else source
+    imported_structures = tuple(
+        structure
+        for dependency in dependencies
+        for structure in dependency.exported_structures
+    )
+    program = preliminary.finalize(
+        imported_structures=imported_structures,
+        imported_functions=tuple(
+            signature
+            for dependency in dependencies
+            for signature in dependency.exported_functions
+        ),
+    )
+    program.type_check()
+    subroutines = compile_subroutines(program)
+    imported_names = {structure.name for structure in imported_structures}
+    called = {
+        op.name
+        for subroutine in subroutines.values()
+        for op in subroutine.ops
+        if isinstance(op, ops.CallSubroutineOp)
+    }
+    return CompiledModule(
+        name=name,
+        subroutines=subroutines,
+        structures={
+            structure_name: structure
+            for structure_name, structure in specialized_structure_lookup(
+                program
+            ).items()
+            if structure_name not in imported_names
+        },
+        exported_structures=program.structure_definitions,
+        exported_functions=tuple(
+            function.signature for function in program.function_definitions
+        ),
+        imported_functions=tuple(
+            signature
+            for signature in program.imported_functions
+            if signature.name in called
+        ),
+        imported_structures=imported_structures,
+        dependencies=tuple(dependency.name for dependency in dependencies),
+    )
+
+
+def link(modules: typing.Sequence[CompiledModule]) -> Program:
+    subroutines: typing.Dict[str, Subroutine] = {}
+    structures: typing.Dict[str, StructureDefinition] = {}
+    owners: typing.Dict[str, str] = {}
+    exports: typing.Dict[str, ast.FunctionSignature] = {}
+    structure_exports: typing.Dict[str, ast.NamedStructureDefinition] = {}
+    for module in modules:
+        for name, subroutine in module.subroutines.items():
+            if name in subroutines:
+                raise LinkError(
+                    f"Subroutine {name} is defined in {owners[name]} and {module.name}"
+                )
+            subroutines[name] = subroutine
+            owners[name] = module.name
+        for name, structure in module.structures.items():
+            # types are interned, so the same definition is the same object
+            if structures.get(name, structure) is not structure:
+                raise LinkError(f"Conflicting definitions of structure {name}")
+            structures[name] = structure
+        for signature in module.exported_functions:
+            exports[signature.name] = signature
+        for definition in module.exported_structures:
+            structure_exports[definition.name] = definition
+
+    names = {module.name for module in modules}
+    for module in modules:
+        for dependency in module.dependencies:
+            if dependency not in names:
+                raise LinkError(f"{module.name} depends on missing module {dependency}")
+        for signature in module.imported_functions:
+            if signature.name not in exports:
+                raise LinkError(
+                    f"Unresolved function {signature.name} in {module.name}"
+                )
+            if exports[signature.name] != signature:
+                raise LinkError(
+                    f"{module.name} was compiled against a different signature "
+                    f"of {signature.name}"
+                )
+        for definition in module.imported_structures:
+            if definition.name not in structure_exports:
+                raise LinkError(
+                    f"Unresolved structure {definition.name} in {module.name}"
+                )
+            if structure_exports[definition.name] != definition:
+                raise LinkError(
+                    f"{module.name} was compiled against a different definition "
+                    f"of structure {definition.name}"
+                )
+    if "main" not in subroutines:
+        raise LinkError("No main subroutine")
+
+    return load_program(Program(subroutines=subroutines, structures=structures))
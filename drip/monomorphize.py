@@ -0,0 +1,53 @@
+import typing
+import drip.ast as ast
+from drip.typecheck import StructureDefinition
+
+
+def expression_children(
+    expression: ast.Expression,
+) -> typing.Tuple[ast.Expression, ...]:
+    if isinstance(expression, ast.ConstructionExpression):
+        return tuple(expression.arguments.values())
+    elif isinstance(expression, ast.FunctionCallExpression):
+        return tuple(expression.arguments.values())
+    elif isinstance(expression, ast.PropertyAccessExpression):
+        return (expression.entity,)
+    elif isinstance(expression, ast.BinaryOperatorExpression):
+        return (expression.lhs, expression.rhs)
+    else:
+        return tuple()
+
+
+def iter_function_expressions(
+    function: ast.FunctionDefinition,
+) -> typing.Generator[ast.Expression, None, None]:
+    pending = [statement.expression for statement in reversed(function.procedure)]
+    while len(pending) > 0:
+        expression = pending.pop()
+        yield expression
+        pending.extend(reversed(expression_children(expression)))
+
+
+def iter_expressions(
+    program: ast.Program,
+) -> typing.Generator[ast.Expression, None, None]:
+    for function in program.function_definitions:
+        yield from iter_function_expressions(function)
+
+
+def monomorphize(program: ast.Program) -> typing.Dict[str, StructureDefinition]:
+    # one specialized structure per distinct instantiation, shared with the
+    # type checker through program.instantiations
+    for expression in iter_expressions(program):
+        if (
+            isinstance(expression, ast.ConstructionExpression)
+            and len(expression.type_arguments) > 0
+        ):
+            program.instantiate(expression.type_name, expression.type_arguments)
+    return program.instantiations.structure_lookup()
+
+
+def specialized_structure_lookup(
+    program: ast.Program,
+) -> typing.Dict[str, StructureDefinition]:
+    return {**program.structure_lookup, **monomorphize(program)}
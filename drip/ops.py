@@ -2,13 +2,14 @@ import abc
 from dataclasses import field, replace
 from enum import Enum, auto
 import typing
-import drip.ast as ast
+import drip.typecheck as drip_typing
 from drip.basetypes import (
     Name,
     Stack,
     StackValue,
     TaggedValue,
     ByteCodeLine,
+    Frame,
     FrameState,
     StructureInstance,
 )
@@ -69,15 +70,38 @@ class CallSubroutineOp(ByteCodeOp):
         return cls(name=line.arguments[0])
 
 
+@validated_dataclass
+class StackEffect:
+    pops: int
+    pushes: int
+
+
 class SubroutineOp(ByteCodeOp, abc.ABC):
+    pops: typing.ClassVar[int] = 0
+    pushes: typing.ClassVar[int] = 0
+
     @abc.abstractmethod
     def interpret(self, state: FrameState) -> FrameState:
         ...
 
+    @abc.abstractmethod
+    def execute(self, frame: Frame) -> None:
+        ...
+
+    def execute_trusted(self, frame: Frame) -> None:
+        # only called for verified programs, so may skip runtime checks
+        self.execute(frame)
+
+    def stack_effect(
+        self, structures: typing.Dict[str, drip_typing.StructureDefinition]
+    ) -> StackEffect:
+        return StackEffect(pops=self.pops, pushes=self.pushes)
+
 
 @validated_dataclass
 class ReturnOp(SubroutineOp):
     op_code: typing.ClassVar[str] = "RETURN"
+    pops: typing.ClassVar[int] = 1
 
     @classmethod
     def parse_asm(cls, line: ByteCodeLine) -> "ReturnOp":
@@ -92,6 +116,15 @@ class ReturnOp(SubroutineOp):
             state, return_value=popped.value, return_set=True, stack=popped.stack
         )
 
+    def execute(self, frame: Frame) -> None:
+        assert frame.return_set is False
+        frame.return_value = frame.pop()
+        frame.return_set = True
+
+    def execute_trusted(self, frame: Frame) -> None:
+        frame.return_value = frame.pop()
+        frame.return_set = True
+
 
 @validated_dataclass
 class NoopOp(SubroutineOp):
@@ -106,10 +139,14 @@ class NoopOp(SubroutineOp):
     def interpret(self, state: FrameState) -> FrameState:
         return state
 
+    def execute(self, frame: Frame) -> None:
+        pass
+
 
 @validated_dataclass
 class PushFromNameOp(SubroutineOp):
     op_code: typing.ClassVar[str] = "PUSH_FROM_NAME"
+    pushes: typing.ClassVar[int] = 1
     name: Name
 
     @classmethod
@@ -121,10 +158,14 @@ class PushFromNameOp(SubroutineOp):
     def interpret(self, state: FrameState) -> FrameState:
         return replace(state, stack=state.stack + (state.names[self.name],))
 
+    def execute(self, frame: Frame) -> None:
+        frame.push(frame.names[self.name])
+
 
 @validated_dataclass
 class PopToNameOp(SubroutineOp):
     op_code: typing.ClassVar[str] = "POP_TO_NAME"
+    pops: typing.ClassVar[int] = 1
     name: Name
 
     @classmethod
@@ -139,10 +180,14 @@ class PopToNameOp(SubroutineOp):
             state, names={**state.names, self.name: popped.value}, stack=popped.stack
         )
 
+    def execute(self, frame: Frame) -> None:
+        frame.names[self.name] = frame.pop()
+
 
 @validated_dataclass
 class PushFromLiteralOp(SubroutineOp):
     op_code: typing.ClassVar[str] = "PUSH_FROM_LITERAL"
+    pushes: typing.ClassVar[int] = 1
     value: StackValue
 
     @classmethod
@@ -158,6 +203,9 @@ class PushFromLiteralOp(SubroutineOp):
     def interpret(self, state: FrameState) -> FrameState:
         return replace(state, stack=state.stack + (self.value,))
 
+    def execute(self, frame: Frame) -> None:
+        frame.push(self.value)
+
 
 @validated_dataclass
 class StoreFromLiteralOp(SubroutineOp):
@@ -179,10 +227,15 @@ class StoreFromLiteralOp(SubroutineOp):
     def interpret(self, state: FrameState) -> FrameState:
         return replace(state, names={**state.names, self.name: self.value})
 
+    def execute(self, frame: Frame) -> None:
+        frame.names[self.name] = self.value
+
 
 @validated_dataclass
 class BinaryAddOp(SubroutineOp):
     op_code: typing.ClassVar[str] = "BINARY_ADD"
+    pops: typing.ClassVar[int] = 2
+    pushes: typing.ClassVar[int] = 1
 
     @classmethod
     def parse_asm(cls, line: ByteCodeLine) -> "BinaryAddOp":
@@ -208,10 +261,27 @@ class BinaryAddOp(SubroutineOp):
             ),
         )
 
+    def execute(self, frame: Frame) -> None:
+        rhs = frame.pop()
+        lhs = frame.pop()
+        assert (
+            isinstance(lhs, TaggedValue)
+            and isinstance(rhs, TaggedValue)
+            and lhs.tag == rhs.tag
+        )
+        frame.push(TaggedValue(tag=lhs.tag, value=lhs.value + rhs.value))
+
+    def execute_trusted(self, frame: Frame) -> None:
+        rhs = frame.pop()
+        lhs = frame.pop()
+        frame.push(TaggedValue(tag=lhs.tag, value=lhs.value + rhs.value))  # type: ignore
+
 
 @validated_dataclass
 class BinarySubtractOp(SubroutineOp):
     op_code: typing.ClassVar[str] = "BINARY_SUBTRACT"
+    pops: typing.ClassVar[int] = 2
+    pushes: typing.ClassVar[int] = 1
 
     @classmethod
     def parse_asm(cls, line: ByteCodeLine) -> "BinarySubtractOp":
@@ -236,6 +306,18 @@ class BinarySubtractOp(SubroutineOp):
             ),
         )
 
+    def execute(self, frame: Frame) -> None:
+        lhs = frame.pop()
+        rhs = frame.pop()
+        assert isinstance(lhs, TaggedValue)
+        assert isinstance(rhs, TaggedValue)
+        frame.push(TaggedValue(tag=lhs.tag, value=lhs.value - rhs.value))
+
+    def execute_trusted(self, frame: Frame) -> None:
+        lhs = frame.pop()
+        rhs = frame.pop()
+        frame.push(TaggedValue(tag=lhs.tag, value=lhs.value - rhs.value))  # type: ignore
+
 
 @validated_dataclass
 class PrintNameOp(SubroutineOp):
@@ -252,10 +334,14 @@ class PrintNameOp(SubroutineOp):
         print(state.names[self.name])
         return state
 
+    def execute(self, frame: Frame) -> None:
+        print(frame.names[self.name])
+
 
 @validated_dataclass
 class ConstructStructureOp(SubroutineOp):
     op_code: typing.ClassVar[str] = "CONSTRUCT_STRUCTURE"
+    pushes: typing.ClassVar[int] = 1
     structure: Name
 
     @classmethod
@@ -280,10 +366,31 @@ class ConstructStructureOp(SubroutineOp):
             stack=popped.stack + (instance,),
         )
 
+    def execute(self, frame: Frame) -> None:
+        structure = frame.structures[self.structure]
+        values = frame.pop_n(len(structure.fields))
+        frame.push(
+            StructureInstance(
+                structure=structure,
+                field_values={
+                    field.name: value for field, value in zip(structure.fields, values)
+                },
+            )
+        )
+
+    def stack_effect(
+        self, structures: typing.Dict[str, drip_typing.StructureDefinition]
+    ) -> StackEffect:
+        return StackEffect(
+            pops=len(structures[self.structure].fields), pushes=self.pushes
+        )
+
 
 @validated_dataclass
 class PopAndPushPropertyOp(SubroutineOp):
     op_code: typing.ClassVar[str] = "POP_AND_PUSH_PROPERTY"
+    pops: typing.ClassVar[int] = 1
+    pushes: typing.ClassVar[int] = 1
     property: Name
 
     @classmethod
@@ -301,6 +408,14 @@ class PopAndPushPropertyOp(SubroutineOp):
             stack=popped.stack + (popped.value.field_values[self.property],),
         )
 
+    def execute(self, frame: Frame) -> None:
+        value = frame.pop()
+        assert isinstance(value, StructureInstance)
+        frame.push(value.field_values[self.property])
+
+    def execute_trusted(self, frame: Frame) -> None:
+        frame.push(frame.pop().field_values[self.property])  # type: ignore
+
 
 @validated_dataclass
 class SetFlagOp(SubroutineOp):
@@ -317,10 +432,18 @@ class SetFlagOp(SubroutineOp):
         assert self.flag not in state.flags
         return replace(state, flags={**state.flags, self.flag: state.program_counter})
 
+    def execute(self, frame: Frame) -> None:
+        assert self.flag not in frame.flags
+        frame.flags[self.flag] = frame.program_counter
+
+    def execute_trusted(self, frame: Frame) -> None:
+        frame.flags[self.flag] = frame.program_counter
+
 
 @validated_dataclass
 class BranchToFlagOp(SubroutineOp):
     op_code: typing.ClassVar[str] = "BRANCH_TO_FLAG"
+    pops: typing.ClassVar[int] = 1
     flag: Name
 
     @classmethod
@@ -342,6 +465,144 @@ class BranchToFlagOp(SubroutineOp):
             else state.program_counter,
         )
 
+    def execute(self, frame: Frame) -> None:
+        assert self.flag in frame.flags
+        value = frame.pop()
+        assert isinstance(value, TaggedValue)
+        if value.value:
+            frame.program_counter = frame.flags[self.flag]
+
+    def execute_trusted(self, frame: Frame) -> None:
+        if frame.pop().value:  # type: ignore
+            frame.program_counter = frame.flags[self.flag]
+
+
+class SpecializedOp(SubroutineOp, abc.ABC):
+    # a generic op narrowed to the operand types it was observed with;
+    # whenever the guard fails it behaves exactly like the generic op
+    @abc.abstractmethod
+    def guard(self, frame: Frame) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def generic(self) -> SubroutineOp:
+        ...
+
+    def interpret(self, state: FrameState) -> FrameState:
+        return self.generic().interpret(state)
+
+    def execute(self, frame: Frame) -> None:
+        if self.guard(frame):
+            self.execute_trusted(frame)
+        else:
+            self.generic().execute(frame)
+
+    @abc.abstractmethod
+    def execute_trusted(self, frame: Frame) -> None:
+        ...
+
+
+class TypedBinaryOp(SpecializedOp, abc.ABC):
+    pops: typing.ClassVar[int] = 2
+    pushes: typing.ClassVar[int] = 1
+    tag: typing.ClassVar[typing.Type]
+    generic_type: typing.ClassVar[typing.Type[SubroutineOp]]
+
+    @classmethod
+    def parse_asm(cls: typing.Type[C], line: ByteCodeLine) -> C:
+        assert cls.op_code == line.op_code  # type: ignore
+        assert len(line.arguments) == 0
+        return cls()
+
+    def guard(self, frame: Frame) -> bool:
+        lhs = frame.stack[frame.stack_pointer - 2]
+        rhs = frame.stack[frame.stack_pointer - 1]
+        return (
+            isinstance(lhs, TaggedValue)
+            and isinstance(rhs, TaggedValue)
+            and lhs.tag is self.tag
+            and rhs.tag is self.tag
+        )
+
+    def generic(self) -> SubroutineOp:
+        return self.generic_type()
+
+
+@validated_dataclass
+class BinaryAddIntOp(TypedBinaryOp):
+    op_code: typing.ClassVar[str] = "BINARY_ADD_INT_INT"
+    tag: typing.ClassVar[typing.Type] = int
+    generic_type: typing.ClassVar[typing.Type[SubroutineOp]] = BinaryAddOp
+
+    def execute_trusted(self, frame: Frame) -> None:
+        rhs = frame.pop()
+        lhs = frame.pop()
+        frame.push(TaggedValue(tag=int, value=lhs.value + rhs.value))  # type: ignore
+
+
+@validated_dataclass
+class BinaryAddFloatOp(TypedBinaryOp):
+    op_code: typing.ClassVar[str] = "BINARY_ADD_FLOAT_FLOAT"
+    tag: typing.ClassVar[typing.Type] = float
+    generic_type: typing.ClassVar[typing.Type[SubroutineOp]] = BinaryAddOp
+
+    def execute_trusted(self, frame: Frame) -> None:
+        rhs = frame.pop()
+        lhs = frame.pop()
+        frame.push(TaggedValue(tag=float, value=lhs.value + rhs.value))  # type: ignore
+
+
+@validated_dataclass
+class BinarySubtractIntOp(TypedBinaryOp):
+    op_code: typing.ClassVar[str] = "BINARY_SUBTRACT_INT_INT"
+    tag: typing.ClassVar[typing.Type] = int
+    generic_type: typing.ClassVar[typing.Type[SubroutineOp]] = BinarySubtractOp
+
+    def execute_trusted(self, frame: Frame) -> None:
+        lhs = frame.pop()
+        rhs = frame.pop()
+        frame.push(TaggedValue(tag=int, value=lhs.value - rhs.value))  # type: ignore
+
+
+@validated_dataclass
+class BinarySubtractFloatOp(TypedBinaryOp):
+    op_code: typing.ClassVar[str] = "BINARY_SUBTRACT_FLOAT_FLOAT"
+    tag: typing.ClassVar[typing.Type] = float
+    generic_type: typing.ClassVar[typing.Type[SubroutineOp]] = BinarySubtractOp
+
+    def execute_trusted(self, frame: Frame) -> None:
+        lhs = frame.pop()
+        rhs = frame.pop()
+        frame.push(TaggedValue(tag=float, value=lhs.value - rhs.value))  # type: ignore
+
+
+@validated_dataclass
+class PopAndPushPropertyOfKnownStructureOp(SpecializedOp):
+    op_code: typing.ClassVar[str] = "POP_AND_PUSH_PROPERTY_OF_KNOWN_STRUCTURE"
+    pops: typing.ClassVar[int] = 1
+    pushes: typing.ClassVar[int] = 1
+    property: Name
+    structure: Name
+
+    @classmethod
+    def parse_asm(cls, line: ByteCodeLine) -> "PopAndPushPropertyOfKnownStructureOp":
+        assert cls.op_code == line.op_code
+        assert len(line.arguments) == 2
+        return cls(property=line.arguments[0], structure=line.arguments[1])
+
+    def guard(self, frame: Frame) -> bool:
+        value = frame.stack[frame.stack_pointer - 1]
+        return isinstance(
+            value, StructureInstance
+        ) and value.structure is frame.structures.get(self.structure)
+
+    def generic(self) -> SubroutineOp:
+        return PopAndPushPropertyOp(property=self.property)
+
+    def execute_trusted(self, frame: Frame) -> None:
+        top = frame.stack_pointer - 1
+        frame.stack[top] = frame.stack[top].field_values[self.property]  # type: ignore
+
 
 OPS: typing.Tuple[typing.Type[ByteCodeOp], ...] = (
     StartSubroutineOp,
@@ -360,4 +621,9 @@ OPS: typing.Tuple[typing.Type[ByteCodeOp], ...] = (
     ReturnOp,
     ConstructStructureOp,
     PopAndPushPropertyOp,
+    BinaryAddIntOp,
+    BinaryAddFloatOp,
+    BinarySubtractIntOp,
+    BinarySubtractFloatOp,
+    PopAndPushPropertyOfKnownStructureOp,
 )
@@ -0,0 +1,91 @@
+import os
+import typing
+from concurrent.futures import ProcessPoolExecutor
+import drip.ast as ast
+import drip.typecheck as drip_typing
+
+FunctionResult = typing.Tuple[
+    typing.Optional[drip_typing.ExpressionType], typing.Optional[Exception]
+]
+
+
+class ParallelTypeCheckError(Exception):
+    def __init__(self, errors: typing.List[typing.Tuple[str, Exception]]):
+        super().__init__(errors)
+        # in source order, independent of which worker finished first
+        self.errors = errors
+
+
+def declared_context(program: ast.Program) -> ast.TypeCheckingContext:
+    # return types are declared upfront, so function bodies can be checked in
+    # any order instead of threading inferred types through the program
+    context = program.type_checking_context()
+    for function in program.function_definitions:
+        context.function_return_types[function.name] = function.return_type
+    return context
+
+
+def check_functions(
+    program: ast.Program, start: int, stop: int
+) -> typing.List[FunctionResult]:
+    context = declared_context(program)
+    results: typing.List[FunctionResult] = []
+    for function in program.function_definitions[start:stop]:
+        try:
+            results.append((function.type_check(context), None))
+        except Exception as e:
+            results.append((None, e))
+    return results
+
+
+# each worker receives the program once, when the pool starts
+worker_program: typing.Optional[ast.Program] = None
+
+
+def initialize_worker(program: ast.Program) -> None:
+    global worker_program
+    worker_program = program
+
+
+def check_worker_functions(start: int, stop: int) -> typing.List[FunctionResult]:
+    assert worker_program is not None
+    return check_functions(worker_program, start, stop)
+
+
+def type_check_parallel(
+    program: ast.Program,
+    max_workers: typing.Optional[int] = None,
+    chunks_per_worker: int = 4,
+) -> ast.TypeCheckingContext:
+    workers = max_workers if max_workers is not None else os.cpu_count() or 1
+    count = len(program.function_definitions)
+    chunk_size = max(1, -(-count // (workers * chunks_per_worker)))
+    ranges = [
+        (start, min(start + chunk_size, count)) for start in range(0, count, chunk_size)
+    ]
+    if workers <= 1 or len(ranges) <= 1:
+        results = check_functions(program, 0, count)
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=initialize_worker,
+            initargs=(program,),
+        ) as executor:
+            futures = [
+                executor.submit(check_worker_functions, start, stop)
+                for start, stop in ranges
+            ]
+            results = [result for future in futures for result in future.result()]
+
+    errors = [
+        (function.name, error)
+        for function, (_, error) in zip(program.function_definitions, results)
+        if error is not None
+    ]
+    if len(errors) > 0:
+        raise ParallelTypeCheckError(errors)
+    context = program.type_checking_context()
+    for function, (return_type, _) in zip(program.function_definitions, results):
+        assert return_type is not None
+        context.function_return_types[function.name] = return_type
+    return context
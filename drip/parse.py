@@ -1,9 +1,21 @@
+import sys
 import typing
 import lib.ply.yacc as yacc
 from drip.lex import tokens
 import drip.ast as ast
-from dataclasses import replace
+from dataclasses import dataclass, replace
+import drip.parse_descent as parse_descent
 from drip.validated_dataclass import validated_dataclass
+from drip.tables import build_parser
+
+N = typing.TypeVar("N")
+
+
+def build(p: yacc.YaccProduction, cls: typing.Type[N], **kwargs: typing.Any) -> N:
+    node_factory = getattr(p.parser, "node_factory", None)
+    if node_factory is None:
+        return cls(**kwargs)  # type: ignore
+    return node_factory.make(cls, **kwargs)
 
 
 def p_program_structure_definition(p: yacc.YaccProduction) -> None:
@@ -23,8 +35,13 @@ def p_program_empty(p: yacc.YaccProduction) -> None:
 
 def p_function_definition(p: yacc.YaccProduction) -> None:
     """function_definition : FUNCTION SNAKE_NAME LPAREN argument_definitions_final RPAREN ARROW CAMEL_NAME LPAREN function_body RPAREN"""
-    p[0] = ast.FunctionDefinitionPreliminary(
-        name=p[2], arguments=p[4], procedure=p[9], return_type_name=p[7]
+    p[0] = build(
+        p,
+        ast.FunctionDefinitionPreliminary,
+        name=p[2],
+        arguments=p[4],
+        procedure=p[9],
+        return_type_name=p[7],
     )
 
 
@@ -40,27 +57,29 @@ def p_function_body_empty(p: yacc.YaccProduction) -> None:
 
 def p_statement_return(p: yacc.YaccProduction) -> None:
     """statement : RETURN expression"""
-    p[0] = ast.ReturnStatement(expression=p[2])
+    p[0] = build(p, ast.ReturnStatement, expression=p[2])
 
 
 def p_statement_assignment(p: yacc.YaccProduction) -> None:
     """statement : SNAKE_NAME EQUALS expression"""
-    p[0] = ast.AssignmentStatement(variable_name=p[1], expression=p[3])
+    p[0] = build(p, ast.AssignmentStatement, variable_name=p[1], expression=p[3])
 
 
 def p_expression_literal_number(p: yacc.YaccProduction) -> None:
     """expression : NUMBER"""
-    p[0] = ast.LiteralExpression(type_name="Float", value=p[1])
+    p[0] = build(p, ast.LiteralExpression, type_name="Float", value=p[1])
 
 
 def p_expression_variable_reference(p: yacc.YaccProduction) -> None:
     """expression : SNAKE_NAME"""
-    p[0] = ast.VariableReferenceExpression(name=p[1])
+    p[0] = build(p, ast.VariableReferenceExpression, name=p[1])
 
 
 def p_expression_construction(p: yacc.YaccProduction) -> None:
     """expression : CAMEL_NAME type_parameters_final_opt LPAREN arguments_final RPAREN"""
-    p[0] = ast.ConstructionExpression(
+    p[0] = build(
+        p,
+        ast.ConstructionExpression,
         type_name=p[1],
         arguments={argument.name: argument.expression for argument in p[4]},
         type_arguments={parameter.name: parameter.type_name for parameter in p[2]},
@@ -69,7 +88,9 @@ def p_expression_construction(p: yacc.YaccProduction) -> None:
 
 def p_function_call_expression(p: yacc.YaccProduction) -> None:
     """expression : SNAKE_NAME LPAREN arguments_final RPAREN"""
-    p[0] = ast.FunctionCallExpression(
+    p[0] = build(
+        p,
+        ast.FunctionCallExpression,
         function_name=p[1],
         arguments={argument.name: argument.expression for argument in p[3]},
     )
@@ -77,7 +98,7 @@ def p_function_call_expression(p: yacc.YaccProduction) -> None:
 
 def p_property_access_expression(p: yacc.YaccProduction) -> None:
     """expression : expression PERIOD SNAKE_NAME"""
-    p[0] = ast.PropertyAccessExpression(entity=p[1], property_name=p[3])
+    p[0] = build(p, ast.PropertyAccessExpression, entity=p[1], property_name=p[3])
 
 
 BINARY_OPERATORS = {
@@ -87,7 +108,9 @@ BINARY_OPERATORS = {
 
 def p_binary_operator_expression(p: yacc.YaccProduction) -> None:
     """expression : expression PLUS expression"""
-    p[0] = ast.BinaryOperatorExpression(
+    p[0] = build(
+        p,
+        ast.BinaryOperatorExpression,
         operator=BINARY_OPERATORS[p[2]],
         lhs=p[1],
         rhs=p[3],
@@ -133,8 +156,12 @@ def p_argument(p: yacc.YaccProduction) -> None:
 
 def p_structure_definition(p: yacc.YaccProduction) -> None:
     """structure_definition : STRUCTURE CAMEL_NAME type_parameter_definitions_final_opt LPAREN argument_definitions_final RPAREN"""
-    p[0] = ast.StructureDefinitionPreliminary(
-        name=p[2], type_parameters=p[3], fields=p[5]
+    p[0] = build(
+        p,
+        ast.StructureDefinitionPreliminary,
+        name=p[2],
+        type_parameters=p[3],
+        fields=p[5],
     )
 
 
@@ -239,7 +266,7 @@ def p_argument_definitions_single(p: yacc.YaccProduction) -> None:
 
 def p_argument_definition(p: yacc.YaccProduction) -> None:
     """argument_definition : SNAKE_NAME COLON CAMEL_NAME"""
-    p[0] = ast.ArgumentDefinitionPreliminary(name=p[1], type_name=p[3])
+    p[0] = build(p, ast.ArgumentDefinitionPreliminary, name=p[1], type_name=p[3])
 
 
 def p_comma_opt(
@@ -273,4 +300,30 @@ def p_empty(p: yacc.YaccProduction) -> Empty:
     return Empty()
 
 
-parser = yacc.yacc()
+parser = build_parser(sys.modules[__name__])
+
+
+@dataclass
+class ParserConfig:
+    # "ply" for the LALR parser above, "descent" for drip.parse_descent
+    frontend: str
+
+
+PARSER_SETTINGS = ParserConfig(frontend="ply")
+
+
+def parse(
+    text: str,
+    node_factory: typing.Optional[ast.NodeFactory] = None,
+    frontend: typing.Optional[str] = None,
+) -> ast.ProgramPreliminary:
+    frontend = PARSER_SETTINGS.frontend if frontend is None else frontend
+    if frontend == "descent":
+        return parse_descent.parse(text, node_factory)
+    elif frontend != "ply":
+        raise ValueError(f"Unknown parser frontend {frontend}")
+    parser.node_factory = node_factory  # type: ignore
+    try:
+        return parser.parse(text)
+    finally:
+        parser.node_factory = None  # type: ignore
@@ -1,8 +1,16 @@
+import io
+import mmap
+import os
 import typing
 from collections import defaultdict
+from dataclasses import dataclass
 import drip.ops as ops
 from drip.basetypes import ByteCodeLine
-from drip.program import Program, Subroutine
+from drip.program import LazySubroutines, Program, Subroutine
+from drip.stack_depth import annotate_subroutine
+from drip.verifier import load_program
+
+AsmSource = typing.Union[str, os.PathLike, typing.BinaryIO, typing.TextIO]
 
 
 def build_ops_lookup() -> typing.Dict[str, typing.Type[ops.ByteCodeOp]]:
@@ -13,17 +21,24 @@ def build_ops_lookup() -> typing.Dict[str, typing.Type[ops.ByteCodeOp]]:
     return lookup
 
 
-def lex_program(program: str) -> typing.Generator[ops.ByteCodeOp, None, None]:
-    ops_lookup = build_ops_lookup()
-    raw_lines = program.split("\n")
-    for line in raw_lines:
+OPS_LOOKUP = build_ops_lookup()
+
+
+def lex_line(line: str) -> ops.ByteCodeOp:
+    byte_code_line = ByteCodeLine.lex_asm(line)
+    op_type = OPS_LOOKUP[byte_code_line.op_code]
+    return op_type.parse_asm(byte_code_line)
+
+
+def lex_program(
+    program: typing.Union[str, typing.Iterable[str]]
+) -> typing.Generator[ops.ByteCodeOp, None, None]:
+    lines = program.splitlines() if isinstance(program, str) else program
+    for line in lines:
         clean_line = line.strip()
         if len(clean_line) == 0:
             continue
-        byte_code_line = ByteCodeLine.lex_asm(clean_line)
-        op_type = ops_lookup[byte_code_line.op_code]
-        op = op_type.parse_asm(byte_code_line)
-        yield op
+        yield lex_line(clean_line)
 
 
 def parse_asm_snippet(program: str) -> typing.Tuple[ops.ByteCodeOp, ...]:
@@ -57,4 +72,137 @@ def parse_asm_program(program: str) -> Program:
         else:
             raise ValueError(f"Illegal line {op} outside of subroutine")
     assert subroutines["main"] is not None, "no main subroutine"
-    return Program(subroutines=subroutines)
+    return load_program(Program(subroutines=subroutines))
+
+
+@dataclass
+class SubroutineSpan:
+    arguments: typing.Tuple[str, ...]
+    # byte offsets of the body, between the START and END lines
+    start: int
+    end: int
+    # bodies of unseekable streams are kept, since they cannot be reread
+    body: typing.Optional[bytes] = None
+
+
+class AsmIndex:
+    # One streaming pass records where each subroutine's body lies in the
+    # file; bodies are only lexed when their subroutine is first looked up,
+    # so programs from program() are only valid while the index is open.
+    def __init__(self, source: AsmSource):
+        self.owns_file = isinstance(source, (str, os.PathLike))
+        self.file: typing.Union[typing.IO, mmap.mmap]
+        if isinstance(source, (str, os.PathLike)):
+            # a read-only map pages bodies in on demand and, unlike an open
+            # file, keeps no descriptor alive for as long as the program
+            with open(source, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    self.file = io.BytesIO()
+                else:
+                    self.file = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        elif isinstance(source, io.TextIOBase) and hasattr(source, "buffer"):
+            self.file = source.buffer
+        else:
+            self.file = source
+        # offsets are only meaningful in binary files
+        self.seekable = isinstance(self.file, mmap.mmap) or (
+            not isinstance(self.file, io.TextIOBase) and self.file.seekable()
+        )
+        self.spans: typing.Dict[str, SubroutineSpan] = {}
+        self.index()
+
+    def lines(self) -> typing.Iterator[bytes]:
+        if isinstance(self.file, io.TextIOBase):
+            return (line.encode() for line in self.file)
+        if isinstance(self.file, mmap.mmap):
+            return iter(self.file.readline, b"")
+        return iter(self.file)
+
+    def index(self) -> None:
+        offset = self.file.tell() if self.seekable else 0
+        current: typing.Optional[typing.Tuple[str, SubroutineSpan]] = None
+        body: typing.List[bytes] = []
+        for line in self.lines():
+            line_start = offset
+            offset += len(line)
+            parts = line.split()
+            if len(parts) == 0:
+                continue
+            op_code = parts[0]
+            if op_code == b"START_SUBROUTINE":
+                if current is not None:
+                    raise ValueError("Started a subroutine inside a subroutine")
+                name = parts[1].decode()
+                if name in self.spans:
+                    raise ValueError(f"Subroutine {name} defined twice")
+                arguments = tuple(part.decode() for part in parts[2:])
+                current = (name, SubroutineSpan(arguments, start=offset, end=offset))
+            elif op_code == b"END_SUBROUTINE":
+                if current is None:
+                    raise ValueError("Ended a subroutine not inside a subroutine")
+                name, span = current
+                ended = parts[1].decode() if len(parts) > 1 else ""
+                assert (
+                    name == ended
+                ), f"ended subroutine {ended} inside subroutine {name}"
+                span.end = line_start
+                if not self.seekable:
+                    span.body = b"".join(body)
+                    body = []
+                self.spans[name] = span
+                current = None
+            elif current is None:
+                raise ValueError(
+                    f"Illegal line {line.decode().strip()} outside of subroutine"
+                )
+            elif not self.seekable:
+                body.append(line)
+        if current is not None:
+            raise ValueError(f"Subroutine {current[0]} never ended")
+        if "main" not in self.spans:
+            raise ValueError("no main subroutine")
+
+    def body(self, name: str) -> str:
+        span = self.spans[name]
+        if span.body is not None:
+            return span.body.decode()
+        if self.file.closed:
+            raise ValueError(f"Subroutine {name} loaded after its file was closed")
+        self.file.seek(span.start)
+        return self.file.read(span.end - span.start).decode()
+
+    def subroutine(self, name: str) -> Subroutine:
+        return Subroutine(
+            ops=tuple(lex_program(self.body(name).splitlines())),
+            arguments=self.spans[name].arguments,
+        )
+
+    def program(self) -> Program:
+        def compile_subroutine(name: str) -> Subroutine:
+            return annotate_subroutine(program, self.subroutine(name))
+
+        program = Program(
+            subroutines=LazySubroutines(
+                arguments={name: span.arguments for name, span in self.spans.items()},
+                compile_subroutine=compile_subroutine,
+            )
+        )
+        return program
+
+    def close(self) -> None:
+        if self.owns_file:
+            self.file.close()
+
+    def __enter__(self) -> "AsmIndex":
+        return self
+
+    def __exit__(self, *exc_info: typing.Any) -> None:
+        self.close()
+
+
+def load_asm_file(source: AsmSource) -> Program:
+    # verifying would lex every subroutine, so lazily loaded programs run
+    # with runtime checks; use parse_asm_program for a verified program.
+    # Paths are mapped, so the program holds no open file; file objects must
+    # stay open for as long as the program is used.
+    return AsmIndex(source).program()
@@ -0,0 +1,274 @@
+import typing
+import drip.ast as ast
+from drip.scanner import END, Source, TokenArray, scan
+
+# A hand-written alternative to the PLY parser in drip.parse, producing the
+# same ProgramPreliminary. Declarations are parsed by recursive descent.
+# Expressions are parsed Pratt-style with an explicit stack of unfinished
+# constructs, so nesting depth is not limited by Python's recursion limit:
+#   expression : postfix (PLUS expression)?           right associative
+#   postfix    : primary (PERIOD SNAKE_NAME)*
+#   primary    : NUMBER | SNAKE_NAME | SNAKE_NAME call | LPAREN expression RPAREN
+#              | CAMEL_NAME type_arguments? call
+# which matches how the LALR tables resolve the PLUS shift/reduce conflict.
+
+
+class ParseError(ValueError):
+    pass
+
+
+class Pending:
+    # an expression construct still waiting for one of its operands
+    pass
+
+
+class PendingPlus(Pending):
+    def __init__(self, lhs: ast.Expression):
+        self.lhs = lhs
+
+
+class PendingParenthetical(Pending):
+    pass
+
+
+class PendingArguments(Pending):
+    def __init__(
+        self,
+        name: str,
+        type_arguments: typing.Optional[typing.Dict[str, str]],
+        argument_name: str,
+    ):
+        # type_arguments is None for function calls and a dict for constructions
+        self.name = name
+        self.type_arguments = type_arguments
+        self.arguments: typing.Dict[str, ast.Expression] = {}
+        self.argument_name = argument_name
+
+
+class DescentParser:
+    def __init__(
+        self, tokens: TokenArray, node_factory: typing.Optional[ast.NodeFactory]
+    ):
+        self.tokens = tokens
+        self.position = 0
+        self.build = ast.NodeFactory.builder(node_factory)
+
+    def peek(self) -> str:
+        return self.tokens.kind(self.position)
+
+    def advance(self) -> typing.Any:
+        value = self.tokens.value(self.position)
+        self.position += 1
+        return value
+
+    def accept(self, token_type: str) -> bool:
+        if self.peek() == token_type:
+            self.position += 1
+            return True
+        return False
+
+    def expect(self, token_type: str) -> typing.Any:
+        if self.peek() != token_type:
+            raise ParseError(
+                f"Expected {token_type} but found {self.peek()} "
+                f"{self.tokens.value(self.position)!r} "
+                f"at offset {self.tokens.offset(self.position)}"
+            )
+        return self.advance()
+
+    def separated(
+        self,
+        item: typing.Callable[[], typing.Any],
+        close: str,
+        allow_empty: bool = True,
+    ) -> typing.Tuple[typing.Any, ...]:
+        # a comma separated list allowing a trailing comma
+        items: typing.List[typing.Any] = []
+        if not allow_empty or self.peek() != close:
+            items.append(item())
+            while self.accept("COMMA") and self.peek() != close:
+                items.append(item())
+        self.expect(close)
+        return tuple(items)
+
+    def program(self) -> ast.ProgramPreliminary:
+        structures = []
+        functions = []
+        while self.peek() != END:
+            if self.peek() == "STRUCTURE":
+                structures.append(self.structure_definition())
+            else:
+                functions.append(self.function_definition())
+        return ast.ProgramPreliminary(
+            structure_definitions=tuple(structures),
+            function_definitions=tuple(functions),
+        )
+
+    def type_parameter_definitions(self) -> typing.Tuple[str, ...]:
+        if not self.accept("LSQUARE"):
+            return tuple()
+        return self.separated(
+            lambda: self.expect("CAMEL_NAME"), "RSQUARE", allow_empty=False
+        )
+
+    def argument_definition(self) -> ast.ArgumentDefinitionPreliminary:
+        name = self.expect("SNAKE_NAME")
+        self.expect("COLON")
+        return self.build(
+            ast.ArgumentDefinitionPreliminary,
+            name=name,
+            type_name=self.expect("CAMEL_NAME"),
+        )
+
+    def structure_definition(self) -> ast.StructureDefinitionPreliminary:
+        self.expect("STRUCTURE")
+        name = self.expect("CAMEL_NAME")
+        type_parameters = self.type_parameter_definitions()
+        self.expect("LPAREN")
+        fields = self.separated(self.argument_definition, "RPAREN")
+        return self.build(
+            ast.StructureDefinitionPreliminary,
+            name=name,
+            type_parameters=type_parameters,
+            fields=fields,
+        )
+
+    def function_definition(self) -> ast.FunctionDefinitionPreliminary:
+        self.expect("FUNCTION")
+        name = self.expect("SNAKE_NAME")
+        self.expect("LPAREN")
+        arguments = self.separated(self.argument_definition, "RPAREN")
+        self.expect("ARROW")
+        return_type_name = self.expect("CAMEL_NAME")
+        self.expect("LPAREN")
+        procedure = []
+        while not self.accept("RPAREN"):
+            procedure.append(self.statement())
+            self.expect("SEMICOLON")
+        return self.build(
+            ast.FunctionDefinitionPreliminary,
+            name=name,
+            arguments=arguments,
+            procedure=tuple(procedure),
+            return_type_name=return_type_name,
+        )
+
+    def statement(self) -> ast.Statement:
+        if self.accept("RETURN"):
+            return self.build(ast.ReturnStatement, expression=self.expression())
+        variable_name = self.expect("SNAKE_NAME")
+        self.expect("EQUALS")
+        return self.build(
+            ast.AssignmentStatement,
+            variable_name=variable_name,
+            expression=self.expression(),
+        )
+
+    def type_argument(self) -> typing.Tuple[str, str]:
+        name = self.expect("CAMEL_NAME")
+        self.expect("EQUALS")
+        return name, self.expect("CAMEL_NAME")
+
+    def argument_name(self) -> str:
+        name = self.expect("SNAKE_NAME")
+        self.expect("EQUALS")
+        return name
+
+    def open_arguments(
+        self,
+        pending: typing.List[Pending],
+        name: str,
+        type_arguments: typing.Optional[typing.Dict[str, str]],
+    ) -> typing.Optional[ast.Expression]:
+        self.expect("LPAREN")
+        if self.peek() != "RPAREN":
+            pending.append(PendingArguments(name, type_arguments, self.argument_name()))
+            return None
+        self.advance()
+        return self.close_arguments(PendingArguments(name, type_arguments, ""))
+
+    def close_arguments(self, construct: PendingArguments) -> ast.Expression:
+        if construct.type_arguments is None:
+            return self.build(
+                ast.FunctionCallExpression,
+                function_name=construct.name,
+                arguments=construct.arguments,
+            )
+        return self.build(
+            ast.ConstructionExpression,
+            type_name=construct.name,
+            arguments=construct.arguments,
+            type_arguments=construct.type_arguments,
+        )
+
+    def primary(self, pending: typing.List[Pending]) -> typing.Optional[ast.Expression]:
+        # returns None when it opened a construct whose operands come next
+        token_type = self.peek()
+        if token_type == "NUMBER":
+            return self.build(
+                ast.LiteralExpression, type_name="Float", value=self.advance()
+            )
+        elif token_type == "SNAKE_NAME":
+            name = self.advance()
+            if self.peek() == "LPAREN":
+                return self.open_arguments(pending, name, None)
+            return self.build(ast.VariableReferenceExpression, name=name)
+        elif token_type == "CAMEL_NAME":
+            name = self.advance()
+            type_arguments = {}
+            if self.accept("LSQUARE"):
+                type_arguments = dict(
+                    self.separated(self.type_argument, "RSQUARE", allow_empty=False)
+                )
+            return self.open_arguments(pending, name, type_arguments)
+        self.expect("LPAREN")
+        pending.append(PendingParenthetical())
+        return None
+
+    def expression(self) -> ast.Expression:
+        pending: typing.List[Pending] = []
+        while True:
+            operand = self.primary(pending)
+            if operand is None:
+                continue
+            value: ast.Expression = operand
+            while True:
+                while self.accept("PERIOD"):
+                    value = self.build(
+                        ast.PropertyAccessExpression,
+                        entity=value,
+                        property_name=self.expect("SNAKE_NAME"),
+                    )
+                if self.accept("PLUS"):
+                    pending.append(PendingPlus(value))
+                    break
+                while len(pending) > 0 and isinstance(pending[-1], PendingPlus):
+                    plus = pending.pop()
+                    assert isinstance(plus, PendingPlus)
+                    value = self.build(
+                        ast.BinaryOperatorExpression,
+                        operator=ast.BinaryOperator.ADD,
+                        lhs=plus.lhs,
+                        rhs=value,
+                    )
+                if len(pending) == 0:
+                    return value
+                construct = pending[-1]
+                if isinstance(construct, PendingParenthetical):
+                    self.expect("RPAREN")
+                    pending.pop()
+                    continue
+                assert isinstance(construct, PendingArguments)
+                construct.arguments[construct.argument_name] = value
+                if self.accept("COMMA") and self.peek() != "RPAREN":
+                    construct.argument_name = self.argument_name()
+                    break
+                self.expect("RPAREN")
+                pending.pop()
+                value = self.close_arguments(construct)
+
+
+def parse(
+    text: Source, node_factory: typing.Optional[ast.NodeFactory] = None
+) -> ast.ProgramPreliminary:
+    return DescentParser(scan(text), node_factory).program()
@@ -0,0 +1,431 @@
+# Generated by python -m drip.tables, do not edit
+TABLES_VERSION = 1
+LEX_SIGNATURE = "6dcb8826e3a44853b075a8954f04257a540f5b6b53cc55457420691ccdec11b7"
+LEX_REGEXES = [
+    "(?P<t_STRUCTURE>structure)|(?P<t_FUNCTION>function)|(?P<t_RETURN>return)|(?P<t_NUMBER>\\d+(\\.\\d*)?)|(?P<t_newline>\\n+)|(?P<t_CAMEL_NAME>([A-Z][a-z]*)+)|(?P<t_SNAKE_NAME>[a-z_]+)|(?P<t_ARROW>->)|(?P<t_LPAREN>\\()|(?P<t_LSQUARE>\\[)|(?P<t_PERIOD>\\.)|(?P<t_PLUS>\\+)|(?P<t_RPAREN>\\))|(?P<t_RSQUARE>\\])|(?P<t_COLON>:)|(?P<t_COMMA>,)|(?P<t_EQUALS>=)|(?P<t_SEMICOLON>;)"
+]
+LEX_RULES = [
+    [
+        None,
+        ("t_STRUCTURE", "STRUCTURE", True),
+        ("t_FUNCTION", "FUNCTION", True),
+        ("t_RETURN", "RETURN", True),
+        ("t_NUMBER", "NUMBER", True),
+        None,
+        ("t_newline", "newline", True),
+        ("t_CAMEL_NAME", "CAMEL_NAME", False),
+        None,
+        ("t_SNAKE_NAME", "SNAKE_NAME", False),
+        ("t_ARROW", "ARROW", False),
+        ("t_LPAREN", "LPAREN", False),
+        ("t_LSQUARE", "LSQUARE", False),
+        ("t_PERIOD", "PERIOD", False),
+        ("t_PLUS", "PLUS", False),
+        ("t_RPAREN", "RPAREN", False),
+        ("t_RSQUARE", "RSQUARE", False),
+        ("t_COLON", "COLON", False),
+        ("t_COMMA", "COMMA", False),
+        ("t_EQUALS", "EQUALS", False),
+        ("t_SEMICOLON", "SEMICOLON", False),
+    ]
+]
+LEX_IGNORE = " \t"
+PARSE_SIGNATURE = "e9000484907604fc16232cb259517e5187fc702e7bd655b2cfc86f33f5261918"
+LR_PRODUCTIONS = [
+    ("S'", 1, None, "S' -> program"),
+    (
+        "program",
+        2,
+        "p_program_structure_definition",
+        "program -> structure_definition program",
+    ),
+    (
+        "program",
+        2,
+        "p_program_function_definition",
+        "program -> function_definition program",
+    ),
+    ("program", 1, "p_program_empty", "program -> empty"),
+    (
+        "function_definition",
+        10,
+        "p_function_definition",
+        "function_definition -> FUNCTION SNAKE_NAME LPAREN argument_definitions_final RPAREN ARROW CAMEL_NAME LPAREN function_body RPAREN",
+    ),
+    (
+        "function_body",
+        3,
+        "p_function_body_statement",
+        "function_body -> statement SEMICOLON function_body",
+    ),
+    ("function_body", 1, "p_function_body_empty", "function_body -> empty"),
+    ("statement", 2, "p_statement_return", "statement -> RETURN expression"),
+    (
+        "statement",
+        3,
+        "p_statement_assignment",
+        "statement -> SNAKE_NAME EQUALS expression",
+    ),
+    ("expression", 1, "p_expression_literal_number", "expression -> NUMBER"),
+    ("expression", 1, "p_expression_variable_reference", "expression -> SNAKE_NAME"),
+    (
+        "expression",
+        5,
+        "p_expression_construction",
+        "expression -> CAMEL_NAME type_parameters_final_opt LPAREN arguments_final RPAREN",
+    ),
+    (
+        "expression",
+        4,
+        "p_function_call_expression",
+        "expression -> SNAKE_NAME LPAREN arguments_final RPAREN",
+    ),
+    (
+        "expression",
+        3,
+        "p_property_access_expression",
+        "expression -> expression PERIOD SNAKE_NAME",
+    ),
+    (
+        "expression",
+        3,
+        "p_binary_operator_expression",
+        "expression -> expression PLUS expression",
+    ),
+    (
+        "arguments_final",
+        2,
+        "p_arguments_final",
+        "arguments_final -> arguments comma_opt",
+    ),
+    ("arguments_final", 1, "p_arguments_final_empty", "arguments_final -> empty"),
+    ("arguments", 3, "p_arguments_multiple", "arguments -> arguments COMMA argument"),
+    ("arguments", 1, "p_arguments_single", "arguments -> argument"),
+    ("argument", 3, "p_argument", "argument -> SNAKE_NAME EQUALS expression"),
+    (
+        "structure_definition",
+        6,
+        "p_structure_definition",
+        "structure_definition -> STRUCTURE CAMEL_NAME type_parameter_definitions_final_opt LPAREN argument_definitions_final RPAREN",
+    ),
+    (
+        "type_parameters_final_opt",
+        1,
+        "p_type_parameters_final_opt",
+        "type_parameters_final_opt -> type_parameters_final",
+    ),
+    (
+        "type_parameters_final_opt",
+        1,
+        "p_type_parameters_final_opt",
+        "type_parameters_final_opt -> empty",
+    ),
+    (
+        "type_parameters_final",
+        4,
+        "p_type_parameters_final",
+        "type_parameters_final -> LSQUARE type_parameters comma_opt RSQUARE",
+    ),
+    (
+        "type_parameters_final",
+        1,
+        "p_type_parameters_final_empty",
+        "type_parameters_final -> empty",
+    ),
+    (
+        "type_parameters",
+        3,
+        "p_type_parameters_multiple",
+        "type_parameters -> type_parameters COMMA type_parameter",
+    ),
+    (
+        "type_parameters",
+        1,
+        "p_type_parameters_single",
+        "type_parameters -> type_parameter",
+    ),
+    (
+        "type_parameter",
+        3,
+        "p_type_parameter",
+        "type_parameter -> CAMEL_NAME EQUALS CAMEL_NAME",
+    ),
+    (
+        "type_parameter_definitions_final_opt",
+        1,
+        "p_type_parameter_definitions_final_opt",
+        "type_parameter_definitions_final_opt -> type_parameter_definitions_final",
+    ),
+    (
+        "type_parameter_definitions_final_opt",
+        1,
+        "p_type_parameter_definitions_final_opt",
+        "type_parameter_definitions_final_opt -> empty",
+    ),
+    (
+        "type_parameter_definitions_final",
+        4,
+        "p_type_parameter_definitions_final",
+        "type_parameter_definitions_final -> LSQUARE type_parameter_definitions comma_opt RSQUARE",
+    ),
+    (
+        "type_parameter_definitions_final",
+        1,
+        "p_type_parameter_definitions_final_empty",
+        "type_parameter_definitions_final -> empty",
+    ),
+    (
+        "type_parameter_definitions",
+        3,
+        "p_type_parameter_definitions_multiple",
+        "type_parameter_definitions -> type_parameter_definitions COMMA CAMEL_NAME",
+    ),
+    (
+        "type_parameter_definitions",
+        1,
+        "p_type_parameter_definitions_single",
+        "type_parameter_definitions -> CAMEL_NAME",
+    ),
+    (
+        "argument_definitions_final",
+        2,
+        "p_argument_definitions_final",
+        "argument_definitions_final -> argument_definitions comma_opt",
+    ),
+    (
+        "argument_definitions_final",
+        1,
+        "p_argument_definitions_final_empty",
+        "argument_definitions_final -> empty",
+    ),
+    (
+        "argument_definitions",
+        3,
+        "p_argument_definitions_multiple",
+        "argument_definitions -> argument_definitions COMMA argument_definition",
+    ),
+    (
+        "argument_definitions",
+        1,
+        "p_argument_definitions_single",
+        "argument_definitions -> argument_definition",
+    ),
+    (
+        "argument_definition",
+        3,
+        "p_argument_definition",
+        "argument_definition -> SNAKE_NAME COLON CAMEL_NAME",
+    ),
+    ("comma_opt", 1, "p_comma_opt", "comma_opt -> COMMA"),
+    ("comma_opt", 1, "p_comma_opt", "comma_opt -> empty"),
+    (
+        "expression",
+        3,
+        "p_expression_parenthetical",
+        "expression -> LPAREN expression RPAREN",
+    ),
+    ("empty", 0, "p_empty", "empty -> <empty>"),
+]
+LR_ACTION = {
+    0: {"STRUCTURE": 5, "FUNCTION": 6, "$end": -42},
+    1: {"$end": 0},
+    2: {"STRUCTURE": 5, "FUNCTION": 6, "$end": -42},
+    3: {"STRUCTURE": 5, "FUNCTION": 6, "$end": -42},
+    4: {"$end": -3},
+    5: {"CAMEL_NAME": 9},
+    6: {"SNAKE_NAME": 10},
+    7: {"$end": -1},
+    8: {"$end": -2},
+    9: {"LSQUARE": 14, "LPAREN": -42},
+    10: {"LPAREN": 15},
+    11: {"LPAREN": 16},
+    12: {"LPAREN": -28},
+    13: {"LPAREN": -29},
+    14: {"CAMEL_NAME": 18},
+    15: {"RPAREN": -42, "SNAKE_NAME": 19},
+    16: {"RPAREN": -42, "SNAKE_NAME": 19},
+    17: {"COMMA": 26, "RSQUARE": -42},
+    18: {"COMMA": -33, "RSQUARE": -33},
+    19: {"COLON": 28},
+    20: {"RPAREN": 29},
+    21: {"COMMA": 31, "RPAREN": -42},
+    22: {"RPAREN": -35},
+    23: {"COMMA": -37, "RPAREN": -37},
+    24: {"RPAREN": 32},
+    25: {"RSQUARE": 33},
+    26: {"CAMEL_NAME": 34, "RSQUARE": -39},
+    27: {"RSQUARE": -40, "RPAREN": -40},
+    28: {"CAMEL_NAME": 35},
+    29: {"ARROW": 36},
+    30: {"RPAREN": -34},
+    31: {"RPAREN": -39, "SNAKE_NAME": 19},
+    32: {"STRUCTURE": -20, "FUNCTION": -20, "$end": -20},
+    33: {"LPAREN": -30},
+    34: {"COMMA": -32, "RSQUARE": -32},
+    35: {"COMMA": -38, "RPAREN": -38},
+    36: {"CAMEL_NAME": 38},
+    37: {"COMMA": -36, "RPAREN": -36},
+    38: {"LPAREN": 39},
+    39: {"RETURN": 44, "SNAKE_NAME": 40, "RPAREN": -42},
+    40: {"EQUALS": 45},
+    41: {"RPAREN": 46},
+    42: {"SEMICOLON": 47},
+    43: {"RPAREN": -6},
+    44: {"NUMBER": 49, "SNAKE_NAME": 50, "CAMEL_NAME": 51, "LPAREN": 52},
+    45: {"NUMBER": 49, "SNAKE_NAME": 50, "CAMEL_NAME": 51, "LPAREN": 52},
+    46: {"STRUCTURE": -4, "FUNCTION": -4, "$end": -4},
+    47: {"RETURN": 44, "SNAKE_NAME": 40, "RPAREN": -42},
+    48: {"SEMICOLON": -7, "PERIOD": 55, "PLUS": 56},
+    49: {"PERIOD": -9, "PLUS": -9, "SEMICOLON": -9, "RPAREN": -9, "COMMA": -9},
+    50: {
+        "PERIOD": -10,
+        "PLUS": -10,
+        "SEMICOLON": -10,
+        "RPAREN": -10,
+        "COMMA": -10,
+        "LPAREN": 57,
+    },
+    51: {"LSQUARE": 61, "LPAREN": -42},
+    52: {"NUMBER": 49, "SNAKE_NAME": 50, "CAMEL_NAME": 51, "LPAREN": 52},
+    53: {"SEMICOLON": -8, "PERIOD": 55, "PLUS": 56},
+    54: {"RPAREN": -5},
+    55: {"SNAKE_NAME": 63},
+    56: {"NUMBER": 49, "SNAKE_NAME": 50, "CAMEL_NAME": 51, "LPAREN": 52},
+    57: {"RPAREN": -42, "SNAKE_NAME": 65},
+    58: {"LPAREN": 70},
+    59: {"LPAREN": -21},
+    60: {"LPAREN": -22},
+    61: {"CAMEL_NAME": 73},
+    62: {"RPAREN": 74, "PERIOD": 55, "PLUS": 56},
+    63: {"PERIOD": -13, "PLUS": -13, "SEMICOLON": -13, "RPAREN": -13, "COMMA": -13},
+    64: {"PERIOD": 55, "PLUS": 56, "SEMICOLON": -14, "RPAREN": -14, "COMMA": -14},
+    65: {"EQUALS": 75},
+    66: {"RPAREN": 76},
+    67: {"COMMA": 78, "RPAREN": -42},
+    68: {"RPAREN": -16},
+    69: {"COMMA": -18, "RPAREN": -18},
+    70: {"RPAREN": -42, "SNAKE_NAME": 65},
+    71: {"COMMA": 81, "RSQUARE": -42},
+    72: {"COMMA": -26, "RSQUARE": -26},
+    73: {"EQUALS": 82},
+    74: {"PERIOD": -41, "PLUS": -41, "SEMICOLON": -41, "RPAREN": -41, "COMMA": -41},
+    75: {"NUMBER": 49, "SNAKE_NAME": 50, "CAMEL_NAME": 51, "LPAREN": 52},
+    76: {"PERIOD": -12, "PLUS": -12, "SEMICOLON": -12, "RPAREN": -12, "COMMA": -12},
+    77: {"RPAREN": -15},
+    78: {"RPAREN": -39, "SNAKE_NAME": 65},
+    79: {"RPAREN": 85},
+    80: {"RSQUARE": 86},
+    81: {"RSQUARE": -39, "CAMEL_NAME": 73},
+    82: {"CAMEL_NAME": 88},
+    83: {"COMMA": -19, "RPAREN": -19, "PERIOD": 55, "PLUS": 56},
+    84: {"COMMA": -17, "RPAREN": -17},
+    85: {"PERIOD": -11, "PLUS": -11, "SEMICOLON": -11, "RPAREN": -11, "COMMA": -11},
+    86: {"LPAREN": -23},
+    87: {"COMMA": -25, "RSQUARE": -25},
+    88: {"COMMA": -27, "RSQUARE": -27},
+}
+LR_GOTO = {
+    0: {"program": 1, "structure_definition": 2, "function_definition": 3, "empty": 4},
+    1: {},
+    2: {"structure_definition": 2, "program": 7, "function_definition": 3, "empty": 4},
+    3: {"function_definition": 3, "program": 8, "structure_definition": 2, "empty": 4},
+    4: {},
+    5: {},
+    6: {},
+    7: {},
+    8: {},
+    9: {
+        "type_parameter_definitions_final_opt": 11,
+        "type_parameter_definitions_final": 12,
+        "empty": 13,
+    },
+    10: {},
+    11: {},
+    12: {},
+    13: {},
+    14: {"type_parameter_definitions": 17},
+    15: {
+        "argument_definitions_final": 20,
+        "argument_definitions": 21,
+        "empty": 22,
+        "argument_definition": 23,
+    },
+    16: {
+        "argument_definitions_final": 24,
+        "argument_definitions": 21,
+        "empty": 22,
+        "argument_definition": 23,
+    },
+    17: {"comma_opt": 25, "empty": 27},
+    18: {},
+    19: {},
+    20: {},
+    21: {"comma_opt": 30, "empty": 27},
+    22: {},
+    23: {},
+    24: {},
+    25: {},
+    26: {},
+    27: {},
+    28: {},
+    29: {},
+    30: {},
+    31: {"argument_definition": 37},
+    32: {},
+    33: {},
+    34: {},
+    35: {},
+    36: {},
+    37: {},
+    38: {},
+    39: {"function_body": 41, "statement": 42, "empty": 43},
+    40: {},
+    41: {},
+    42: {},
+    43: {},
+    44: {"expression": 48},
+    45: {"expression": 53},
+    46: {},
+    47: {"statement": 42, "function_body": 54, "empty": 43},
+    48: {},
+    49: {},
+    50: {},
+    51: {"type_parameters_final_opt": 58, "type_parameters_final": 59, "empty": 60},
+    52: {"expression": 62},
+    53: {},
+    54: {},
+    55: {},
+    56: {"expression": 64},
+    57: {"arguments_final": 66, "arguments": 67, "empty": 68, "argument": 69},
+    58: {},
+    59: {},
+    60: {},
+    61: {"type_parameters": 71, "type_parameter": 72},
+    62: {},
+    63: {},
+    64: {},
+    65: {},
+    66: {},
+    67: {"comma_opt": 77, "empty": 27},
+    68: {},
+    69: {},
+    70: {"arguments_final": 79, "arguments": 67, "empty": 68, "argument": 69},
+    71: {"comma_opt": 80, "empty": 27},
+    72: {},
+    73: {},
+    74: {},
+    75: {"expression": 83},
+    76: {},
+    77: {},
+    78: {"argument": 84},
+    79: {},
+    80: {},
+    81: {"type_parameter": 87},
+    82: {},
+    83: {},
+    84: {},
+    85: {},
+    86: {},
+    87: {},
+    88: {},
+}
@@ -0,0 +1,95 @@
+import json
+import typing
+from dataclasses import dataclass, field
+
+PROFILE_VERSION = 1
+
+
+@dataclass
+class BranchCounts:
+    taken: int = 0
+    total: int = 0
+
+    @property
+    def taken_ratio(self) -> float:
+        return self.taken / self.total if self.total > 0 else 0.0
+
+
+@dataclass
+class Profile:
+    call_counts: typing.Dict[str, int] = field(default_factory=dict)
+    op_counts: typing.Dict[str, typing.Dict[int, int]] = field(default_factory=dict)
+    branch_counts: typing.Dict[str, typing.Dict[int, BranchCounts]] = field(
+        default_factory=dict
+    )
+
+    def record_call(self, subroutine: str) -> None:
+        self.call_counts[subroutine] = self.call_counts.get(subroutine, 0) + 1
+
+    def record_op(self, subroutine: str, index: int) -> None:
+        counts = self.op_counts.setdefault(subroutine, {})
+        counts[index] = counts.get(index, 0) + 1
+
+    def record_branch(self, subroutine: str, index: int, taken: bool) -> None:
+        counts = self.branch_counts.setdefault(subroutine, {}).setdefault(
+            index, BranchCounts()
+        )
+        counts.total += 1
+        if taken:
+            counts.taken += 1
+
+    def subroutine_op_count(self, subroutine: str) -> int:
+        return sum(self.op_counts.get(subroutine, {}).values())
+
+    def hot_subroutines(self, threshold: float = 0.1) -> typing.Set[str]:
+        total = sum(self.subroutine_op_count(name) for name in self.op_counts)
+        return {
+            name
+            for name in self.op_counts
+            if total > 0 and self.subroutine_op_count(name) >= threshold * total
+        }
+
+    def to_json(self) -> typing.Dict[str, typing.Any]:
+        return {
+            "version": PROFILE_VERSION,
+            "call_counts": self.call_counts,
+            "op_counts": {
+                name: {str(index): count for index, count in counts.items()}
+                for name, counts in self.op_counts.items()
+            },
+            "branch_counts": {
+                name: {
+                    str(index): [branch.taken, branch.total]
+                    for index, branch in branches.items()
+                }
+                for name, branches in self.branch_counts.items()
+            },
+        }
+
+    @classmethod
+    def from_json(cls, data: typing.Dict[str, typing.Any]) -> "Profile":
+        if data.get("version") != PROFILE_VERSION:
+            raise ValueError(f"Unsupported profile version {data.get('version')}")
+        return cls(
+            call_counts=dict(data["call_counts"]),
+            op_counts={
+                name: {int(index): count for index, count in counts.items()}
+                for name, counts in data["op_counts"].items()
+            },
+            branch_counts={
+                name: {
+                    int(index): BranchCounts(taken=taken, total=total)
+                    for index, (taken, total) in branches.items()
+                }
+                for name, branches in data["branch_counts"].items()
+            },
+        )
+
+    def dump(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_json(), f, indent=2, sort_keys=True)
+
+    @classmethod
+    def load(cls, path: str) -> "Profile":
+        with open(path) as f:
+            return cls.from_json(json.load(f))
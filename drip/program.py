@@ -1,17 +1,80 @@
+import collections.abc
 from dataclasses import field
 import typing
 from drip.validated_dataclass import validated_dataclass
 import drip.ops as ops
-import drip.ast as ast
+import drip.typecheck as drip_typing
 
 
 @validated_dataclass
 class Subroutine:
     ops: typing.Tuple[ops.ByteCodeOp, ...]
     arguments: typing.Tuple[str, ...]
+    max_stack_depth: typing.Optional[int] = None
 
 
 @validated_dataclass
 class Program:
     subroutines: typing.Dict[str, Subroutine]
-    structures: typing.Dict[str, ast.StructureDefinition] = field(default_factory=dict)
+    structures: typing.Dict[str, drip_typing.StructureDefinition] = field(
+        default_factory=dict
+    )
+    verified: bool = False
+
+
+class LazySubroutines(typing.Dict[str, Subroutine]):
+    # Subroutines compiled the first time they are looked up, after which the
+    # compiled subroutine replaces its stub. Argument names are known up front
+    # so the stack effect of a call does not force its callee to compile.
+    # Iteration, len() and the views cover every stub, compiling on access;
+    # compile_subroutine must return subroutines with their stack depths.
+    def __init__(
+        self,
+        arguments: typing.Dict[str, typing.Tuple[str, ...]],
+        compile_subroutine: typing.Callable[[str], Subroutine],
+    ):
+        super().__init__()
+        self.stub_arguments = arguments
+        self.compile_subroutine = compile_subroutine
+
+    def __missing__(self, name: str) -> Subroutine:
+        if name not in self.stub_arguments:
+            raise KeyError(name)
+        subroutine = self.compile_subroutine(name)
+        self[name] = subroutine
+        return subroutine
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.stub_arguments
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self.stub_arguments)
+
+    def __len__(self) -> int:
+        return len(self.stub_arguments)
+
+    def get(  # type: ignore
+        self, name: str, default: typing.Optional[Subroutine] = None
+    ) -> typing.Optional[Subroutine]:
+        return self[name] if name in self.stub_arguments else default
+
+    def keys(self) -> typing.KeysView[str]:  # type: ignore
+        return collections.abc.KeysView(self)
+
+    def items(self) -> typing.ItemsView[str, Subroutine]:  # type: ignore
+        return collections.abc.ItemsView(self)
+
+    def values(self) -> typing.ValuesView[Subroutine]:  # type: ignore
+        return collections.abc.ValuesView(self)
+
+    def compiled(self) -> typing.KeysView[str]:
+        return super().keys()
+
+    def arguments(self, name: str) -> typing.Tuple[str, ...]:
+        return self.stub_arguments[name]
+
+
+def subroutine_arguments(program: Program, name: str) -> typing.Tuple[str, ...]:
+    if isinstance(program.subroutines, LazySubroutines):
+        return program.subroutines.arguments(name)
+    return program.subroutines[name].arguments
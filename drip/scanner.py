@@ -0,0 +1,141 @@
+import array
+import mmap
+import re
+import typing
+
+# A single-pass scanner for drip source, independent of PLY. One master
+# regex, compiled once per input kind, covers every token, the skipped
+# whitespace and a catch-all for illegal characters, so finditer walks the
+# buffer exactly once. Alternatives are ordered as in the PLY lexer of
+# drip.lex, so both produce the same tokens.
+TOKEN_PATTERNS: typing.Tuple[typing.Tuple[str, str], ...] = (
+    ("STRUCTURE", r"structure"),
+    ("FUNCTION", r"function"),
+    ("RETURN", r"return"),
+    ("NUMBER", r"\d+(?:\.\d*)?"),
+    ("CAMEL_NAME", r"(?:[A-Z][a-z]*)+"),
+    ("SNAKE_NAME", r"[a-z_]+"),
+    ("ARROW", r"->"),
+    ("LPAREN", r"\("),
+    ("LSQUARE", r"\["),
+    ("PERIOD", r"\."),
+    ("PLUS", r"\+"),
+    ("RPAREN", r"\)"),
+    ("RSQUARE", r"\]"),
+    ("COLON", r":"),
+    ("COMMA", r","),
+    ("EQUALS", r"="),
+    ("SEMICOLON", r";"),
+)
+TOKEN_TYPES = tuple(name for name, _ in TOKEN_PATTERNS)
+TOKEN_IDS = {name: index for index, name in enumerate(TOKEN_TYPES)}
+NUMBER = TOKEN_IDS["NUMBER"]
+END = "$end"
+# group 1 is skipped whitespace, tokens follow, the last group is an error
+SKIP_GROUP = 1
+FIRST_TOKEN_GROUP = 2
+ERROR_GROUP = FIRST_TOKEN_GROUP + len(TOKEN_PATTERNS)
+MASTER_PATTERN = "|".join(
+    ("([ \\t\\n]+)",)
+    + tuple(f"({pattern})" for _, pattern in TOKEN_PATTERNS)
+    + ("([\\s\\S])",)
+)
+
+Source = typing.Union[str, bytes, bytearray, memoryview, mmap.mmap]
+Token = typing.Tuple[str, typing.Any, int]
+
+master_patterns: typing.Dict[type, typing.Pattern] = {}
+
+
+def master_pattern(source: Source) -> typing.Pattern:
+    kind = str if isinstance(source, str) else bytes
+    if kind not in master_patterns:
+        master_patterns[kind] = re.compile(
+            MASTER_PATTERN if kind is str else MASTER_PATTERN.encode()
+        )
+    return master_patterns[kind]
+
+
+def illegal_character(source: Source, offset: int) -> ValueError:
+    character = source[offset : offset + 1]
+    if not isinstance(character, str):
+        character = bytes(character).decode("latin-1")
+    return ValueError("Illegal character", character)
+
+
+def token_value(source: Source, token_type: int, start: int, end: int) -> typing.Any:
+    text = source[start:end]
+    if not isinstance(text, str):
+        text = bytes(text).decode("ascii")
+    if token_type == NUMBER:
+        return float(text)
+    return text
+
+
+class TokenArray:
+    # Tokens as parallel arrays of type ids (indices into TOKEN_TYPES) and
+    # start and end offsets into the source. Values are sliced out of the
+    # source and converted only when asked for.
+    def __init__(self, source: Source):
+        self.source = source
+        offsets = "I" if len(source) <= 0xFFFFFFFF else "Q"
+        self.types = array.array("B")
+        self.starts = array.array(offsets)
+        self.ends = array.array(offsets)
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def kind(self, index: int) -> str:
+        if index >= len(self.types):
+            return END
+        return TOKEN_TYPES[self.types[index]]
+
+    def offset(self, index: int) -> int:
+        if index >= len(self.types):
+            return len(self.source)
+        return self.starts[index]
+
+    def value(self, index: int) -> typing.Any:
+        if index >= len(self.types):
+            return None
+        return token_value(
+            self.source, self.types[index], self.starts[index], self.ends[index]
+        )
+
+    def __iter__(self) -> typing.Iterator[Token]:
+        for index in range(len(self.types)):
+            yield self.kind(index), self.value(index), self.starts[index]
+
+
+def scan(source: Source) -> TokenArray:
+    tokens = TokenArray(source)
+    types = tokens.types
+    starts = tokens.starts
+    ends = tokens.ends
+    for match in master_pattern(source).finditer(source):  # type: ignore
+        group = match.lastindex
+        if group == SKIP_GROUP:
+            continue
+        if group == ERROR_GROUP:
+            raise illegal_character(source, match.start())
+        start, end = match.span()
+        types.append(group - FIRST_TOKEN_GROUP)  # type: ignore
+        starts.append(start)
+        ends.append(end)
+    return tokens
+
+
+def iterate_tokens(source: Source) -> typing.Iterator[Token]:
+    # scans as it goes, for consumers that stop early or stream the tokens
+    for match in master_pattern(source).finditer(source):  # type: ignore
+        group = match.lastindex
+        if group == SKIP_GROUP:
+            continue
+        if group == ERROR_GROUP:
+            raise illegal_character(source, match.start())
+        token_type = group - FIRST_TOKEN_GROUP  # type: ignore
+        start, end = match.span()
+        yield TOKEN_TYPES[token_type], token_value(
+            source, token_type, start, end
+        ), start
@@ -0,0 +1,107 @@
+import typing
+from dataclasses import replace
+import drip.ops as ops
+from drip.program import LazySubroutines, Program, Subroutine, subroutine_arguments
+
+
+class StackDepthError(ValueError):
+    pass
+
+
+def flag_targets(subroutine: Subroutine) -> typing.Dict[str, int]:
+    targets: typing.Dict[str, int] = {}
+    for index, op in enumerate(subroutine.ops):
+        if isinstance(op, ops.SetFlagOp):
+            if op.flag in targets:
+                raise StackDepthError(f"Flag {op.flag} set twice")
+            # BRANCH_TO_FLAG resumes at the op after the SET_FLAG
+            targets[op.flag] = index + 1
+    return targets
+
+
+def successors(
+    op: ops.ByteCodeOp, index: int, targets: typing.Dict[str, int]
+) -> typing.Tuple[int, ...]:
+    if isinstance(op, ops.ReturnOp):
+        return tuple()
+    elif isinstance(op, ops.BranchToFlagOp):
+        if op.flag not in targets:
+            raise StackDepthError(f"Branch to unknown flag {op.flag}")
+        return (index + 1, targets[op.flag])
+    else:
+        return (index + 1,)
+
+
+def op_stack_effect(program: Program, op: ops.ByteCodeOp) -> ops.StackEffect:
+    if isinstance(op, ops.SubroutineOp):
+        return op.stack_effect(program.structures)
+    elif isinstance(op, ops.CallSubroutineOp):
+        if op.name not in program.subroutines:
+            raise StackDepthError(f"Call to unknown subroutine {op.name}")
+        return ops.StackEffect(
+            pops=len(subroutine_arguments(program, op.name)), pushes=1
+        )
+    else:
+        raise StackDepthError(f"Op {op.op_code} not legal inside subroutines")
+
+
+def stack_depths(
+    program: Program, subroutine: Subroutine
+) -> typing.Tuple[typing.Optional[int], ...]:
+    targets = flag_targets(subroutine)
+    depths: typing.List[typing.Optional[int]] = [None] * len(subroutine.ops)
+    worklist = [(0, 0)]
+    while len(worklist) > 0:
+        index, depth = worklist.pop()
+        if index >= len(subroutine.ops):
+            continue
+        known_depth = depths[index]
+        if known_depth is not None:
+            if known_depth != depth:
+                raise StackDepthError(
+                    f"Unbalanced stack at op {index}: {known_depth} != {depth}"
+                )
+            continue
+        depths[index] = depth
+        op = subroutine.ops[index]
+        effect = op_stack_effect(program, op)
+        if effect.pops > depth:
+            raise StackDepthError(f"Stack underflow at op {index} ({op.op_code})")
+        next_depth = depth - effect.pops + effect.pushes
+        for successor in successors(op, index, targets):
+            worklist.append((successor, next_depth))
+    return tuple(depths)
+
+
+def compute_max_stack_depth(program: Program, subroutine: Subroutine) -> int:
+    max_depth = 0
+    for op, depth in zip(subroutine.ops, stack_depths(program, subroutine)):
+        if depth is None:
+            continue
+        effect = op_stack_effect(program, op)
+        max_depth = max(max_depth, depth, depth - effect.pops + effect.pushes)
+    return max_depth
+
+
+def annotate_subroutine(program: Program, subroutine: Subroutine) -> Subroutine:
+    if subroutine.max_stack_depth is not None:
+        return subroutine
+    return replace(
+        subroutine, max_stack_depth=compute_max_stack_depth(program, subroutine)
+    )
+
+
+def annotate_stack_depths(program: Program) -> Program:
+    # lazy subroutines are annotated as they compile, so leave them lazy
+    if isinstance(program.subroutines, LazySubroutines) or all(
+        subroutine.max_stack_depth is not None
+        for subroutine in program.subroutines.values()
+    ):
+        return program
+    return replace(
+        program,
+        subroutines={
+            name: annotate_subroutine(program, subroutine)
+            for name, subroutine in program.subroutines.items()
+        },
+    )
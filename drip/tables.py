@@ -0,0 +1,230 @@
+import hashlib
+import os
+import re
+import sys
+import types
+import typing
+from dataclasses import dataclass, field, fields
+import lib.ply.lex as lex
+import lib.ply.yacc as yacc
+
+# drip.lex and drip.parse load their lexer and LALR tables from the
+# generated module below instead of reflecting over their rules on import.
+# Each table carries a signature of the rules it was built from; when the
+# rules change the tables are ignored and rebuilt with PLY until they are
+# regenerated with `python -m drip.tables`.
+TABLES_MODULE = "drip.parse_tables"
+TABLES_PATH = os.path.join(os.path.dirname(__file__), "parse_tables.py")
+TABLES_VERSION = 1
+LEX_REFLAGS = int(re.VERBOSE)
+
+# per regex group: None, or the rule name, its token type and whether the
+# rule is a function to call on each match
+LexRule = typing.Optional[typing.Tuple[str, typing.Optional[str], bool]]
+
+
+def rules(module: types.ModuleType, prefix: str) -> typing.List[typing.Any]:
+    # PLY orders function rules by their position in the module
+    functions = sorted(
+        (
+            value
+            for name, value in vars(module).items()
+            if name.startswith(prefix) and isinstance(value, types.FunctionType)
+        ),
+        key=lambda function: function.__code__.co_firstlineno,
+    )
+    strings: typing.List[typing.Tuple[str, typing.Optional[str]]] = sorted(
+        (name, value)
+        for name, value in vars(module).items()
+        if name.startswith(prefix) and isinstance(value, str)
+    )
+    return [(function.__name__, function.__doc__) for function in functions] + strings
+
+
+def signature(module: types.ModuleType, prefix: str) -> str:
+    return hashlib.sha256(
+        repr(
+            (TABLES_VERSION, getattr(module, "tokens"), rules(module, prefix))
+        ).encode()
+    ).hexdigest()
+
+
+@dataclass
+class GeneratedTables:
+    # the values of the generated module, each named in upper case there
+    lex_signature: str
+    lex_regexes: typing.List[str]
+    lex_rules: typing.List[typing.List[LexRule]]
+    lex_ignore: str
+    parse_signature: str
+    lr_productions: typing.List[typing.Tuple[str, int, typing.Optional[str], str]]
+    lr_action: typing.Dict[int, typing.Dict[str, int]]
+    lr_goto: typing.Dict[int, typing.Dict[str, int]]
+
+
+def load_tables() -> typing.Optional[GeneratedTables]:
+    try:
+        module = __import__(TABLES_MODULE, fromlist=["*"])
+        return GeneratedTables(
+            **{
+                table.name: getattr(module, table.name.upper())
+                for table in fields(GeneratedTables)
+            }
+        )
+    except (ImportError, AttributeError):
+        return None
+
+
+def lexer_from_tables(module: types.ModuleType, tables: GeneratedTables) -> lex.Lexer:
+    namespace = vars(module)
+    lexer = lex.Lexer()
+    lexer.lextokens = set(namespace["tokens"])
+    lexer.lextokens_all = lexer.lextokens
+    master = []
+    for text, entries in zip(tables.lex_regexes, tables.lex_rules):
+        master.append(
+            (
+                re.compile(text, LEX_REFLAGS),
+                [
+                    None
+                    if entry is None
+                    else (namespace[entry[0]] if entry[2] else None, entry[1])
+                    for entry in entries
+                ],
+            )
+        )
+    lexer.lexstateinfo = {"INITIAL": "inclusive"}
+    lexer.lexstatere = {"INITIAL": master}
+    lexer.lexstateretext = {"INITIAL": list(tables.lex_regexes)}
+    lexer.lexstaterenames = {
+        "INITIAL": [
+            [None if entry is None else entry[0] for entry in entries]
+            for entries in tables.lex_rules
+        ]
+    }
+    lexer.lexre = master
+    lexer.lexretext = lexer.lexstateretext["INITIAL"]
+    lexer.lexreflags = LEX_REFLAGS
+    lexer.lexstateignore = {"INITIAL": tables.lex_ignore}
+    lexer.lexignore = tables.lex_ignore
+    lexer.lexstateerrorf = {"INITIAL": namespace["t_error"]}
+    lexer.lexerrorf = namespace["t_error"]
+    # parsers without an explicit lexer use the last one built, as after lex()
+    lex.lexer = lexer
+    lex.token = lexer.token
+    lex.input = lexer.input
+    return lexer
+
+
+def build_lexer(module: types.ModuleType) -> lex.Lexer:
+    tables = load_tables()
+    if tables is not None and tables.lex_signature == signature(module, "t_"):
+        return lexer_from_tables(module, tables)
+    return lex.lex(module=module, reflags=LEX_REFLAGS)
+
+
+@dataclass
+class TableProduction:
+    # the parts of a yacc Production the LR driver uses while parsing
+    name: str
+    len: int
+    func: typing.Optional[str]
+    str: str
+    callable: typing.Optional[typing.Callable] = field(default=None, repr=False)
+
+
+@dataclass
+class LRTables:
+    lr_productions: typing.List[TableProduction]
+    lr_action: typing.Dict[int, typing.Dict[str, int]]
+    lr_goto: typing.Dict[int, typing.Dict[str, int]]
+
+
+def parser_from_tables(
+    module: types.ModuleType, tables: GeneratedTables
+) -> yacc.LRParser:
+    namespace = vars(module)
+    productions = [
+        TableProduction(
+            name=name,
+            len=length,
+            func=func,
+            str=text,
+            callable=namespace[func] if func is not None else None,
+        )
+        for name, length, func, text in tables.lr_productions
+    ]
+    return yacc.LRParser(
+        LRTables(productions, tables.lr_action, tables.lr_goto),
+        namespace.get("p_error"),
+    )
+
+
+def build_parser(module: types.ModuleType) -> yacc.LRParser:
+    tables = load_tables()
+    if tables is not None and tables.parse_signature == signature(module, "p_"):
+        return parser_from_tables(module, tables)
+    return yacc.yacc(module=module)
+
+
+def lexer_tables(lexer: lex.Lexer) -> typing.Tuple[typing.List[str], typing.List]:
+    if lexer.lexstateinfo != {"INITIAL": "inclusive"}:
+        raise ValueError("Only lexers with a single INITIAL state can be tabled")
+    regexes = lexer.lexstateretext["INITIAL"]
+    entries: typing.List[typing.List[LexRule]] = []
+    for (_, findex), names in zip(
+        lexer.lexstatere["INITIAL"], lexer.lexstaterenames["INITIAL"]
+    ):
+        entries.append(
+            [
+                None if f is None else (name, f[1], f[0] is not None)
+                for f, name in zip(findex, names)
+            ]
+        )
+    return regexes, entries
+
+
+def render_tables(
+    lex_module: types.ModuleType,
+    lexer: lex.Lexer,
+    parse_module: types.ModuleType,
+    parser: yacc.LRParser,
+) -> str:
+    regexes, entries = lexer_tables(lexer)
+    productions = [
+        (production.name, production.len, production.func, production.str)
+        for production in parser.productions
+    ]
+    values = (
+        ("TABLES_VERSION", TABLES_VERSION),
+        ("LEX_SIGNATURE", signature(lex_module, "t_")),
+        ("LEX_REGEXES", regexes),
+        ("LEX_RULES", entries),
+        ("LEX_IGNORE", lexer.lexignore),
+        ("PARSE_SIGNATURE", signature(parse_module, "p_")),
+        ("LR_PRODUCTIONS", productions),
+        ("LR_ACTION", parser.action),
+        ("LR_GOTO", parser.goto),
+    )
+    return "# Generated by python -m drip.tables, do not edit\n" + "".join(
+        f"{name} = {value!r}\n" for name, value in values
+    )
+
+
+def main() -> None:
+    import drip.lex
+    import drip.parse
+
+    source = render_tables(
+        drip.lex,
+        lex.lex(module=drip.lex, reflags=LEX_REFLAGS),
+        drip.parse,
+        yacc.yacc(module=drip.parse),
+    )
+    with open(TABLES_PATH, "w") as f:
+        f.write(source)
+    sys.stdout.write(f"wrote {TABLES_PATH}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,16 +2,58 @@ from __future__ import annotations
 import typing
 from drip.constants import INDENT
 from functools import cached_property
-from dataclasses import replace
+from dataclasses import fields, replace
 from drip.validated_dataclass import validated_dataclass
 import abc
+import weakref
 
+C = typing.TypeVar("C")
 
+
+def interned(cls: typing.Type[C]) -> typing.Type[C]:
+    # Hash-consing: every distinct type is built once and shared, so equality
+    # and hashing are identity-based instead of deep dataclass comparisons.
+    # Fields are interned before their parents, so keys are shallow.
+    table: typing.MutableMapping[
+        typing.Tuple[typing.Any, ...], typing.Any
+    ] = weakref.WeakValueDictionary()
+    init: typing.Callable[..., None] = cls.__init__
+    class_fields = fields(cls)  # type: ignore
+
+    def __new__(klass: typing.Type[C], **kwargs: typing.Any) -> C:
+        instance = object.__new__(klass)
+        init(instance, **kwargs)
+        key = tuple(getattr(instance, field.name) for field in class_fields)
+        return table.setdefault(key, instance)
+
+    def __init__(self: object, **kwargs: typing.Any) -> None:
+        pass
+
+    def __reduce__(self: object) -> typing.Tuple[typing.Any, ...]:
+        return (
+            intern_type,
+            (cls, {field.name: getattr(self, field.name) for field in class_fields}),
+        )
+
+    cls.__new__ = __new__  # type: ignore
+    cls.__init__ = __init__  # type: ignore
+    cls.__reduce__ = __reduce__  # type: ignore
+    cls.__eq__ = object.__eq__  # type: ignore
+    cls.__hash__ = object.__hash__  # type: ignore
+    return cls
+
+
+def intern_type(cls: typing.Type[C], kwargs: typing.Dict[str, typing.Any]) -> C:
+    return cls(**kwargs)  # type: ignore
+
+
+@interned
 @validated_dataclass
 class Placeholder:
     name: str
 
 
+@interned
 @validated_dataclass
 class ArgumentDefinition:
     name: str
@@ -22,6 +64,7 @@ class ArgumentDefinition:
         return f"{self.name}: {self.type_name}"
 
 
+@interned
 @validated_dataclass
 class StructureDefinition:
     fields: typing.Tuple[ArgumentDefinition, ...]
@@ -62,11 +105,13 @@ class StructureDefinition:
         )
 
 
+@interned
 @validated_dataclass
 class StructureType:
     structure: StructureDefinition
 
 
+@interned
 @validated_dataclass
 class PrimitiveType:
     primitive: typing.Union[
@@ -91,11 +136,19 @@ DripType = typing.Union[
 ]
 
 
+@interned
 @validated_dataclass
 class ConcreteType:
     type: DripType
 
 
+PRIMITIVE_TYPES = {
+    name: ConcreteType(type=PrimitiveType(primitive=primitive))
+    for name, primitive in PRIMITIVES.items()
+}
+
+
+@interned
 @validated_dataclass
 class TypeParameter:
     name: str
@@ -59,7 +59,11 @@ def validate_dict(
         )
     args = typing.get_args(expected_type)
     key_type, value_type = args
-    for key, subvalue in value.items():
+    # Only the entries actually stored are validated. dict subclasses that
+    # build entries on access (drip.program.LazySubroutines) override items()
+    # to build everything, which validation must not trigger; entries built
+    # later are not validated. For plain dicts this is the same as items().
+    for key, subvalue in dict.items(value):
         validate(key_type, key, config)
         validate(value_type, subvalue, config)
 
@@ -0,0 +1,312 @@
+import typing
+from dataclasses import replace
+import drip.ops as ops
+import drip.typecheck as drip_typing
+from drip.basetypes import TaggedValue
+from drip.validated_dataclass import validated_dataclass
+from drip.program import Program, Subroutine
+from drip.stack_depth import (
+    StackDepthError,
+    annotate_stack_depths,
+    flag_targets,
+    successors,
+)
+
+
+@validated_dataclass
+class TaggedValueType:
+    tag: typing.Union[typing.Type[int], typing.Type[float]]
+
+
+@validated_dataclass
+class StructureValueType:
+    name: str
+
+
+@validated_dataclass
+class UnknownValueType:
+    pass
+
+
+AbstractValue = typing.Union[TaggedValueType, StructureValueType, UnknownValueType]
+# None is the bottom of the lattice: no value has been seen yet
+MaybeValue = typing.Optional[AbstractValue]
+
+UNKNOWN = UnknownValueType()
+
+
+def join_values(a: MaybeValue, b: MaybeValue) -> MaybeValue:
+    if a is None:
+        return b
+    if b is None or a == b:
+        return a
+    return UNKNOWN
+
+
+@validated_dataclass
+class AbstractState:
+    stack: typing.Tuple[MaybeValue, ...]
+    names: typing.Dict[str, MaybeValue]
+    set_flags: typing.Tuple[str, ...]
+    maybe_set_flags: typing.Tuple[str, ...]
+
+
+def join_states(a: AbstractState, b: AbstractState) -> AbstractState:
+    assert len(a.stack) == len(b.stack)
+    return AbstractState(
+        stack=tuple(join_values(x, y) for x, y in zip(a.stack, b.stack)),
+        names={
+            name: join_values(value, b.names[name])
+            for name, value in a.names.items()
+            if name in b.names
+        },
+        set_flags=tuple(sorted(set(a.set_flags) & set(b.set_flags))),
+        maybe_set_flags=tuple(sorted(set(a.maybe_set_flags) | set(b.maybe_set_flags))),
+    )
+
+
+@validated_dataclass
+class VerificationResult:
+    errors: typing.Tuple[str, ...] = tuple()
+
+    @property
+    def verified(self) -> bool:
+        return len(self.errors) == 0
+
+
+class ProgramVerifier:
+    def __init__(self, program: Program):
+        self.program = program
+        self.argument_types: typing.Dict[str, typing.Tuple[MaybeValue, ...]] = {
+            "main": tuple()
+        }
+        self.return_types: typing.Dict[str, MaybeValue] = {}
+        self.errors: typing.List[str] = []
+        self.report = False
+        self.changed = False
+
+    def error(self, subroutine_name: str, index: int, message: str) -> None:
+        if self.report:
+            self.errors.append(f"{subroutine_name}:{index}: {message}")
+
+    def field_type(self, field_type: drip_typing.ExpressionType) -> AbstractValue:
+        if isinstance(field_type, drip_typing.ConcreteType):
+            if isinstance(field_type.type, drip_typing.PrimitiveType):
+                return TaggedValueType(tag=field_type.type.primitive)
+            for name, structure in self.program.structures.items():
+                if structure == field_type.type.structure:
+                    return StructureValueType(name=name)
+        return UNKNOWN
+
+    def update_return(self, name: str, value: MaybeValue) -> None:
+        joined = join_values(self.return_types.get(name), value)
+        if joined != self.return_types.get(name):
+            self.return_types[name] = joined
+            self.changed = True
+
+    def update_arguments(
+        self, name: str, values: typing.Tuple[MaybeValue, ...]
+    ) -> None:
+        if name not in self.argument_types:
+            joined = values
+        else:
+            joined = tuple(
+                join_values(a, b) for a, b in zip(self.argument_types[name], values)
+            )
+        if joined != self.argument_types.get(name):
+            self.argument_types[name] = joined
+            self.changed = True
+
+    def expect_tagged(
+        self, name: str, index: int, value: MaybeValue
+    ) -> typing.Optional[TaggedValueType]:
+        if isinstance(value, TaggedValueType):
+            return value
+        self.error(name, index, f"expected a tagged value, got {value}")
+        return None
+
+    def step(
+        self, name: str, index: int, op: ops.ByteCodeOp, state: AbstractState
+    ) -> AbstractState:
+        stack = list(state.stack)
+        names = state.names
+        set_flags = state.set_flags
+        maybe_set_flags = state.maybe_set_flags
+        if isinstance(op, ops.CallSubroutineOp):
+            callee = self.program.subroutines[op.name]
+            count = len(callee.arguments)
+            arguments = tuple(stack[len(stack) - count :])
+            del stack[len(stack) - count :]
+            self.update_arguments(op.name, arguments)
+            stack.append(self.return_types.get(op.name))
+        elif isinstance(op, ops.ReturnOp):
+            self.update_return(name, stack.pop())
+        elif isinstance(op, (ops.PushFromNameOp, ops.PrintNameOp)):
+            if op.name not in names:
+                self.error(name, index, f"name {op.name} may be undefined")
+            if isinstance(op, ops.PushFromNameOp):
+                stack.append(names.get(op.name, UNKNOWN))
+        elif isinstance(op, ops.PopToNameOp):
+            names = {**names, op.name: stack.pop()}
+        elif isinstance(op, ops.PushFromLiteralOp):
+            assert isinstance(op.value, TaggedValue)
+            stack.append(TaggedValueType(tag=op.value.tag))
+        elif isinstance(op, ops.StoreFromLiteralOp):
+            assert isinstance(op.value, TaggedValue)
+            names = {**names, op.name: TaggedValueType(tag=op.value.tag)}
+        elif isinstance(op, ops.TypedBinaryOp):
+            expected: AbstractValue = TaggedValueType(tag=op.tag)
+            for value in (stack.pop(), stack.pop()):
+                if value != expected:
+                    self.error(name, index, f"{op.op_code} got {value}")
+            stack.append(expected)
+        elif isinstance(op, ops.PopAndPushPropertyOfKnownStructureOp):
+            entity = stack.pop()
+            lookup = self.program.structures[op.structure].field_lookup
+            if entity != StructureValueType(name=op.structure):
+                self.error(name, index, f"{op.op_code} got {entity}")
+            if op.property not in lookup:
+                self.error(name, index, f"{op.structure} has no {op.property}")
+                stack.append(UNKNOWN)
+            else:
+                stack.append(self.field_type(lookup[op.property].type))
+        elif isinstance(op, ops.BinaryAddOp):
+            rhs = self.expect_tagged(name, index, stack.pop())
+            lhs = self.expect_tagged(name, index, stack.pop())
+            if lhs is not None and rhs is not None and lhs != rhs:
+                self.error(name, index, f"adding mismatched tags {lhs} and {rhs}")
+            stack.append(lhs if lhs == rhs else UNKNOWN)
+        elif isinstance(op, ops.BinarySubtractOp):
+            lhs = self.expect_tagged(name, index, stack.pop())
+            self.expect_tagged(name, index, stack.pop())
+            stack.append(lhs if lhs is not None else UNKNOWN)
+        elif isinstance(op, ops.ConstructStructureOp):
+            structure = self.program.structures[op.structure]
+            count = len(structure.fields)
+            values = stack[len(stack) - count :]
+            del stack[len(stack) - count :]
+            for field, value in zip(structure.fields, values):
+                expected = self.field_type(field.type)
+                if expected != UNKNOWN and value != expected:
+                    self.error(
+                        name,
+                        index,
+                        f"field {field.name} expects {expected}, got {value}",
+                    )
+            stack.append(StructureValueType(name=op.structure))
+        elif isinstance(op, ops.PopAndPushPropertyOp):
+            entity = stack.pop()
+            if not isinstance(entity, StructureValueType):
+                self.error(name, index, f"property access on {entity}")
+                stack.append(UNKNOWN)
+            else:
+                lookup = self.program.structures[entity.name].field_lookup
+                if op.property not in lookup:
+                    self.error(name, index, f"{entity.name} has no {op.property}")
+                    stack.append(UNKNOWN)
+                else:
+                    stack.append(self.field_type(lookup[op.property].type))
+        elif isinstance(op, ops.SetFlagOp):
+            if op.flag in maybe_set_flags:
+                self.error(name, index, f"flag {op.flag} may already be set")
+            set_flags = tuple(sorted(set(set_flags) | {op.flag}))
+            maybe_set_flags = tuple(sorted(set(maybe_set_flags) | {op.flag}))
+        elif isinstance(op, ops.BranchToFlagOp):
+            if op.flag not in set_flags:
+                self.error(name, index, f"flag {op.flag} may not be set")
+            self.expect_tagged(name, index, stack.pop())
+        elif isinstance(op, ops.NoopOp):
+            pass
+        else:
+            self.error(name, index, f"unverifiable op {op.op_code}")
+            raise ValueError(f"Op {op.op_code} cannot be verified")
+        return AbstractState(
+            stack=tuple(stack),
+            names=names,
+            set_flags=set_flags,
+            maybe_set_flags=maybe_set_flags,
+        )
+
+    def analyze_subroutine(self, name: str, report: bool = False) -> None:
+        subroutine = self.program.subroutines[name]
+        targets = flag_targets(subroutine)
+        states: typing.List[typing.Optional[AbstractState]] = [None] * len(
+            subroutine.ops
+        )
+        entry = AbstractState(
+            stack=tuple(),
+            names=dict(zip(subroutine.arguments, self.argument_types[name])),
+            set_flags=tuple(),
+            maybe_set_flags=tuple(),
+        )
+        worklist: typing.List[typing.Tuple[int, AbstractState]] = [(0, entry)]
+        while len(worklist) > 0:
+            index, state = worklist.pop()
+            if index >= len(subroutine.ops):
+                # falling off the end returns a default int
+                self.update_return(name, TaggedValueType(tag=int))
+                continue
+            known = states[index]
+            if known is not None:
+                joined = join_states(known, state)
+                if joined == known:
+                    continue
+                state = joined
+            states[index] = state
+            op = subroutine.ops[index]
+            next_state = self.step(name, index, op, state)
+            for successor in successors(op, index, targets):
+                worklist.append((successor, next_state))
+
+        if report:
+            # reachable states are final now, so recheck each op once
+            self.report = True
+            for index, final_state in enumerate(states):
+                if final_state is not None:
+                    self.step(name, index, subroutine.ops[index], final_state)
+            self.report = False
+
+    def run(self) -> VerificationResult:
+        self.changed = True
+        while self.changed:
+            self.changed = False
+            for name in list(self.argument_types):
+                self.analyze_subroutine(name)
+        for name in list(self.argument_types):
+            self.analyze_subroutine(name, report=True)
+        return VerificationResult(errors=tuple(self.errors))
+
+
+def verify_program(program: Program) -> VerificationResult:
+    try:
+        program = annotate_stack_depths(program)
+        if "main" not in program.subroutines:
+            return VerificationResult(errors=("no main subroutine",))
+        for subroutine in program.subroutines.values():
+            for op in subroutine.ops:
+                if (
+                    isinstance(op, ops.CallSubroutineOp)
+                    and op.name not in program.subroutines
+                ):
+                    return VerificationResult(errors=(f"unknown subroutine {op.name}",))
+                if (
+                    isinstance(
+                        op,
+                        (
+                            ops.ConstructStructureOp,
+                            ops.PopAndPushPropertyOfKnownStructureOp,
+                        ),
+                    )
+                    and op.structure not in program.structures
+                ):
+                    return VerificationResult(
+                        errors=(f"unknown structure {op.structure}",)
+                    )
+        return ProgramVerifier(program).run()
+    except (StackDepthError, ValueError) as e:
+        return VerificationResult(errors=(str(e),))
+
+
+def load_program(program: Program) -> Program:
+    program = annotate_stack_depths(program)
+    return replace(program, verified=verify_program(program).verified)
@@ -0,0 +1,82 @@
+import drip.ops as ops
+from drip.adaptive import AdaptiveCode, AdaptiveState
+from drip.basetypes import Frame, TaggedValue
+from drip.compile_ast import compile_ast
+from drip.interpreter import execute_program
+from drip.parse import parser
+from drip.parse_asm import parse_asm_program
+from drip.program import Subroutine
+from tests.test_lex_parse import LINE_PROGRAM
+from tests.test_stack_depth import LOOP, snippet_program
+
+
+def test_adaptive_loop_specializes() -> None:
+    program = snippet_program(LOOP)
+    adaptive = AdaptiveState(warmup=2)
+    assert execute_program(program, adaptive=adaptive) == TaggedValue(tag=int, value=12)
+    code = adaptive.code["main"]
+    assert code.specializations == 2
+    assert any(isinstance(op, ops.BinaryAddIntOp) for op in code.ops)
+    assert any(isinstance(op, ops.BinarySubtractIntOp) for op in code.ops)
+
+
+def test_adaptive_property_specializes() -> None:
+    program = compile_ast(parser.parse(LINE_PROGRAM).finalize())
+    adaptive = AdaptiveState(warmup=1)
+    assert execute_program(program, adaptive=adaptive) == TaggedValue(
+        tag=float, value=9
+    )
+    code = adaptive.code["manhattan_length"]
+    assert any(
+        isinstance(op, ops.PopAndPushPropertyOfKnownStructureOp) for op in code.ops
+    )
+    assert any(isinstance(op, ops.BinaryAddFloatOp) for op in code.ops)
+
+
+def test_adaptive_deoptimizes_on_guard_failure() -> None:
+    code = AdaptiveCode(
+        Subroutine(ops=(ops.BinaryAddOp(),), arguments=tuple()), warmup=1
+    )
+    frame = Frame.allocate(2)
+    frame.push(TaggedValue(tag=int, value=1))
+    frame.push(TaggedValue(tag=int, value=2))
+    code.execute(0, frame, trusted=False)
+    assert isinstance(code.ops[0], ops.BinaryAddIntOp)
+    assert frame.pop() == TaggedValue(tag=int, value=3)
+
+    frame.push(TaggedValue(tag=float, value=1.5))
+    frame.push(TaggedValue(tag=float, value=2.0))
+    code.execute(0, frame, trusted=False)
+    assert frame.pop() == TaggedValue(tag=float, value=3.5)
+    assert code.ops[0] == ops.BinaryAddOp()
+    assert code.deoptimizations == 1
+
+
+def test_specialized_asm_ops() -> None:
+    program = parse_asm_program(
+        """
+    START_SUBROUTINE main
+    PUSH_FROM_LITERAL int 2
+    PUSH_FROM_LITERAL int 3
+    BINARY_ADD_INT_INT
+    RETURN
+    END_SUBROUTINE main
+    """
+    )
+    assert program.verified
+    assert execute_program(program) == TaggedValue(tag=int, value=5)
+
+
+def test_specialized_asm_op_falls_back() -> None:
+    program = parse_asm_program(
+        """
+    START_SUBROUTINE main
+    PUSH_FROM_LITERAL float 2
+    PUSH_FROM_LITERAL float 3
+    BINARY_ADD_INT_INT
+    RETURN
+    END_SUBROUTINE main
+    """
+    )
+    assert not program.verified
+    assert execute_program(program) == TaggedValue(tag=float, value=5)
@@ -1,7 +1,12 @@
-from drip.parse_asm import parse_asm_snippet, parse_asm_program
-from drip.interpreter import interpret_program
+import io
+import mmap
+import pathlib
+import typing
+import pytest
+from drip.parse_asm import AsmIndex, load_asm_file, parse_asm_snippet, parse_asm_program
+from drip.interpreter import execute_program, interpret_program
 from drip.basetypes import StackValue, TaggedValue
-from drip.program import Subroutine, Program
+from drip.program import LazySubroutines, Subroutine, Program
 
 
 def run_asm_snippet(snippet: str) -> StackValue:
@@ -125,3 +130,81 @@ def test_asm_inc_twice() -> None:
         )
     )
     assert result == TaggedValue(tag=int, value=7)
+
+
+INC_TWICE = """
+START_SUBROUTINE inc x
+PUSH_FROM_NAME x
+PUSH_FROM_LITERAL int 1
+BINARY_ADD
+RETURN
+END_SUBROUTINE inc
+
+START_SUBROUTINE unused
+THIS_IS_NOT_AN_OP
+END_SUBROUTINE unused
+
+START_SUBROUTINE main
+PUSH_FROM_LITERAL int 5
+CALL_SUBROUTINE inc
+CALL_SUBROUTINE inc
+RETURN
+END_SUBROUTINE main
+"""
+
+
+def test_asm_file_loads_lazily(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "inc.asm"
+    path.write_text(INC_TWICE)
+    with AsmIndex(path) as index:
+        program = index.program()
+        assert set(index.spans) == {"inc", "unused", "main"}
+        assert execute_program(program) == TaggedValue(tag=int, value=7)
+        assert set(dict.keys(program.subroutines)) == {"inc", "main"}
+    with pytest.raises(KeyError):
+        parse_asm_program(INC_TWICE)
+
+
+def test_asm_file_path(tmp_path: pathlib.Path) -> None:
+    path = tmp_path / "inc.asm"
+    path.write_text(INC_TWICE)
+    program = load_asm_file(path)
+    assert isinstance(program.subroutines, LazySubroutines)
+    assert len(program.subroutines.compiled()) == 0
+    assert execute_program(program) == TaggedValue(tag=int, value=7)
+    assert set(program.subroutines.compiled()) == {"inc", "main"}
+    with AsmIndex(path) as index:
+        # bodies are left in the mapped file rather than read during indexing
+        assert isinstance(index.file, mmap.mmap)
+        assert all(span.body is None for span in index.spans.values())
+        closed = index.program()
+    with pytest.raises(ValueError, match="after its file was closed"):
+        execute_program(closed)
+
+
+def test_asm_file_objects() -> None:
+    sources: typing.Tuple[typing.Union[typing.BinaryIO, typing.TextIO], ...] = (
+        io.BytesIO(INC_TWICE.encode()),
+        io.StringIO(INC_TWICE),
+    )
+    for source in sources:
+        program = load_asm_file(source)
+        assert execute_program(program) == TaggedValue(tag=int, value=7)
+
+
+def test_asm_unseekable_stream() -> None:
+    class Unseekable(io.BytesIO):
+        def seekable(self) -> bool:
+            return False
+
+    program = load_asm_file(Unseekable(INC_TWICE.encode()))
+    assert execute_program(program) == TaggedValue(tag=int, value=7)
+
+
+def test_asm_file_structure_errors() -> None:
+    with pytest.raises(ValueError, match="inside a subroutine"):
+        load_asm_file(io.BytesIO(b"START_SUBROUTINE main\nSTART_SUBROUTINE f\n"))
+    with pytest.raises(ValueError, match="outside of subroutine"):
+        load_asm_file(io.BytesIO(b"NOOP\n"))
+    with pytest.raises(ValueError, match="never ended"):
+        load_asm_file(io.BytesIO(b"START_SUBROUTINE main\nNOOP\n"))
@@ -0,0 +1,91 @@
+import pathlib
+import pickle
+import pytest
+from drip.basetypes import TaggedValue
+from drip.bytecode_file import (
+    BytecodeFile,
+    BytecodeFormatError,
+    FLAG_VERIFIED,
+    MAGIC,
+    dump_program,
+    load_program_file,
+    write_program,
+)
+from drip.compile_ast import compile_ast
+from drip.interpreter import execute_program
+from drip.parse import parser
+from drip.verifier import load_program
+from tests.test_lex_parse import LINE_PROGRAM
+from tests.test_monomorphize import GENERIC_PROGRAM
+from tests.test_stack_depth import LOOP, snippet_program
+
+
+def test_roundtrip(tmp_path: pathlib.Path) -> None:
+    program = compile_ast(parser.parse(LINE_PROGRAM).finalize())
+    path = str(tmp_path / "line.dripb")
+    write_program(program, path)
+    loaded = load_program_file(path)
+    assert not loaded.verified
+    assert load_program(loaded).verified
+    assert loaded.structures == program.structures
+    assert execute_program(loaded) == TaggedValue(tag=float, value=9)
+    for name, subroutine in program.subroutines.items():
+        assert loaded.subroutines[name] == subroutine
+
+
+def test_generic_structures_roundtrip() -> None:
+    program = compile_ast(parser.parse(GENERIC_PROGRAM).finalize())
+    loaded = BytecodeFile(dump_program(program)).program()
+    assert loaded.structures == program.structures
+    assert execute_program(loaded) == TaggedValue(tag=float, value=5.0)
+
+
+def test_lazy_and_loaded_programs_roundtrip() -> None:
+    lazy = compile_ast(parser.parse(LINE_PROGRAM).finalize(), lazy=True)
+    loaded = BytecodeFile(dump_program(lazy)).program()
+    reloaded = BytecodeFile(dump_program(loaded)).program()
+    for program in (loaded, reloaded):
+        assert set(program.subroutines) == {"main", "manhattan_length"}
+        assert execute_program(program) == TaggedValue(tag=float, value=9)
+
+
+def test_constant_pool_is_deduplicated() -> None:
+    program = snippet_program(LOOP)
+    bytecode_file = BytecodeFile(dump_program(program))
+    # int 0, 3, 4 and 1
+    assert bytecode_file.u32(bytecode_file.constants_offset) == 4
+    assert execute_program(bytecode_file.program()) == TaggedValue(tag=int, value=12)
+
+
+def test_smaller_than_pickle() -> None:
+    program = compile_ast(parser.parse(LINE_PROGRAM).finalize())
+    assert len(dump_program(program)) < len(pickle.dumps(program)) / 2
+
+
+def test_rejects_other_files() -> None:
+    with pytest.raises(BytecodeFormatError):
+        BytecodeFile(b"not a drip bytecode file at all, sorry about that...")
+
+
+def test_truncated_files_are_rejected() -> None:
+    data = dump_program(compile_ast(parser.parse(LINE_PROGRAM).finalize()))
+    for length in range(len(data)):
+        with pytest.raises(BytecodeFormatError):
+            program = BytecodeFile(data[:length]).program()
+            execute_program(program)
+
+
+def test_unknown_ops_are_rejected() -> None:
+    data = dump_program(compile_ast(parser.parse(LINE_PROGRAM).finalize()))
+    with pytest.raises(BytecodeFormatError, match="Unknown op"):
+        BytecodeFile(data.replace(b"RETURN", b"RETURX"))
+
+
+def test_verified_flag_is_not_trusted() -> None:
+    program = snippet_program(LOOP)
+    assert not program.verified
+    data = bytearray(dump_program(program))
+    # set FLAG_VERIFIED in the header of an unverified program
+    flags_offset = len(MAGIC) + 4
+    data[flags_offset] |= FLAG_VERIFIED
+    assert not BytecodeFile(bytes(data)).program().verified
@@ -0,0 +1,59 @@
+import os
+import pathlib
+import pytest
+import drip.cache as cache
+from drip.basetypes import TaggedValue
+from drip.cache import BytecodeCache, cache_key, load_source_file
+from drip.interpreter import execute_program
+from tests.test_lex_parse import LINE_PROGRAM
+
+
+def test_cache_roundtrip(tmp_path: pathlib.Path) -> None:
+    bytecode_cache = BytecodeCache(str(tmp_path))
+    assert bytecode_cache.load(LINE_PROGRAM) is None
+    program = bytecode_cache.compile(LINE_PROGRAM)
+    cached = bytecode_cache.load(LINE_PROGRAM)
+    assert cached == program
+    assert cached is not None and cached.verified
+    assert execute_program(cached) == TaggedValue(tag=float, value=9)
+    assert os.listdir(tmp_path) == [cache_key(LINE_PROGRAM) + ".dripc"]
+
+
+def test_cache_invalidation(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    bytecode_cache = BytecodeCache(str(tmp_path))
+    bytecode_cache.compile(LINE_PROGRAM)
+    assert bytecode_cache.load(LINE_PROGRAM.replace("4.", "3.")) is None
+    monkeypatch.setattr(cache, "COMPILER_VERSION", "test")
+    assert bytecode_cache.load(LINE_PROGRAM) is None
+
+
+def test_damaged_entry_is_a_miss(tmp_path: pathlib.Path) -> None:
+    bytecode_cache = BytecodeCache(str(tmp_path))
+    bytecode_cache.compile(LINE_PROGRAM)
+    path = bytecode_cache.path(cache_key(LINE_PROGRAM))
+    with open(path, "r+b") as f:
+        f.truncate(20)
+    assert bytecode_cache.load(LINE_PROGRAM) is None
+    bytecode_cache.compile(LINE_PROGRAM)
+    assert bytecode_cache.load(LINE_PROGRAM) is not None
+
+
+def test_incompatible_entry_is_a_miss(tmp_path: pathlib.Path) -> None:
+    bytecode_cache = BytecodeCache(str(tmp_path))
+    path = bytecode_cache.path(cache_key(LINE_PROGRAM))
+    with open(path, "wb") as f:
+        # a pickle referencing a class that no longer exists
+        f.write(cache.MAGIC + b"cdrip.program\nRemovedProgram\n.")
+    assert bytecode_cache.load(LINE_PROGRAM) is None
+    assert bytecode_cache.compile(LINE_PROGRAM).verified
+    assert bytecode_cache.load(LINE_PROGRAM) is not None
+
+
+def test_load_source_file(tmp_path: pathlib.Path) -> None:
+    source_path = tmp_path / "line.drip"
+    source_path.write_text(LINE_PROGRAM)
+    first = load_source_file(str(source_path))
+    assert (tmp_path / "__dripcache__").is_dir()
+    assert load_source_file(str(source_path)) == first
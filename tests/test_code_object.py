@@ -0,0 +1,64 @@
+import sys
+from dataclasses import replace
+from drip.basetypes import TaggedValue
+from drip.code_object import CodeObject, CodeObjects, execute_code_program
+from drip.compile_ast import compile_ast
+from drip.interpreter import execute_program
+from drip.parse import parser
+from drip.stack_depth import annotate_stack_depths
+from drip.verifier import load_program
+from tests.test_lex_parse import LINE_PROGRAM
+from tests.test_monomorphize import GENERIC_PROGRAM
+from tests.test_stack_depth import LOOP, snippet_program
+
+
+def test_roundtrip() -> None:
+    program = annotate_stack_depths(compile_ast(parser.parse(LINE_PROGRAM).finalize()))
+    for subroutine in program.subroutines.values():
+        code = CodeObject.from_subroutine(subroutine)
+        assert code.opcodes.typecode == "H"
+        assert len(code.operands) == 2 * len(code)
+        assert code.to_subroutine() == subroutine
+
+
+def test_side_tables_are_deduplicated() -> None:
+    code = CodeObject.from_subroutine(snippet_program(LOOP).subroutines["main"])
+    assert len(code.names) == len(set(code.names))
+    assert code.constants == [
+        TaggedValue(tag=int, value=0),
+        TaggedValue(tag=int, value=3),
+        TaggedValue(tag=int, value=4),
+        TaggedValue(tag=int, value=1),
+    ]
+
+
+def test_execute_matches_interpreter() -> None:
+    for source, expected in (
+        (LINE_PROGRAM, TaggedValue(tag=float, value=9)),
+        (GENERIC_PROGRAM, TaggedValue(tag=float, value=5.0)),
+    ):
+        program = compile_ast(parser.parse(source).finalize())
+        assert execute_code_program(program) == expected
+        verified = load_program(program)
+        assert verified.verified
+        assert execute_code_program(verified) == execute_program(verified)
+    loop = load_program(snippet_program(LOOP))
+    assert execute_code_program(loop) == TaggedValue(tag=int, value=12)
+
+
+def test_code_objects_built_on_first_call() -> None:
+    program = load_program(compile_ast(parser.parse(LINE_PROGRAM).finalize()))
+    code_objects = CodeObjects(program)
+    assert code_objects["main"] is code_objects["main"]
+    assert set(code_objects.code) == {"main"}
+
+
+def test_smaller_than_op_tuples() -> None:
+    subroutine = snippet_program(LOOP).subroutines["main"]
+    subroutine = replace(subroutine, ops=subroutine.ops * 100)
+    code = CodeObject.from_subroutine(subroutine)
+    packed = sys.getsizeof(code.opcodes) + sys.getsizeof(code.operands)
+    unpacked = sys.getsizeof(subroutine.ops) + sum(
+        sys.getsizeof(op) for op in subroutine.ops
+    )
+    assert packed < unpacked
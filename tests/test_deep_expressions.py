@@ -0,0 +1,24 @@
+import sys
+from drip.basetypes import TaggedValue
+from drip.compile_ast import compile_ast
+from drip.interpreter import execute_program
+from drip.parse import parser
+from tests.test_typechecker import FLOAT
+
+DEPTH = 2 * sys.getrecursionlimit()
+
+
+def test_deep_expression() -> None:
+    program = parser.parse(
+        f"function deep (x: Float) -> Float ( return {' + '.join(['x'] * DEPTH)}; )"
+        "function main () -> Float ( return deep(x=1.,); )"
+    ).finalize()
+    assert program.type_check().function_return_types["deep"] is FLOAT
+
+    serialized = program.serialize()
+    assert serialized.count("(x + ") == DEPTH - 1
+    assert parser.parse(serialized).finalize().serialize() == serialized
+
+    compiled = compile_ast(program)
+    assert len(compiled.subroutines["deep"].ops) == 2 * DEPTH
+    assert execute_program(compiled) == TaggedValue(tag=float, value=DEPTH)
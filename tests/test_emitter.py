@@ -0,0 +1,57 @@
+import pytest
+import drip.ops as ops
+from drip.basetypes import TaggedValue
+from drip.compile_ast import compile_ast
+from drip.emitter import Emitter, UnresolvedLabelError
+from drip.interpreter import execute_program
+from drip.parse import parser
+from drip.program import Program
+from tests.test_typechecker import variable_name
+
+
+def test_emitter_loop() -> None:
+    emitter = Emitter()
+    emitter.emit(ops.StoreFromLiteralOp(name="x", value=TaggedValue(tag=int, value=0)))
+    emitter.emit(ops.StoreFromLiteralOp(name="c", value=TaggedValue(tag=int, value=3)))
+    start = emitter.new_label("start")
+    emitter.mark(start)
+    emitter.extend(
+        (
+            ops.PushFromNameOp(name="x"),
+            ops.PushFromLiteralOp(value=TaggedValue(tag=int, value=4)),
+            ops.BinaryAddOp(),
+            ops.PopToNameOp(name="x"),
+            ops.PushFromLiteralOp(value=TaggedValue(tag=int, value=1)),
+            ops.PushFromNameOp(name="c"),
+            ops.BinarySubtractOp(),
+            ops.PopToNameOp(name="c"),
+            ops.PushFromNameOp(name="c"),
+        )
+    )
+    emitter.branch(start)
+    emitter.extend((ops.PushFromNameOp(name="x"), ops.ReturnOp()))
+    program = Program(subroutines={"main": emitter.freeze()})
+    assert execute_program(program) == TaggedValue(tag=int, value=12)
+
+
+def test_emitter_rejects_forward_branches() -> None:
+    emitter = Emitter()
+    end = emitter.new_label("end")
+    emitter.emit(ops.PushFromLiteralOp(value=TaggedValue(tag=int, value=1)))
+    emitter.branch(end)
+    emitter.mark(end)
+    with pytest.raises(UnresolvedLabelError):
+        emitter.freeze()
+
+
+def test_compile_long_function() -> None:
+    statements = "".join(
+        f"{variable_name(i)} = {variable_name(i - 1)} + 1.;\n" for i in range(1, 500)
+    )
+    program = parser.parse(
+        f"function main () -> Float ( {variable_name(0)} = 0.; {statements} "
+        f"return {variable_name(499)}; )"
+    ).finalize()
+    compiled = compile_ast(program)
+    assert len(compiled.subroutines["main"].ops) == 2 + 4 * 499 + 2
+    assert execute_program(compiled) == TaggedValue(tag=float, value=499.0)
@@ -0,0 +1,71 @@
+import os
+import pathlib
+import subprocess
+import sys
+import typing
+import pytest
+import drip
+
+RUNTIME = ("drip.program", "drip.interpreter", "drip.bytecode_file", "drip.code_object")
+RUNTIME_IMPORTS = {
+    "drip",
+    "drip.basetypes",
+    "drip.bytecode_file",
+    "drip.code_object",
+    "drip.constants",
+    "drip.interpreter",
+    "drip.ops",
+    "drip.program",
+    "drip.stack_depth",
+    "drip.typecheck",
+    "drip.util",
+    "drip.validated_dataclass",
+}
+RUNTIME_IMPORT_BUDGET_MS = 150
+
+
+def import_times(modules: typing.Iterable[str]) -> typing.Dict[str, int]:
+    # self time in microseconds of each module imported in a fresh process
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, _, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(self_time)
+    return times
+
+
+def drip_modules(times: typing.Dict[str, int]) -> typing.Set[str]:
+    return {name for name in times if name.split(".")[0] in ("drip", "lib")}
+
+
+def test_runtime_imports_no_frontend() -> None:
+    assert drip_modules(import_times(RUNTIME)) == RUNTIME_IMPORTS
+
+
+@pytest.mark.skipif(
+    "DRIP_IMPORT_BUDGET" not in os.environ,
+    reason="wall-clock budget; set DRIP_IMPORT_BUDGET=1 to check it",
+)
+def test_runtime_import_budget() -> None:
+    # best of a few runs, so a busy machine does not fail the budget
+    spent = min(
+        sum(times[name] for name in drip_modules(times))
+        for times in (import_times(RUNTIME) for _ in range(3))
+    )
+    assert spent / 1000 < RUNTIME_IMPORT_BUDGET_MS
+
+
+def test_submodules_load_on_attribute_access() -> None:
+    assert getattr(drip, "parse_asm").parse_asm_snippet("NOOP") is not None
+    assert drip.SUBMODULES == {
+        path.stem
+        for path in pathlib.Path(drip.__file__).parent.glob("*.py")
+        if path.stem != "__init__"
+    }
@@ -0,0 +1,61 @@
+import pytest
+from drip.incremental import IncrementalTypeChecker, function_dependencies
+from drip.parse import parser
+from tests.test_lex_parse import LINE_PROGRAM
+
+
+def test_dependencies() -> None:
+    program = parser.parse(LINE_PROGRAM).finalize()
+    manhattan_length, main = program.function_definitions
+    assert function_dependencies(manhattan_length).structures == {"Line"}
+    assert function_dependencies(main).structures == {"Point", "Line"}
+    assert function_dependencies(main).functions == {"manhattan_length"}
+
+
+def test_unchanged_program_is_not_rechecked() -> None:
+    checker = IncrementalTypeChecker()
+    checker.type_check(parser.parse(LINE_PROGRAM).finalize())
+    assert checker.checked == ["manhattan_length", "main"]
+    context = checker.type_check(parser.parse(LINE_PROGRAM).finalize())
+    assert checker.checked == []
+    assert set(context.function_return_types) == {"manhattan_length", "main"}
+
+
+def test_edited_function_is_rechecked() -> None:
+    checker = IncrementalTypeChecker()
+    checker.type_check(parser.parse(LINE_PROGRAM).finalize())
+    edited = LINE_PROGRAM.replace("return a + b;", "return b + a;")
+    checker.type_check(parser.parse(edited).finalize())
+    # main only sees manhattan_length's return type, which did not change
+    assert checker.checked == ["manhattan_length"]
+
+
+def test_edited_structure_rechecks_dependents() -> None:
+    checker = IncrementalTypeChecker()
+    checker.type_check(parser.parse(LINE_PROGRAM).finalize())
+    edited = LINE_PROGRAM.replace("y: Float\n", "y: Float,\n      z: Float\n")
+    checker.type_check(parser.parse(edited).finalize())
+    assert checker.checked == ["manhattan_length", "main"]
+
+
+def test_edited_parameters_recheck_callers() -> None:
+    source = """
+    structure Point (
+      x: Float,
+      y: Float
+    )
+
+    function first (value: Float) -> Float (
+      return 1.;
+    )
+
+    function main () -> Float (
+      return first(value=2.,);
+    )
+    """
+    checker = IncrementalTypeChecker()
+    checker.type_check(parser.parse(source).finalize())
+    edited = source.replace("(value: Float)", "(value: Point)")
+    with pytest.raises(AssertionError):
+        checker.type_check(parser.parse(edited).finalize())
+    assert checker.checked == ["first"]
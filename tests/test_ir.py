@@ -0,0 +1,107 @@
+from drip.basetypes import TaggedValue
+from drip.parse import parser
+from drip.interpreter import interpret_program
+from drip.compile_ast import compile_ast
+from drip.compile_ir import compile_ast_via_ir, compile_ir
+from drip.ir import (
+    lower_program,
+    ConstantInstruction,
+    PropertyInstruction,
+    ValueInstruction,
+)
+from drip.ir_passes import PassManager, default_pass_manager
+import drip.ops as ops
+from tests.test_ast import AST_A
+from tests.test_lex_parse import LINE_PROGRAM
+
+
+def test_ir_roundtrip_without_passes() -> None:
+    program = parser.parse(LINE_PROGRAM).finalize()
+    result = interpret_program(compile_ir(lower_program(program)))
+    assert result == TaggedValue(tag=float, value=9)
+
+
+def test_ir_default_passes() -> None:
+    program = AST_A.finalize()
+    assert interpret_program(compile_ast_via_ir(program)) == interpret_program(
+        compile_ast(program)
+    )
+
+
+def test_ir_ssa_renames_assignments() -> None:
+    program = parser.parse(
+        """
+    function main () -> Float (
+      a = 1.;
+      a = a + 2.;
+      return a;
+    )
+    """
+    ).finalize()
+    function = lower_program(program).functions[0]
+    results = [
+        instruction.result
+        for instruction in function.instructions
+        if isinstance(instruction, ValueInstruction)
+    ]
+    assert len(results) == len(set(results))
+
+
+def test_ir_constant_folding() -> None:
+    program = parser.parse(
+        """
+    function main () -> Float (
+      a = 1. + 2.;
+      return a + 3.;
+    )
+    """
+    ).finalize()
+    function = default_pass_manager().run(lower_program(program)).functions[0]
+    assert len(function.instructions) == 2
+    assert isinstance(function.instructions[0], ConstantInstruction)
+    assert function.instructions[0].value == TaggedValue(tag=float, value=6.0)
+
+    compiled = compile_ast_via_ir(program)
+    assert compiled.subroutines["main"].ops == (
+        ops.PushFromLiteralOp(value=TaggedValue(tag=float, value=6.0)),
+        ops.ReturnOp(),
+    )
+
+
+def test_ir_common_subexpressions() -> None:
+    program = parser.parse(
+        """
+    structure Point (
+      x: Float,
+      y: Float
+    )
+
+    function double_x (p: Point) -> Float (
+      return p.x + p.x;
+    )
+
+    function main () -> Float (
+      return double_x(p=Point(x=2., y=1.,),);
+    )
+    """
+    ).finalize()
+    ir = default_pass_manager().run(lower_program(program))
+    double_x = ir.function_lookup()["double_x"]
+    assert (
+        len(
+            [
+                instruction
+                for instruction in double_x.instructions
+                if isinstance(instruction, PropertyInstruction)
+            ]
+        )
+        == 1
+    )
+    result = interpret_program(compile_ir(ir))
+    assert result == TaggedValue(tag=float, value=4.0)
+
+
+def test_ir_empty_pass_manager() -> None:
+    program = AST_A.finalize()
+    ir = lower_program(program)
+    assert PassManager().run(ir) == ir
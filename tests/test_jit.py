@@ -0,0 +1,81 @@
+from drip.basetypes import Frame, TaggedValue
+from drip.interpreter import execute_program, interpret_program
+from drip.jit import JitState
+from drip.parse_asm import parse_asm_program
+from drip.program import Program
+
+
+def counting_loop(count: int, body: str = "") -> Program:
+    return parse_asm_program(
+        f"""
+    START_SUBROUTINE one
+    PUSH_FROM_LITERAL int 1
+    RETURN
+    END_SUBROUTINE one
+
+    START_SUBROUTINE main
+    STORE_FROM_LITERAL x int 0
+    STORE_FROM_LITERAL c int {count}
+    SET_FLAG start
+    PUSH_FROM_NAME x
+    PUSH_FROM_LITERAL int 4
+    BINARY_ADD
+    POP_TO_NAME x
+    {body}
+    PUSH_FROM_LITERAL int 1
+    PUSH_FROM_NAME c
+    BINARY_SUBTRACT
+    POP_TO_NAME c
+    PUSH_FROM_NAME c
+    BRANCH_TO_FLAG start
+    PUSH_FROM_NAME x
+    RETURN
+    END_SUBROUTINE main
+    """
+    )
+
+
+def test_jit_hot_loop() -> None:
+    program = counting_loop(100)
+    jit = JitState(threshold=4)
+    assert execute_program(program, jit=jit) == TaggedValue(tag=int, value=400)
+    [trace] = jit.traces.values()
+    assert trace is not None
+    assert trace.runs == 1
+
+
+def test_jit_cold_loop_not_compiled() -> None:
+    jit = JitState(threshold=4)
+    assert execute_program(counting_loop(3), jit=jit) == TaggedValue(tag=int, value=12)
+    assert len(jit.traces) == 0
+
+
+def test_jit_untraceable_loop() -> None:
+    program = counting_loop(
+        20,
+        body="""
+    CALL_SUBROUTINE one
+    POP_TO_NAME y
+    """,
+    )
+    jit = JitState(threshold=4)
+    assert execute_program(program, jit=jit) == interpret_program(program)
+    assert list(jit.traces.values()) == [None]
+
+
+def test_jit_guard_failure_falls_back() -> None:
+    program = counting_loop(100)
+    jit = JitState(threshold=4)
+    execute_program(program, jit=jit)
+    [trace] = jit.traces.values()
+    assert trace is not None
+
+    frame = Frame.allocate(
+        2,
+        names={
+            "x": TaggedValue(tag=float, value=0.0),
+            "c": TaggedValue(tag=int, value=3),
+        },
+    )
+    assert not trace.function(frame)
+    assert frame.names["x"] == TaggedValue(tag=float, value=0.0)
@@ -0,0 +1,70 @@
+from drip.basetypes import TaggedValue
+from drip.compile_ast import compile_ast
+from drip.interpreter import execute_program, interpret_program
+from drip.parse import parser
+from drip.program import LazySubroutines, Program
+from drip.validated_dataclass import VALIDATION_SETTINGS
+from tests.test_lex_parse import LINE_PROGRAM
+from tests.test_monomorphize import GENERIC_PROGRAM
+
+LIBRARY_PROGRAM = (
+    LINE_PROGRAM
+    + """
+    function unused (line: Line) -> Float (
+      return line.start.x;
+    )
+    """
+)
+
+
+def test_lazy_compile() -> None:
+    program = compile_ast(parser.parse(LIBRARY_PROGRAM).finalize(), lazy=True)
+    assert isinstance(program.subroutines, LazySubroutines)
+    assert len(program.subroutines.compiled()) == 0
+    assert "unused" in program.subroutines
+    assert execute_program(program) == TaggedValue(tag=float, value=9)
+    assert set(program.subroutines.compiled()) == {"main", "manhattan_length"}
+    main = program.subroutines["main"]
+    assert program.subroutines["main"] is main
+    assert main.max_stack_depth is not None
+
+
+def test_lazy_matches_eager() -> None:
+    program_ast = parser.parse(LIBRARY_PROGRAM).finalize()
+    lazy = compile_ast(program_ast, lazy=True)
+    eager = compile_ast(program_ast)
+    assert interpret_program(lazy) == interpret_program(eager)
+    for name, subroutine in eager.subroutines.items():
+        assert lazy.subroutines[name] == subroutine
+
+
+def test_lazy_generic_structures() -> None:
+    program = compile_ast(parser.parse(GENERIC_PROGRAM).finalize(), lazy=True)
+    assert execute_program(program) == TaggedValue(tag=float, value=5.0)
+    assert "Pair[T=Float,U=Float]" in program.structures
+
+
+def test_lazy_subroutines_enumerate_stubs() -> None:
+    program = compile_ast(parser.parse(LIBRARY_PROGRAM).finalize(), lazy=True)
+    names = {"main", "manhattan_length", "unused"}
+    assert len(program.subroutines) == len(names)
+    assert set(program.subroutines) == names
+    assert set(program.subroutines.keys()) == names
+    assert all(
+        subroutine.max_stack_depth is not None
+        for subroutine in program.subroutines.values()
+    )
+    assert isinstance(program.subroutines, LazySubroutines)
+    assert set(program.subroutines.compiled()) == names
+
+
+def test_validation_does_not_force_lazy_subroutines() -> None:
+    program = compile_ast(parser.parse(LIBRARY_PROGRAM).finalize(), lazy=True)
+    assert isinstance(program.subroutines, LazySubroutines)
+    enabled = VALIDATION_SETTINGS.validation_enabled
+    VALIDATION_SETTINGS.validation_enabled = True
+    try:
+        Program(subroutines=program.subroutines, structures=program.structures)
+    finally:
+        VALIDATION_SETTINGS.validation_enabled = enabled
+    assert len(program.subroutines.compiled()) == 0
@@ -0,0 +1,84 @@
+import pytest
+from drip.basetypes import TaggedValue
+from drip.interpreter import execute_program
+from drip.module import LinkError, compile_module, link
+
+GEOMETRY = """
+    structure Point (
+      x: Float,
+      y: Float
+    )
+
+    structure Line (
+      start: Point,
+      end: Point,
+    )
+
+    function manhattan_length (line: Line) -> Float (
+      a = (line.start.x + line.end.x);
+      b = (line.start.y + line.end.y);
+      return a + b;
+    )
+"""
+
+MAIN = """
+    function main () -> Float (
+      origin = Point(x=0.,y=0.,);
+      one_one = Point(x=4.,y=5.,);
+      line_a = Line(start=origin, end=one_one,);
+      return manhattan_length(line=line_a,);
+    )
+"""
+
+OTHER_MAIN = """
+    function main () -> Float (
+      return manhattan_length(line=Line(start=Point(x=1.,y=1.,), end=Point(x=1.,y=1.,),),);
+    )
+"""
+
+
+def test_link_shared_library() -> None:
+    geometry = compile_module("geometry", GEOMETRY)
+    program = link([geometry, compile_module("main", MAIN, [geometry])])
+    assert program.verified
+    assert execute_program(program) == TaggedValue(tag=float, value=9)
+
+    other = link([geometry, compile_module("other", OTHER_MAIN, [geometry])])
+    assert execute_program(other) == TaggedValue(tag=float, value=4)
+
+
+def test_link_detects_stale_signatures() -> None:
+    geometry = compile_module("geometry", GEOMETRY)
+    main = compile_module("main", MAIN, [geometry])
+    changed = compile_module(
+        "geometry", GEOMETRY.replace("(line: Line)", "(line: Line, scale: Float)")
+    )
+    with pytest.raises(LinkError):
+        link([changed, main])
+
+
+def test_link_detects_stale_structures() -> None:
+    point = "structure Point (x: Float, y: Float)"
+    main_source = """
+    function main () -> Float (
+      p = Point(x=1.,y=2.,);
+      return p.x;
+    )
+    """
+    library = compile_module("library", point)
+    main = compile_module("main", main_source, [library])
+    assert execute_program(link([library, main])) == TaggedValue(tag=float, value=1)
+    reordered = compile_module("library", "structure Point (y: Float, x: Float)")
+    with pytest.raises(LinkError):
+        link([reordered, main])
+
+
+def test_link_errors() -> None:
+    geometry = compile_module("geometry", GEOMETRY)
+    main = compile_module("main", MAIN, [geometry])
+    with pytest.raises(LinkError):
+        link([main])
+    with pytest.raises(LinkError):
+        link([geometry])
+    with pytest.raises(LinkError):
+        link([geometry, geometry, main])
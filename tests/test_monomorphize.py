@@ -0,0 +1,75 @@
+import drip.ast as ast
+import drip.ops as ops
+import drip.typecheck as drip_typing
+from drip.basetypes import TaggedValue
+from drip.compile_ast import compile_ast
+from drip.compile_ir import compile_ast_via_ir
+from drip.interpreter import execute_program
+from drip.monomorphize import monomorphize
+from drip.parse import parser
+
+GENERIC_PROGRAM = """
+    structure Pair [T, U] (
+      first: T,
+      second: U
+    )
+
+    structure Point (
+      x: Float,
+      y: Float
+    )
+
+    function main () -> Float (
+      a = Pair [T = Float, U = Float] (first=1., second=2.,);
+      b = Pair [U = Float, T = Float] (first=a.second, second=a.first,);
+      c = Pair [T = Point, U = Float] (first=Point(x=3., y=4.,), second=b.first,);
+      return c.first.x + c.second;
+    )
+"""
+
+
+def test_monomorphize_caches_instantiations() -> None:
+    program = parser.parse(GENERIC_PROGRAM).finalize()
+    structures = monomorphize(program)
+    assert set(structures) == {"Pair[T=Float,U=Float]", "Pair[T=Point,U=Float]"}
+    specialized = structures["Pair[T=Float,U=Float]"]
+    assert specialized.type_parameters == tuple()
+    assert all(
+        not isinstance(field.type, drip_typing.Placeholder)
+        for field in specialized.fields
+    )
+
+
+def test_type_checker_reuses_instantiations() -> None:
+    program = parser.parse(GENERIC_PROGRAM).finalize()
+    context = program.type_checking_context()
+    expression = ast.ConstructionExpression(
+        type_name="Pair",
+        type_arguments={"T": "Float", "U": "Float"},
+        arguments={},
+    )
+    first = expression.type_check(context)
+    second = expression.type_check(context)
+    assert isinstance(first, drip_typing.ConcreteType)
+    assert isinstance(second, drip_typing.ConcreteType)
+    assert isinstance(first.type, drip_typing.StructureType)
+    assert isinstance(second.type, drip_typing.StructureType)
+    assert first.type.structure is second.type.structure
+    assert first.type.structure is monomorphize(program)["Pair[T=Float,U=Float]"]
+
+
+def test_compile_specialized_structures() -> None:
+    program = parser.parse(GENERIC_PROGRAM).finalize()
+    program.type_check()
+    compiled = compile_ast(program)
+    assert ops.ConstructStructureOp(structure="Pair[T=Float,U=Float]") in (
+        compiled.subroutines["main"].ops
+    )
+    assert compiled.verified
+    assert execute_program(compiled) == TaggedValue(tag=float, value=5.0)
+
+
+def test_compile_specialized_structures_via_ir() -> None:
+    program = parser.parse(GENERIC_PROGRAM).finalize()
+    compiled = compile_ast_via_ir(program)
+    assert execute_program(compiled) == TaggedValue(tag=float, value=5.0)
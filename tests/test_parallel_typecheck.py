@@ -0,0 +1,49 @@
+import pytest
+from drip.parallel_typecheck import ParallelTypeCheckError, type_check_parallel
+from drip.parse import parser
+from tests.test_lex_parse import LINE_PROGRAM
+from tests.test_typechecker import FLOAT
+
+
+def test_parallel_matches_sequential() -> None:
+    program = parser.parse(LINE_PROGRAM).finalize()
+    context = type_check_parallel(program, max_workers=2, chunks_per_worker=1)
+    assert context.function_return_types == program.type_check().function_return_types
+
+
+def test_parallel_allows_forward_calls() -> None:
+    program = parser.parse(
+        """
+        function main () -> Float (
+          return helper();
+        )
+
+        function helper () -> Float (
+          return 1.;
+        )
+        """
+    ).finalize()
+    context = type_check_parallel(program, max_workers=2, chunks_per_worker=1)
+    assert context.function_return_types == {"main": FLOAT, "helper": FLOAT}
+
+
+def test_parallel_errors_in_source_order() -> None:
+    program = parser.parse(
+        """
+        function first () -> Float (
+          return missing;
+        )
+
+        function fine () -> Float (
+          return 1.;
+        )
+
+        function second () -> Float (
+          return also_missing;
+        )
+        """
+    ).finalize()
+    with pytest.raises(ParallelTypeCheckError) as error:
+        type_check_parallel(program, max_workers=3, chunks_per_worker=1)
+    assert [name for name, _ in error.value.errors] == ["first", "second"]
+    assert all(isinstance(e, KeyError) for _, e in error.value.errors)
@@ -0,0 +1,91 @@
+import itertools
+import pytest
+import drip.ast as ast
+from drip.parse import PARSER_SETTINGS, parse
+from drip.parse_descent import ParseError
+from tests.test_deep_expressions import DEPTH
+from tests.test_lazy_compile import LIBRARY_PROGRAM
+from tests.test_lex_parse import LINE_PROGRAM
+from tests.test_module import GEOMETRY, MAIN
+from tests.test_monomorphize import GENERIC_PROGRAM
+
+EXPRESSIONS = ("a", "1.", "a.b", "(a)", "f(x=a,)", "P[T=Float](x=a, y=b)")
+
+
+def function(expression: str) -> str:
+    return f"function main () -> Float ( return {expression}; )"
+
+
+def assert_equivalent(source: str) -> None:
+    assert parse(source, frontend="descent") == parse(source, frontend="ply")
+
+
+def test_programs_equivalent() -> None:
+    for source in (LINE_PROGRAM, GENERIC_PROGRAM, LIBRARY_PROGRAM, GEOMETRY, MAIN, ""):
+        assert_equivalent(source)
+
+
+def test_expressions_equivalent() -> None:
+    # every pairing under addition, property access and nesting, which
+    # covers the associativity and precedence the LALR tables settle on
+    for lhs, rhs in itertools.product(EXPRESSIONS, repeat=2):
+        for template in (
+            "{} + {}",
+            "{} + {} + {}",
+            "({} + {}).c",
+            "{}.c + {}.d.e",
+            "f(x={}, y={} + a)",
+            "P(x=({} + {}), y=a)",
+        ):
+            assert_equivalent(function(template.format(lhs, rhs, lhs)))
+
+
+def test_optional_commas_equivalent() -> None:
+    assert_equivalent(
+        "structure P [T, U,] (a: T, b: U,) structure Q [T] (a: T)"
+        "function f (a: Float,) -> Float ( return P[T=Float, U=Float,](a=a, b=a,).a; )"
+        "function g () -> Float ( x = f(); return Q[T=Float](a=x); )"
+    )
+
+
+def test_deep_expression_equivalent() -> None:
+    source = function(" + ".join(["x"] * DEPTH))
+    # dataclass equality recurses, so compare the iterative serialization
+    serialized = parse(source, frontend="descent").finalize().serialize()
+    assert serialized == parse(source, frontend="ply").finalize().serialize()
+    assert parse(serialized, frontend="descent").finalize().serialize() == serialized
+
+
+def test_node_factory() -> None:
+    node_factory = ast.NodeFactory()
+    program = parse(
+        function("a.b + a.b"), node_factory=node_factory, frontend="descent"
+    )
+    [statement] = program.function_definitions[0].procedure
+    assert isinstance(statement, ast.ReturnStatement)
+    assert isinstance(statement.expression, ast.BinaryOperatorExpression)
+    assert statement.expression.lhs is statement.expression.rhs
+
+
+def test_syntax_errors() -> None:
+    for source in (
+        function("a +"),
+        function("f(,)"),
+        function("P[](a=b)"),
+        "function main ( -> Float ( )",
+        "structure P (a: Float b: Float)",
+    ):
+        with pytest.raises(ParseError):
+            parse(source, frontend="descent")
+
+
+def test_frontend_setting() -> None:
+    PARSER_SETTINGS.frontend = "descent"
+    try:
+        assert parse(LINE_PROGRAM) == parse(LINE_PROGRAM, frontend="ply")
+        with pytest.raises(ParseError):
+            parse(function("a +"))
+    finally:
+        PARSER_SETTINGS.frontend = "ply"
+    with pytest.raises(ValueError):
+        parse(LINE_PROGRAM, frontend="bison")
@@ -0,0 +1,56 @@
+import pathlib
+import drip.ops as ops
+from drip.basetypes import TaggedValue
+from drip.parse import parser
+from drip.compile_ast import compile_ast
+from drip.compile_ir import compile_ast_via_ir
+from drip.interpreter import execute_program
+from drip.profile import Profile
+from tests.test_lex_parse import LINE_PROGRAM
+from tests.test_stack_depth import LOOP, snippet_program
+
+
+def test_profile_counts() -> None:
+    profile = Profile()
+    program = compile_ast(parser.parse(LINE_PROGRAM).finalize())
+    execute_program(program, profile=profile)
+    assert profile.call_counts == {"main": 1, "manhattan_length": 1}
+    assert profile.subroutine_op_count("main") == len(program.subroutines["main"].ops)
+
+
+def test_profile_branches() -> None:
+    profile = Profile()
+    program = snippet_program(LOOP)
+    assert execute_program(program, profile=profile) == TaggedValue(tag=int, value=12)
+    [(index, branch)] = profile.branch_counts["main"].items()
+    assert isinstance(program.subroutines["main"].ops[index], ops.BranchToFlagOp)
+    assert (branch.taken, branch.total) == (2, 3)
+    assert profile.op_counts["main"][index] == 3
+
+
+def test_profile_roundtrip(tmp_path: pathlib.Path) -> None:
+    profile = Profile()
+    execute_program(snippet_program(LOOP), profile=profile)
+    path = str(tmp_path / "drip.profile.json")
+    profile.dump(path)
+    assert Profile.load(path) == profile
+
+
+def test_profile_guided_inlining() -> None:
+    program_ast = parser.parse(LINE_PROGRAM).finalize()
+    profile = Profile()
+    execute_program(compile_ast(program_ast), profile=profile)
+
+    optimized = compile_ast_via_ir(program_ast, profile=profile)
+    assert not any(
+        isinstance(op, ops.CallSubroutineOp) for op in optimized.subroutines["main"].ops
+    )
+    assert execute_program(optimized) == TaggedValue(tag=float, value=9)
+
+
+def test_cold_functions_not_inlined() -> None:
+    program_ast = parser.parse(LINE_PROGRAM).finalize()
+    optimized = compile_ast_via_ir(program_ast, profile=Profile())
+    assert any(
+        isinstance(op, ops.CallSubroutineOp) for op in optimized.subroutines["main"].ops
+    )
@@ -0,0 +1,53 @@
+import itertools
+import mmap
+import pathlib
+import pytest
+from drip.lex import lexer
+from drip.parse import parse
+from drip.scanner import TOKEN_TYPES, iterate_tokens, scan
+from tests.test_lex_parse import LINE_PROGRAM
+from tests.test_monomorphize import GENERIC_PROGRAM
+
+TRICKY = "structures returned functional Point3 x_y ->.5 12. 3.25 ( ) [ ] : , = ; +"
+
+
+def ply_tokens(source: str) -> list:
+    scanner = lexer.clone()
+    scanner.input(source)
+    return [(token.type, token.value, token.lexpos) for token in scanner]
+
+
+def test_scan_matches_ply() -> None:
+    assert set(TOKEN_TYPES) == set(lexer.lextokens)
+    for source in (LINE_PROGRAM, GENERIC_PROGRAM, TRICKY):
+        assert list(scan(source)) == ply_tokens(source)
+        assert list(iterate_tokens(source)) == ply_tokens(source)
+
+
+def test_buffer_inputs(tmp_path: pathlib.Path) -> None:
+    expected = list(scan(LINE_PROGRAM))
+    encoded = LINE_PROGRAM.encode()
+    assert list(scan(encoded)) == expected
+    assert list(scan(memoryview(encoded))) == expected
+    path = tmp_path / "line.drip"
+    path.write_bytes(encoded)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+        assert list(scan(m)) == expected
+        assert parse(LINE_PROGRAM) == parse(m, frontend="descent")  # type: ignore
+
+
+def test_token_arrays_are_compact() -> None:
+    tokens = scan(LINE_PROGRAM)
+    assert (tokens.types.typecode, tokens.starts.typecode) == ("B", "I")
+    assert len(tokens) == len(tokens.starts) == len(tokens.ends)
+    assert tokens.kind(len(tokens)) == "$end"
+
+
+def test_iteration_is_lazy() -> None:
+    source = LINE_PROGRAM + "$"
+    with pytest.raises(ValueError, match="Illegal character"):
+        scan(source)
+    assert [token[0] for token in itertools.islice(iterate_tokens(source), 2)] == [
+        "STRUCTURE",
+        "CAMEL_NAME",
+    ]
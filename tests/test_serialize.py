@@ -1,5 +1,7 @@
 from tests.test_lex_parse import LINE_PROGRAM
-from drip.parse import parser
+from tests.test_monomorphize import GENERIC_PROGRAM
+import drip.ast as ast
+from drip.parse import parse, parser
 
 
 def test_serialize() -> None:
@@ -7,3 +9,41 @@ def test_serialize() -> None:
     program_text = ast_1.serialize()
     ast_2 = parser.parse(program_text).finalize()
     assert ast_1 == ast_2
+
+
+def test_serialize_hash_consed() -> None:
+    node_factory = ast.NodeFactory()
+    ast_1 = parse(LINE_PROGRAM, node_factory).finalize(node_factory)
+    ast_2 = parse(ast_1.serialize(), node_factory).finalize(node_factory)
+    assert ast_1 is ast_2
+    assert ast_1 == parser.parse(LINE_PROGRAM).finalize()
+
+
+def test_hash_consing_shares_subtrees() -> None:
+    node_factory = ast.NodeFactory()
+    program = parse(LINE_PROGRAM, node_factory).finalize(node_factory)
+    [manhattan_length, _] = program.function_definitions
+    [a, b, _] = manhattan_length.procedure
+    assert isinstance(a, ast.AssignmentStatement)
+    assert isinstance(b, ast.AssignmentStatement)
+    assert isinstance(a.expression, ast.BinaryOperatorExpression)
+    assert isinstance(b.expression, ast.BinaryOperatorExpression)
+    line_start_x = a.expression.lhs
+    line_start_y = b.expression.lhs
+    assert isinstance(line_start_x, ast.PropertyAccessExpression)
+    assert isinstance(line_start_y, ast.PropertyAccessExpression)
+    assert line_start_x.entity is line_start_y.entity
+    assert node_factory.serial(line_start_x) != node_factory.serial(line_start_y)
+    [first] = parse(
+        "function f () -> Float ( return 1.; )", node_factory
+    ).function_definitions
+    [second] = parse(
+        "function f () -> Float ( return 1.; )", node_factory
+    ).function_definitions
+    assert first is second
+
+
+def test_serialize_type_arguments() -> None:
+    ast_1 = parser.parse(GENERIC_PROGRAM).finalize()
+    ast_2 = parser.parse(ast_1.serialize()).finalize()
+    assert ast_1 == ast_2
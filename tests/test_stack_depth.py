@@ -0,0 +1,121 @@
+import pytest
+from drip.parse_asm import parse_asm_snippet, parse_asm_program
+from drip.parse import parser
+from drip.interpreter import interpret_program, execute_program
+from drip.compile_ast import compile_ast
+from drip.basetypes import TaggedValue
+from drip.program import Program, Subroutine
+from drip.stack_depth import (
+    StackDepthError,
+    annotate_stack_depths,
+    compute_max_stack_depth,
+)
+from tests.test_lex_parse import LINE_PROGRAM
+
+LOOP = """
+    STORE_FROM_LITERAL x int 0
+    STORE_FROM_LITERAL c int 3
+    SET_FLAG start
+    PUSH_FROM_NAME x
+    PUSH_FROM_LITERAL int 4
+    BINARY_ADD
+    POP_TO_NAME x
+    PUSH_FROM_LITERAL int 1
+    PUSH_FROM_NAME c
+    BINARY_SUBTRACT
+    POP_TO_NAME c
+    PUSH_FROM_NAME c
+    BRANCH_TO_FLAG start
+    PUSH_FROM_NAME x
+    RETURN
+"""
+
+
+def snippet_program(snippet: str) -> Program:
+    return Program(
+        subroutines={
+            "main": Subroutine(ops=parse_asm_snippet(snippet), arguments=tuple())
+        }
+    )
+
+
+def test_max_stack_depth_loop() -> None:
+    program = snippet_program(LOOP)
+    assert compute_max_stack_depth(program, program.subroutines["main"]) == 2
+
+
+def test_max_stack_depth_nested() -> None:
+    program = snippet_program(
+        """
+    PUSH_FROM_LITERAL int 1
+    PUSH_FROM_LITERAL int 2
+    PUSH_FROM_LITERAL int 3
+    BINARY_ADD
+    BINARY_ADD
+    RETURN
+    """
+    )
+    assert compute_max_stack_depth(program, program.subroutines["main"]) == 3
+
+
+def test_stack_underflow_rejected() -> None:
+    program = snippet_program(
+        """
+    PUSH_FROM_LITERAL int 1
+    BINARY_ADD
+    RETURN
+    """
+    )
+    with pytest.raises(StackDepthError):
+        annotate_stack_depths(program)
+
+
+def test_unbalanced_loop_rejected() -> None:
+    program = snippet_program(
+        """
+    SET_FLAG start
+    PUSH_FROM_LITERAL int 1
+    PUSH_FROM_LITERAL int 1
+    BRANCH_TO_FLAG start
+    RETURN
+    """
+    )
+    with pytest.raises(StackDepthError):
+        annotate_stack_depths(program)
+
+
+def test_execute_matches_interpret() -> None:
+    program = snippet_program(LOOP)
+    assert execute_program(program) == interpret_program(program)
+    assert execute_program(program) == TaggedValue(tag=int, value=12)
+
+
+def test_execute_compiled_program() -> None:
+    program = compile_ast(parser.parse(LINE_PROGRAM).finalize())
+    assert all(
+        subroutine.max_stack_depth is not None
+        for subroutine in program.subroutines.values()
+    )
+    assert execute_program(program) == TaggedValue(tag=float, value=9)
+
+
+def test_execute_asm_subroutines() -> None:
+    program = parse_asm_program(
+        """
+    START_SUBROUTINE inc x
+    PUSH_FROM_NAME x
+    PUSH_FROM_LITERAL int 1
+    BINARY_ADD
+    RETURN
+    END_SUBROUTINE inc
+
+    START_SUBROUTINE main
+    PUSH_FROM_LITERAL int 5
+    CALL_SUBROUTINE inc
+    CALL_SUBROUTINE inc
+    RETURN
+    END_SUBROUTINE main
+    """
+    )
+    assert program.subroutines["inc"].max_stack_depth == 2
+    assert execute_program(program) == TaggedValue(tag=int, value=7)
@@ -0,0 +1,55 @@
+import types
+import lib.ply.lex as lex
+import lib.ply.yacc as yacc
+import drip.lex
+import drip.parse
+import drip.parse_tables as parse_tables
+from drip.tables import (
+    LEX_REFLAGS,
+    TableProduction,
+    build_parser,
+    lexer_tables,
+    signature,
+)
+from tests.test_lex_parse import LINE_PROGRAM
+from tests.test_monomorphize import GENERIC_PROGRAM
+
+
+def test_tables_are_current() -> None:
+    # regenerate with python -m drip.tables when this fails
+    assert parse_tables.LEX_SIGNATURE == signature(drip.lex, "t_")
+    assert parse_tables.PARSE_SIGNATURE == signature(drip.parse, "p_")
+    lexer = lex.lexer
+    regexes, entries = lexer_tables(lex.lex(module=drip.lex, reflags=LEX_REFLAGS))
+    lex.lexer = lexer
+    assert (regexes, entries) == (parse_tables.LEX_REGEXES, parse_tables.LEX_RULES)
+    built = yacc.yacc(module=drip.parse)
+    assert built.action == parse_tables.LR_ACTION
+    assert built.goto == parse_tables.LR_GOTO
+    assert [
+        (production.name, production.len, production.func)
+        for production in built.productions
+    ] == [production[:3] for production in parse_tables.LR_PRODUCTIONS]
+
+
+def test_import_uses_tables() -> None:
+    assert isinstance(drip.parse.parser.productions[0], TableProduction)
+    assert lex.lexer is drip.lex.lexer
+
+
+def test_tables_parse_like_yacc() -> None:
+    built = yacc.yacc(module=drip.parse)
+    for source in (LINE_PROGRAM, GENERIC_PROGRAM):
+        assert drip.parse.parser.parse(source) == built.parse(
+            source, lexer=drip.lex.lexer
+        )
+
+
+def test_stale_tables_are_ignored() -> None:
+    changed = types.ModuleType("changed_grammar")
+    vars(changed).update(vars(drip.parse))
+    rule = lambda p: None
+    rule.__doc__ = """statement : RETURN expression"""
+    setattr(changed, "p_statement_return", rule)
+    assert signature(changed, "p_") != parse_tables.PARSE_SIGNATURE
+    assert not isinstance(build_parser(changed).productions[0], TableProduction)
@@ -1,8 +1,14 @@
 import typing
-from drip.parse import parser
+import pickle
+import pytest
+from dataclasses import replace
+from drip.parse import parse, parser
 import drip.ast as ast
 import drip.typecheck as drip_typing
+from drip.monomorphize import iter_function_expressions
 from tests.test_ast import AST_A
+from tests.test_lex_parse import LINE_PROGRAM
+from tests.test_monomorphize import GENERIC_PROGRAM
 
 FLOAT = drip_typing.ConcreteType(
     type=drip_typing.PrimitiveType(
@@ -155,3 +161,158 @@ def test_typing_param_parse() -> None:
 
 def test_full_program() -> None:
     AST_A.finalize().type_check()
+
+
+def test_types_are_interned() -> None:
+    point = drip_typing.StructureDefinition(
+        fields=(
+            drip_typing.ArgumentDefinition(name="x", type=FLOAT, type_name="Float"),
+        )
+    )
+    same_point = drip_typing.StructureDefinition(
+        fields=(
+            drip_typing.ArgumentDefinition(name="x", type=FLOAT, type_name="Float"),
+        )
+    )
+    assert point is same_point
+    assert drip_typing.ConcreteType(
+        type=drip_typing.StructureType(structure=point)
+    ) is drip_typing.ConcreteType(type=drip_typing.StructureType(structure=same_point))
+    assert replace(point, type_parameters=tuple()) is point
+    assert pickle.loads(pickle.dumps(point)) is point
+    assert drip_typing.PRIMITIVE_TYPES["Float"] is FLOAT
+
+
+def test_symbol_table_scopes() -> None:
+    symbols = ast.SymbolTable()
+    symbols.bind("x", FLOAT)
+    with symbols.scope():
+        point = drip_typing.ConcreteType(
+            type=drip_typing.StructureType(
+                structure=drip_typing.StructureDefinition(fields=tuple())
+            )
+        )
+        symbols.bind("x", point)
+        symbols.bind("y", FLOAT)
+        assert symbols["x"] is point
+    assert symbols["x"] is FLOAT
+    assert "y" not in symbols
+
+
+def variable_name(index: int) -> str:
+    # names cannot contain digits
+    return "x_" + "".join(chr(ord("a") + int(digit)) for digit in str(index))
+
+
+def test_long_function() -> None:
+    statements = "".join(
+        f"{variable_name(i)} = {variable_name(i - 1)} + 1.;\n" for i in range(1, 5000)
+    )
+    program = parser.parse(
+        f"function main () -> Float ( {variable_name(0)} = 0.; {statements} "
+        f"return {variable_name(4999)}; )"
+    ).finalize()
+    context = program.type_check()
+    assert context.function_return_types["main"] is FLOAT
+    assert len(context.local_scope.bindings) == 0
+
+
+def test_type_annotations() -> None:
+    program = parser.parse(
+        """
+    structure Point (
+      x: Float,
+      y: Float
+    )
+
+    function main () -> Float (
+      origin = Point (x=0., y=0.,);
+      return origin.x + origin.y;
+    )
+    """
+    ).finalize()
+    context = program.type_check()
+    [main] = program.function_definitions
+    [assignment, return_statement] = main.procedure
+    assert isinstance(return_statement.expression, ast.BinaryOperatorExpression)
+    lhs = return_statement.expression.lhs
+    assert isinstance(lhs, ast.PropertyAccessExpression)
+    assert context.annotations.type_of("main", lhs) is FLOAT
+    assert context.annotations.type_of(
+        "main", lhs.entity
+    ) is context.annotations.type_of("main", assignment.expression)
+
+
+def test_type_annotations_are_per_function() -> None:
+    node_factory = ast.NodeFactory()
+    program = parse(
+        """
+    structure Point (
+      x: Float,
+      y: Float
+    )
+
+    function first (value: Float) -> Float (
+      return value;
+    )
+
+    function second (value: Point) -> Float (
+      return value.x;
+    )
+    """,
+        node_factory,
+    ).finalize(node_factory)
+    context = program.type_check()
+    [first, second] = program.function_definitions
+    [first_return] = first.procedure
+    [second_return] = second.procedure
+    assert isinstance(second_return.expression, ast.PropertyAccessExpression)
+    value = second_return.expression.entity
+    assert value is first_return.expression
+    assert context.annotations.type_of("first", value) is FLOAT
+    assert context.annotations.type_of("second", value) is not FLOAT
+
+
+def test_every_expression_is_annotated() -> None:
+    for source in (LINE_PROGRAM, GENERIC_PROGRAM):
+        program = parser.parse(source).finalize()
+        context = program.type_check()
+        for function in program.function_definitions:
+            for expression in iter_function_expressions(function):
+                context.annotations.type_of(function.name, expression)
+
+
+def test_argument_types_are_checked() -> None:
+    program = parser.parse(
+        """
+    structure Point (
+      x: Float,
+      y: Float
+    )
+
+    function length (point: Point) -> Float (
+      return point.x;
+    )
+
+    function main () -> Float (
+      return length(point=1.,);
+    )
+    """
+    ).finalize()
+    with pytest.raises(AssertionError):
+        program.type_check()
+    mismatched_field = parser.parse(
+        """
+    structure Line (
+      start: Float,
+      end: Float
+    )
+
+    function main () -> Float (
+      line = Line(start=Line(start=1., end=2.,), end=2.,);
+      return line.end;
+    )
+    """
+    ).finalize()
+    with pytest.raises(AssertionError):
+        mismatched_field.type_check()
@@ -0,0 +1,131 @@
+import pytest
+from drip.parse_asm import parse_asm_program
+from drip.parse import parser
+from drip.compile_ast import compile_ast
+from drip.interpreter import execute_program
+from drip.basetypes import TaggedValue
+from drip.verifier import verify_program
+from tests.test_lex_parse import LINE_PROGRAM
+
+
+def asm_main(body: str) -> str:
+    return f"START_SUBROUTINE main\n{body}\nEND_SUBROUTINE main"
+
+
+def test_verify_asm_program() -> None:
+    program = parse_asm_program(
+        """
+    START_SUBROUTINE inc x
+    PUSH_FROM_NAME x
+    PUSH_FROM_LITERAL int 1
+    BINARY_ADD
+    RETURN
+    END_SUBROUTINE inc
+
+    START_SUBROUTINE main
+    PUSH_FROM_LITERAL int 5
+    CALL_SUBROUTINE inc
+    CALL_SUBROUTINE inc
+    RETURN
+    END_SUBROUTINE main
+    """
+    )
+    assert program.verified
+    assert execute_program(program) == TaggedValue(tag=int, value=7)
+
+
+def test_verify_loop() -> None:
+    program = parse_asm_program(
+        asm_main(
+            """
+        STORE_FROM_LITERAL x int 0
+        STORE_FROM_LITERAL c int 3
+        SET_FLAG start
+        PUSH_FROM_NAME x
+        PUSH_FROM_LITERAL int 4
+        BINARY_ADD
+        POP_TO_NAME x
+        PUSH_FROM_LITERAL int 1
+        PUSH_FROM_NAME c
+        BINARY_SUBTRACT
+        POP_TO_NAME c
+        PUSH_FROM_NAME c
+        BRANCH_TO_FLAG start
+        PUSH_FROM_NAME x
+        RETURN
+        """
+        )
+    )
+    assert program.verified
+    assert execute_program(program) == TaggedValue(tag=int, value=12)
+
+
+def test_verify_compiled_program() -> None:
+    program = compile_ast(parser.parse(LINE_PROGRAM).finalize())
+    assert program.verified
+    assert execute_program(program) == TaggedValue(tag=float, value=9)
+
+
+def test_mismatched_tags_keep_checked_path() -> None:
+    program = parse_asm_program(
+        asm_main(
+            """
+        PUSH_FROM_LITERAL int 1
+        PUSH_FROM_LITERAL float 1
+        BINARY_ADD
+        RETURN
+        """
+        )
+    )
+    assert not program.verified
+    assert len(verify_program(program).errors) == 1
+    with pytest.raises(AssertionError):
+        execute_program(program)
+
+
+def test_undefined_name() -> None:
+    program = parse_asm_program(
+        asm_main(
+            """
+        PUSH_FROM_NAME x
+        RETURN
+        """
+        )
+    )
+    assert not program.verified
+
+
+def test_branch_before_flag() -> None:
+    program = parse_asm_program(
+        asm_main(
+            """
+        PUSH_FROM_LITERAL int 0
+        BRANCH_TO_FLAG later
+        SET_FLAG later
+        PUSH_FROM_LITERAL int 1
+        RETURN
+        """
+        )
+    )
+    assert not program.verified
+
+
+def test_argument_types_from_call_sites() -> None:
+    program = parse_asm_program(
+        """
+    START_SUBROUTINE add x y
+    PUSH_FROM_NAME x
+    PUSH_FROM_NAME y
+    BINARY_ADD
+    RETURN
+    END_SUBROUTINE add
+
+    START_SUBROUTINE main
+    PUSH_FROM_LITERAL int 1
+    PUSH_FROM_LITERAL float 2
+    CALL_SUBROUTINE add
+    RETURN
+    END_SUBROUTINE main
+    """
+    )
+    assert not program.verified